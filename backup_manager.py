@@ -0,0 +1,180 @@
+# backup_manager.py - Backups online com a API de backup do SQLite
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class BackupManager:
+    """Backups consistentes sem bloquear os operadores.
+
+    - Copia com ``sqlite3.Connection.backup`` em lotes de ``paginas_por_lote``
+      páginas, pausando ``pausa_lote`` segundos entre os lotes; escritas
+      concorrentes continuam possíveis durante a cópia.
+    - Grava em arquivo ``.parcial`` e só renomeia ao concluir (sem cópias truncadas).
+    - Agendamento por intervalo em thread de fundo e retenção dos
+      ``retencao`` backups automáticos mais recentes.
+    """
+
+    PREFIXO = 'backup_online_'
+
+    def __init__(self, db_path, pasta=None, paginas_por_lote=256, pausa_lote=0.02,
+                 intervalo_horas=24, retencao=10, busy_timeout_ms=5000):
+        self.db_path = db_path
+        self.pasta = pasta or os.path.join(os.path.dirname(os.path.abspath(db_path)), 'backups')
+        self.paginas_por_lote = paginas_por_lote
+        self.pausa_lote = pausa_lote
+        self.intervalo_horas = intervalo_horas
+        self.retencao = retencao
+        self.busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.Lock()
+        self._em_execucao = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self._historico = []
+
+    # ------------------------------------------------------------------
+    # Backup
+    # ------------------------------------------------------------------
+    def executar_backup(self, motivo='manual'):
+        """Executa um backup completo e retorna duração, tamanho e arquivo"""
+        if not self._em_execucao.acquire(blocking=False):
+            return {"sucesso": False, "mensagem": "Já existe um backup em andamento"}
+        inicio = time.perf_counter()
+        os.makedirs(self.pasta, exist_ok=True)
+        nome = f"{self.PREFIXO}{datetime.now().strftime('%Y%m%d_%H%M%S')}_{motivo}.db"
+        destino = os.path.join(self.pasta, nome)
+        parcial = destino + '.parcial'
+        lotes = [0]
+
+        def progresso(status, restantes, total):
+            lotes[0] += 1
+            if restantes and self.pausa_lote:
+                time.sleep(self.pausa_lote)
+
+        try:
+            origem = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+            copia = sqlite3.connect(parcial)
+            try:
+                origem.backup(copia, pages=self.paginas_por_lote, progress=progresso)
+                integridade = copia.execute("PRAGMA quick_check").fetchone()[0]
+                paginas = copia.execute("PRAGMA page_count").fetchone()[0]
+            finally:
+                copia.close()
+                origem.close()
+            if integridade != 'ok':
+                raise sqlite3.DatabaseError(f"Verificação de integridade falhou: {integridade}")
+            os.replace(parcial, destino)
+
+            resultado = {
+                "sucesso": True,
+                "arquivo": destino,
+                "motivo": motivo,
+                "data": datetime.now().isoformat(sep=' ', timespec='seconds'),
+                "tamanho_bytes": os.path.getsize(destino),
+                "paginas": paginas,
+                "lotes": lotes[0],
+                "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2),
+            }
+            resultado["removidos"] = self.aplicar_retencao()
+            print(f"💾 Backup concluído: {destino} ({resultado['tamanho_bytes'] / 1024:.0f} KB em {resultado['duracao_ms']} ms)")
+        except Exception as e:
+            if os.path.exists(parcial):
+                os.remove(parcial)
+            resultado = {
+                "sucesso": False,
+                "mensagem": f"Erro ao executar backup: {str(e)}",
+                "motivo": motivo,
+                "data": datetime.now().isoformat(sep=' ', timespec='seconds'),
+                "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2),
+            }
+            print(f"❌ {resultado['mensagem']}")
+        finally:
+            self._em_execucao.release()
+
+        with self._lock:
+            self._historico.append(resultado)
+            del self._historico[:-20]
+        return resultado
+
+    def listar(self):
+        """Backups online existentes, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.pasta):
+            return []
+        backups = []
+        for nome in os.listdir(self.pasta):
+            if nome.startswith(self.PREFIXO) and nome.endswith('.db'):
+                caminho = os.path.join(self.pasta, nome)
+                backups.append({
+                    "arquivo": nome,
+                    "tamanho_bytes": os.path.getsize(caminho),
+                    "modificado_em": os.path.getmtime(caminho),
+                })
+        backups.sort(key=lambda b: b["modificado_em"], reverse=True)
+        for backup in backups:
+            backup["modificado_em"] = datetime.fromtimestamp(backup["modificado_em"]).isoformat(sep=' ', timespec='seconds')
+        return backups
+
+    def aplicar_retencao(self):
+        """Remove backups online além dos ``retencao`` mais recentes"""
+        if not self.retencao:
+            return []
+        removidos = []
+        for backup in self.listar()[self.retencao:]:
+            try:
+                os.remove(os.path.join(self.pasta, backup["arquivo"]))
+                removidos.append(backup["arquivo"])
+            except OSError as e:
+                print(f"⚠️ Não foi possível remover backup antigo {backup['arquivo']}: {e}")
+        return removidos
+
+    # ------------------------------------------------------------------
+    # Agendamento
+    # ------------------------------------------------------------------
+    def _segundos_desde_ultimo(self):
+        backups = self.listar()
+        if not backups:
+            return None
+        ultimo = os.path.getmtime(os.path.join(self.pasta, backups[0]["arquivo"]))
+        return time.time() - ultimo
+
+    def start_scheduler(self):
+        """Inicia a thread que faz backup a cada ``intervalo_horas`` (0/None desativa)"""
+        if not self.intervalo_horas or self._thread is not None:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name='backup-online', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        intervalo = self.intervalo_horas * 3600
+        # Pequeno atraso para não competir com a abertura do aplicativo
+        if self._parar.wait(60):
+            return
+        while True:
+            decorrido = self._segundos_desde_ultimo()
+            if decorrido is None or decorrido >= intervalo:
+                self.executar_backup('agendado')
+                espera = intervalo
+            else:
+                espera = intervalo - decorrido
+            if self._parar.wait(espera):
+                return
+
+    def stop_scheduler(self):
+        self._parar.set()
+        self._thread = None
+
+    def get_stats(self):
+        with self._lock:
+            historico = list(self._historico)
+        return {
+            "pasta": self.pasta,
+            "intervalo_horas": self.intervalo_horas,
+            "retencao": self.retencao,
+            "paginas_por_lote": self.paginas_por_lote,
+            "pausa_lote_s": self.pausa_lote,
+            "ultimo": historico[-1] if historico else None,
+            "historico": historico,
+        }
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# benchmark_armazenamento.py - Compara os perfis de armazenamento (StorageProfile)
+"""
+Gera uma cópia do banco com volume realista (processos replicados a partir dos
+existentes, espalhados por vários anos) e mede, para cada perfil de
+armazenamento, o tempo de:
+
+- listar_processos_com_prazos (primeira página e busca textual)
+- gerar_mapa_mensal
+- família obter_estatistica_*
+
+Uso:
+    python benchmark_armazenamento.py --processos 5000 --repeticoes 5
+    python benchmark_armazenamento.py --perfis minimo,desempenho
+
+O banco original não é alterado; a cópia fica em um diretório temporário.
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def gerar_banco(origem, destino, total_processos, seed=42):
+    """Copia o banco e replica processos (com PMs envolvidos e prazos) até o total"""
+    src = sqlite3.connect(origem)
+    dst = sqlite3.connect(destino)
+    src.backup(dst)
+    src.close()
+
+    rnd = random.Random(seed)
+    cursor = dst.cursor()
+
+    cursor.execute("SELECT * FROM processos_procedimentos")
+    colunas = [d[0] for d in cursor.description]
+    modelos = [dict(zip(colunas, row)) for row in cursor.fetchall()]
+    if not modelos:
+        raise SystemExit("O banco de origem não possui processos para replicar")
+
+    cursor.execute("SELECT * FROM procedimento_pms_envolvidos")
+    colunas_pms = [d[0] for d in cursor.description]
+    pms_por_processo = {}
+    for row in cursor.fetchall():
+        registro = dict(zip(colunas_pms, row))
+        pms_por_processo.setdefault(registro["procedimento_id"], []).append(registro)
+
+    cursor.execute("SELECT * FROM prazos_processo")
+    colunas_prazos = [d[0] for d in cursor.description]
+    prazos_por_processo = {}
+    for row in cursor.fetchall():
+        registro = dict(zip(colunas_prazos, row))
+        prazos_por_processo.setdefault(registro["processo_id"], []).append(registro)
+
+    faltam = total_processos - len(modelos)
+    hoje = datetime.now()
+    novos_processos, novos_pms, novos_prazos = [], [], []
+    for i in range(max(faltam, 0)):
+        modelo = modelos[i % len(modelos)]
+        novo = dict(modelo)
+        novo["id"] = str(uuid.uuid4())
+        novo["numero"] = f"{modelo['numero']}-{i}"
+        instauracao = hoje - timedelta(days=rnd.randint(0, 6 * 365))
+        novo["data_instauracao"] = instauracao.strftime("%Y-%m-%d")
+        novo["data_recebimento"] = (instauracao + timedelta(days=rnd.randint(0, 10))).strftime("%Y-%m-%d")
+        novo["ano_instauracao"] = instauracao.strftime("%Y")
+        if rnd.random() < 0.6:
+            novo["concluido"] = 1
+            novo["data_conclusao"] = (instauracao + timedelta(days=rnd.randint(20, 120))).strftime("%Y-%m-%d")
+        else:
+            novo["concluido"] = 0
+            novo["data_conclusao"] = None
+        novos_processos.append(tuple(novo[c] for c in colunas))
+
+        for pm in pms_por_processo.get(modelo["id"], []):
+            copia = dict(pm, id=str(uuid.uuid4()), procedimento_id=novo["id"])
+            novos_pms.append(tuple(copia[c] for c in colunas_pms))
+        for prazo in prazos_por_processo.get(modelo["id"], []):
+            copia = dict(prazo, id=str(uuid.uuid4()), processo_id=novo["id"])
+            novos_prazos.append(tuple(copia[c] for c in colunas_prazos))
+
+    def inserir(tabela, cols, linhas):
+        if linhas:
+            marcadores = ", ".join("?" for _ in cols)
+            cursor.executemany(
+                f"INSERT INTO {tabela} ({', '.join(cols)}) VALUES ({marcadores})", linhas
+            )
+
+    inserir("processos_procedimentos", colunas, novos_processos)
+    inserir("procedimento_pms_envolvidos", colunas_pms, novos_pms)
+    inserir("prazos_processo", colunas_prazos, novos_prazos)
+    dst.commit()
+    dst.execute("ANALYZE")
+    dst.close()
+    return os.path.getsize(destino)
+
+
+def medir(func, repeticoes, pool):
+    """Retorna (ms primeira chamada com conexão nova, mediana ms das seguintes)"""
+    pool.close_all()
+    inicio = time.perf_counter()
+    resultado = func()
+    fria = (time.perf_counter() - inicio) * 1000
+    if isinstance(resultado, dict) and resultado.get("sucesso") is False:
+        print(f"   ⚠️ chamada retornou erro: {resultado.get('mensagem')}")
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return fria, statistics.median(tempos) if tempos else fria
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos perfis de armazenamento SQLite")
+    parser.add_argument("--origem", default="usuarios.db", help="Banco usado como modelo")
+    parser.add_argument("--processos", type=int, default=5000, help="Total de processos na cópia")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--perfis", default="minimo,padrao,desempenho")
+    args = parser.parse_args()
+
+    import main as app
+    from sqlite_storage import StorageProfile
+
+    perfis = [p.strip() for p in args.perfis.split(",") if p.strip()]
+    for nome in perfis:
+        if nome not in StorageProfile.PERFIS:
+            raise SystemExit(f"Perfil desconhecido: {nome}")
+
+    diretorio = tempfile.mkdtemp(prefix="bench_armazenamento_")
+    try:
+        caminho = os.path.join(diretorio, "usuarios.db")
+        print(f"📦 Gerando banco com {args.processos} processos em {caminho}...")
+        tamanho = gerar_banco(args.origem, caminho, args.processos)
+        print(f"   Tamanho: {tamanho / (1024 * 1024):.1f} MB")
+
+        # Apontar o aplicativo para a cópia
+        app.db_manager.pool.close_all()
+        app.db_manager.db_path = caminho
+        app.db_manager.pool.db_path = caminho
+        app.prazos_manager.db_path = caminho
+
+        ano_atual = datetime.now().year
+        casos = [
+            ("listar_processos_com_prazos (pág. 1)",
+             lambda: app.listar_processos_com_prazos(page=1, per_page=6)),
+            ("listar_processos_com_prazos (busca)",
+             lambda: app.listar_processos_com_prazos(search_term="a", page=1, per_page=6)),
+            ("gerar_mapa_mensal (SR)",
+             lambda: app.gerar_mapa_mensal(datetime.now().month, ano_atual, "SR")),
+            ("gerar_mapa_mensal (IPM)",
+             lambda: app.gerar_mapa_mensal(datetime.now().month, ano_atual, "IPM")),
+        ]
+        for nome in sorted(dir(app)):
+            if nome.startswith("obter_estatistica_"):
+                func = getattr(app, nome)
+                casos.append((nome, lambda func=func: func(None)))
+                casos.append((f"{nome} ({ano_atual - 1})", lambda func=func: func(str(ano_atual - 1))))
+
+        resultados = {}
+        for perfil in perfis:
+            app.db_manager.set_storage_profile(perfil)
+            print(f"\n⚙️ Perfil '{perfil}': {app.db_manager.profile.get_stats()}")
+            for descricao, func in casos:
+                resultados[(perfil, descricao)] = medir(func, args.repeticoes, app.db_manager.pool)
+
+        largura = max(len(d) for d, _ in casos)
+        print("\n📊 Tempo em ms - primeira chamada (conexão nova) / mediana")
+        print("caso".ljust(largura) + "".join(f" | {p:>19}" for p in perfis))
+        for descricao, _ in casos:
+            linha = descricao.ljust(largura)
+            for perfil in perfis:
+                fria, mediana = resultados[(perfil, descricao)]
+                linha += f" | {fria:8.1f} / {mediana:8.1f}"
+            print(linha)
+    finally:
+        app.db_manager.pool.close_all()
+        app.db_manager.storage.stop_checkpointer()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
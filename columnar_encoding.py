@@ -0,0 +1,85 @@
+# columnar_encoding.py - Formato colunar com dicionário de strings para respostas grandes do Eel
+
+from itertools import chain
+from operator import itemgetter
+
+# Valor do parâmetro ``formato`` que ativa a codificação
+FORMATO_COLUNAR = 'colunar'
+
+# Marca de chave ausente na linha (distinta de None)
+_AUSENTE = object()
+
+
+def _codificar_dicionario(valores):
+    """(índices, dicionário) se a coluna for de strings repetidas; senão None"""
+    if not set(map(type, valores)) <= {str, type(None)}:
+        return None
+    distintos = [valor for valor in dict.fromkeys(valores) if valor is not None]
+    quantidade = len(valores) - valores.count(None)
+    # Só compensa quando as strings se repetem
+    if not distintos or len(distintos) * 2 > quantidade:
+        return None
+    indice_por_valor = {valor: indice for indice, valor in enumerate(distintos)}
+    indice_por_valor[None] = None
+    return list(map(indice_por_valor.__getitem__, valores)), distintos
+
+
+def codificar_colunar(linhas):
+    """Converte uma lista de dicts em colunas (mesmo conteúdo, sem chaves repetidas).
+
+    Formato: ``{"formato": "colunar", "linhas": n, "colunas": [...],
+    "tipos": {coluna: tipo}, "dados": {coluna: ...}, "dicionarios": {...},
+    "ausentes": {...}}``, com os tipos:
+
+    - ``valor``: ``dados[coluna]`` é a lista de valores;
+    - ``dicionario``: strings repetidas; ``dados[coluna]`` tem o índice de cada
+      valor em ``dicionarios[coluna]`` (null = None);
+    - ``objeto``: dicts aninhados (ex.: ``prazo``), codificados recursivamente.
+
+    ``ausentes[coluna]`` lista as linhas que não têm a chave, para que a
+    decodificação (``decodificarColunar`` em web/static/js/utils.js) devolva
+    exatamente os dicts originais.
+    """
+    colunas = list(dict.fromkeys(chain.from_iterable(linhas)))
+    payload = {
+        "formato": FORMATO_COLUNAR,
+        "linhas": len(linhas),
+        "colunas": colunas,
+        "tipos": {},
+        "dados": {},
+        "dicionarios": {},
+        "ausentes": {},
+    }
+    # Todas as linhas com todas as chaves (caso comum): extração sem checagem
+    completas = set(map(len, linhas)) <= {len(colunas)}
+    for coluna in colunas:
+        if completas:
+            valores = list(map(itemgetter(coluna), linhas))
+        else:
+            valores = [linha.get(coluna, _AUSENTE) for linha in linhas]
+        if not completas and _AUSENTE in valores:
+            payload["ausentes"][coluna] = [
+                indice for indice, valor in enumerate(valores) if valor is _AUSENTE
+            ]
+            valores = [valor for valor in valores if valor is not _AUSENTE]
+
+        if valores and set(map(type, valores)) == {dict}:
+            payload["tipos"][coluna] = "objeto"
+            payload["dados"][coluna] = codificar_colunar(valores)
+            continue
+
+        dicionario = _codificar_dicionario(valores)
+        if dicionario:
+            payload["tipos"][coluna] = "dicionario"
+            payload["dados"][coluna], payload["dicionarios"][coluna] = dicionario
+        else:
+            payload["tipos"][coluna] = "valor"
+            payload["dados"][coluna] = valores
+    return payload
+
+
+def aplicar_formato(linhas, formato=None):
+    """Lista no formato pedido pelo chamador (padrão: a própria lista de dicts)"""
+    if formato == FORMATO_COLUNAR:
+        return codificar_colunar(linhas)
+    return linhas
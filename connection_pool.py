@@ -0,0 +1,294 @@
+# connection_pool.py - Pool de conexões SQLite compartilhado
+import functools
+import itertools
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+try:
+    # Eel atende cada chamada em um greenlet; o escopo de conexão é por greenlet
+    from greenlet import getcurrent as _contexto_atual
+except ImportError:  # pragma: no cover - sem greenlet, usa a thread atual
+    _contexto_atual = threading.current_thread
+
+
+class PooledConnection:
+    """Conexão emprestada do pool.
+
+    Repassa tudo para a conexão sqlite3 real; ``close()`` devolve a conexão ao
+    pool em vez de fechá-la, de modo que o código existente
+    (``conn = get_connection() ... conn.close()``) continua funcionando.
+
+    Dentro de ``scope()`` a conexão real é compartilhada por todo o greenlet.
+    Quem a recebe com uma transação já em andamento (de quem chamou) trabalha
+    em um SAVEPOINT: ``commit()`` o libera para a transação externa e
+    ``rollback()`` desfaz só o que foi feito a partir dele. Confirmar ou
+    desfazer a transação toda continua cabendo a quem a iniciou.
+    """
+
+    def __init__(self, pool, conn, compartilhada=False):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_conn', conn)
+        object.__setattr__(self, '_compartilhada', compartilhada)
+        object.__setattr__(self, '_devolvida', False)
+        object.__setattr__(self, '_savepoint', None)
+        if compartilhada:
+            self._abrir_savepoint()
+
+    def __getattr__(self, nome):
+        return getattr(self._conn, nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._conn, nome, valor)
+
+    def __enter__(self):
+        if not self._compartilhada:
+            self._conn.__enter__()
+        return self
+
+    def __exit__(self, tipo, *exc):
+        if not self._compartilhada:
+            return self._conn.__exit__(tipo, *exc)
+        if tipo is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    # ------------------------------------------------------------------
+    # Transações dentro de um escopo
+    # ------------------------------------------------------------------
+    def _abrir_savepoint(self):
+        """Abre um SAVEPOINT se já houver transação de quem chamou"""
+        if self._conn.in_transaction:
+            nome = self._pool._nome_savepoint()
+            self._conn.execute(f"SAVEPOINT {nome}")
+            object.__setattr__(self, '_savepoint', nome)
+
+    def _encerrar_savepoint(self, desfazer):
+        nome = self._savepoint
+        object.__setattr__(self, '_savepoint', None)
+        try:
+            if desfazer:
+                self._conn.execute(f"ROLLBACK TO {nome}")
+            self._conn.execute(f"RELEASE {nome}")
+        except sqlite3.OperationalError:
+            # A transação externa já terminou (e levou o savepoint junto)
+            pass
+
+    def commit(self):
+        if self._savepoint is None:
+            return self._conn.commit()
+        self._encerrar_savepoint(desfazer=False)
+        self._abrir_savepoint()
+
+    def rollback(self):
+        if self._savepoint is None:
+            return self._conn.rollback()
+        self._encerrar_savepoint(desfazer=True)
+        self._abrir_savepoint()
+
+    def close(self):
+        """Devolve a conexão ao pool; no escopo, descarta o que não foi confirmado."""
+        if self._devolvida:
+            return
+        object.__setattr__(self, '_devolvida', True)
+        if not self._compartilhada:
+            self._pool._release(self._conn)
+        elif self._savepoint is not None:
+            self._encerrar_savepoint(desfazer=True)
+        elif self._conn.in_transaction:
+            # Como no close() fora do escopo: transação pendente sem commit é descartada
+            self._conn.rollback()
+
+    def __del__(self):
+        # Funções que esquecem o close() não devem vazar conexões do pool
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Pool de conexões SQLite pré-configuradas.
+
+    - Conexões ociosas são reaproveitadas (LIFO) em vez de reabertas a cada chamada.
+    - Nunca bloqueia esperando conexão: se todas estiverem em uso, abre uma
+      conexão extra (overflow), que é fechada ao ser devolvida. Assim chamadas
+      aninhadas no mesmo greenlet não causam deadlock.
+    - ``scope()`` faz toda uma requisição reutilizar a mesma conexão.
+    """
+
+    def __init__(self, db_path, max_idle=8, timeout=30.0, factory=sqlite3.Connection):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.factory = factory
+        self._configuradores = []
+        self._ociosas = []
+        self._escopos = {}
+        self._savepoints = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "reutilizadas": 0,
+            "criadas": 0,
+            "overflow": 0,
+            "fechadas": 0,
+            "rollbacks_devolucao": 0,
+            "checkouts_em_escopo": 0,
+            "savepoints_escopo": 0,
+            "em_uso": 0,
+            "pico_em_uso": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Configuração
+    # ------------------------------------------------------------------
+    def add_configurator(self, configurador):
+        """Registra função ``configurador(conn)`` aplicada a toda conexão nova.
+
+        Conexões ociosas já existentes são descartadas para que a nova
+        configuração valha para todas as próximas conexões.
+        """
+        with self._lock:
+            self._configuradores.append(configurador)
+            ociosas, self._ociosas = self._ociosas, []
+        for conn in ociosas:
+            self._fechar(conn)
+
+    def _criar(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               factory=self.factory)
+        for configurador in self._configuradores:
+            configurador(conn)
+        with self._lock:
+            self._stats["criadas"] += 1
+        return conn
+
+    def _fechar(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._stats["fechadas"] += 1
+
+    # ------------------------------------------------------------------
+    # Checkout / devolução
+    # ------------------------------------------------------------------
+    def get_connection(self):
+        """Retorna uma conexão do pool (ou a conexão do escopo atual)."""
+        with self._lock:
+            escopo = self._escopos.get(_contexto_atual())
+            if escopo is not None:
+                self._stats["checkouts"] += 1
+                self._stats["checkouts_em_escopo"] += 1
+        if escopo is not None:
+            return PooledConnection(self, escopo[0], compartilhada=True)
+        return PooledConnection(self, self._acquire())
+
+    def _nome_savepoint(self):
+        with self._lock:
+            self._stats["savepoints_escopo"] += 1
+            return f"escopo_{next(self._savepoints)}"
+
+    def _acquire(self):
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["em_uso"] += 1
+            self._stats["pico_em_uso"] = max(self._stats["pico_em_uso"], self._stats["em_uso"])
+            conn = self._ociosas.pop() if self._ociosas else None
+            if conn is not None:
+                self._stats["reutilizadas"] += 1
+            elif self._stats["em_uso"] > self.max_idle:
+                self._stats["overflow"] += 1
+        if conn is None:
+            try:
+                conn = self._criar()
+            except Exception:
+                with self._lock:
+                    self._stats["em_uso"] -= 1
+                raise
+        return conn
+
+    def _release(self, conn):
+        # Transação pendente sem commit é descartada, como no close() original
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+                with self._lock:
+                    self._stats["rollbacks_devolucao"] += 1
+        except sqlite3.Error:
+            self._fechar(conn)
+            with self._lock:
+                self._stats["em_uso"] -= 1
+            return
+        with self._lock:
+            self._stats["em_uso"] -= 1
+            if len(self._ociosas) < self.max_idle:
+                self._ociosas.append(conn)
+                return
+        self._fechar(conn)
+
+    # ------------------------------------------------------------------
+    # Escopo de requisição
+    # ------------------------------------------------------------------
+    @contextmanager
+    def scope(self):
+        """Faz todas as chamadas a ``get_connection()`` do greenlet atual
+        compartilharem uma única conexão até o fim do bloco (reentrante)."""
+        chave = _contexto_atual()
+        with self._lock:
+            escopo = self._escopos.get(chave)
+            if escopo is not None:
+                escopo[1] += 1
+        if escopo is not None:
+            try:
+                yield escopo[0]
+            finally:
+                with self._lock:
+                    escopo[1] -= 1
+            return
+
+        conn = self._acquire()
+        with self._lock:
+            self._escopos[chave] = [conn, 1]
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                del self._escopos[chave]
+            self._release(conn)
+
+    def scoped(self, func):
+        """Decorator: executa ``func`` dentro de ``scope()``."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.scope():
+                return func(*args, **kwargs)
+        return wrapper
+
+    # ------------------------------------------------------------------
+    # Estatísticas e encerramento
+    # ------------------------------------------------------------------
+    def get_stats(self):
+        """Retorna estatísticas de uso do pool"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["ociosas"] = len(self._ociosas)
+            stats["escopos_ativos"] = len(self._escopos)
+        stats["max_ociosas"] = self.max_idle
+        checkouts_pool = stats["checkouts"] - stats["checkouts_em_escopo"]
+        stats["taxa_reuso"] = round(
+            (stats["reutilizadas"] + stats["checkouts_em_escopo"]) / stats["checkouts"], 3
+        ) if stats["checkouts"] else 0.0
+        stats["checkouts_pool"] = checkouts_pool
+        return stats
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas"""
+        with self._lock:
+            ociosas, self._ociosas = self._ociosas, []
+        for conn in ociosas:
+            self._fechar(conn)
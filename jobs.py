@@ -0,0 +1,258 @@
+# jobs.py - Fila de tarefas em segundo plano para funções demoradas
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+import threadpool
+
+try:
+    import gevent
+except ImportError:  # pragma: no cover - sem gevent o progresso é enviado da própria thread
+    gevent = None
+
+# Job em execução na thread atual (usado por reportar_progresso)
+_local = threading.local()
+
+
+class JobCancelado(Exception):
+    """Levantada dentro do job quando o cancelamento foi solicitado"""
+
+
+def reportar_progresso(percentual=None, mensagem=None):
+    """Atualiza o progresso do job atual.
+
+    Pode ser chamada de qualquer função: fora de um job não faz nada. Dentro de
+    um job cancelado levanta ``JobCancelado``, interrompendo o trabalho.
+    """
+    job = getattr(_local, 'job', None)
+    if job is None:
+        return
+    job.atualizar(percentual, mensagem)
+    if job.cancelamento_solicitado:
+        raise JobCancelado()
+
+
+class Job:
+    """Estado de uma tarefa: na_fila -> executando -> concluido/erro/cancelado"""
+
+    def __init__(self, tipo, func, args, kwargs, dono=None):
+        self.id = str(uuid.uuid4())
+        self.tipo = tipo
+        # Usuário que iniciou o job (só ele consulta, cancela e lê o resultado)
+        self.dono = dono
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.status = 'na_fila'
+        self.percentual = 0
+        self.mensagem = None
+        self.resultado = None
+        self.erro = None
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.finalizado_em = None
+        self.cancelamento_solicitado = False
+        self.versao = 0
+        self._lock = threading.Lock()
+
+    def atualizar(self, percentual=None, mensagem=None, status=None):
+        with self._lock:
+            if percentual is not None:
+                self.percentual = max(0, min(100, int(percentual)))
+            if mensagem is not None:
+                self.mensagem = mensagem
+            if status is not None:
+                self.status = status
+            self.versao += 1
+
+    @property
+    def finalizado(self):
+        return self.status in ('concluido', 'erro', 'cancelado')
+
+    def to_dict(self, incluir_resultado=False):
+        def iso(ts):
+            return datetime.fromtimestamp(ts).isoformat(timespec='seconds') if ts else None
+
+        with self._lock:
+            dados = {
+                "job_id": self.id,
+                "tipo": self.tipo,
+                "status": self.status,
+                "percentual": self.percentual,
+                "mensagem": self.mensagem,
+                "erro": self.erro,
+                "criado_em": iso(self.criado_em),
+                "iniciado_em": iso(self.iniciado_em),
+                "finalizado_em": iso(self.finalizado_em),
+                "duracao_ms": round((self.finalizado_em - self.iniciado_em) * 1000, 2)
+                if self.iniciado_em and self.finalizado_em else None,
+            }
+            if incluir_resultado:
+                dados["resultado"] = self.resultado
+        return dados
+
+
+class JobManager:
+    """Executa jobs no threadpool com limite de concorrência.
+
+    - ``submit()`` retorna imediatamente o id do job.
+    - O progresso é enviado ao front-end por ``notificador(dict)`` a partir do
+      loop do gevent (chamadas do Eel para o JS não podem sair de outra thread).
+    - Resultados de jobs finalizados ficam disponíveis por ``ttl_resultados`` segundos.
+    """
+
+    def __init__(self, notificador=None, max_concorrentes=2, ttl_resultados=600,
+                 intervalo_notificacao=0.5):
+        self.notificador = notificador
+        self.max_concorrentes = max_concorrentes
+        self.ttl_resultados = ttl_resultados
+        self.intervalo_notificacao = intervalo_notificacao
+        self._jobs = {}
+        self._fila = deque()
+        self._executando = 0
+        self._lock = threading.Lock()
+        self._versoes_notificadas = {}
+        self._notificador_ativo = False
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def submit(self, tipo, func, *args, dono=None, **kwargs):
+        """Enfileira ``func(*args, **kwargs)`` e retorna o job criado (de ``dono``)"""
+        self._limpar_expirados()
+        job = Job(tipo, func, args, kwargs, dono)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._fila.append(job)
+        self._iniciar_notificador()
+        self._despachar()
+        return job
+
+    def get(self, job_id, dono=None):
+        """Job pelo id; com ``dono``, apenas se pertencer a ele (senão None)"""
+        self._limpar_expirados()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None and dono is not None and job.dono != dono:
+            return None
+        return job
+
+    def cancel(self, job_id, dono=None):
+        """Solicita cancelamento; jobs na fila são cancelados imediatamente"""
+        job = self.get(job_id, dono)
+        if job is None or job.finalizado:
+            return job
+        job.cancelamento_solicitado = True
+        with self._lock:
+            na_fila = job in self._fila
+            if na_fila:
+                self._fila.remove(job)
+        if na_fila:
+            job.finalizado_em = time.time()
+            job.atualizar(mensagem="Cancelado antes de iniciar", status='cancelado')
+            if gevent is None:
+                self._notificar(job)
+        return job
+
+    def list(self, dono=None):
+        self._limpar_expirados()
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if dono is None or job.dono == dono]
+        return [job.to_dict() for job in sorted(jobs, key=lambda j: j.criado_em, reverse=True)]
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+    def _despachar(self):
+        while True:
+            with self._lock:
+                if self._executando >= self.max_concorrentes or not self._fila:
+                    return
+                job = self._fila.popleft()
+                self._executando += 1
+            if gevent is not None:
+                # Greenlet no hub aguarda o threadpool e depois despacha o próximo
+                gevent.spawn(self._executar_e_continuar, job)
+            else:
+                threading.Thread(target=self._executar_e_continuar, args=(job,), daemon=True).start()
+
+    def _executar_e_continuar(self, job):
+        try:
+            threadpool.run_in_threadpool(self._executar)(job)
+        finally:
+            with self._lock:
+                self._executando -= 1
+            self._despachar()
+
+    def _executar(self, job):
+        _local.job = job
+        job.iniciado_em = time.time()
+        job.atualizar(0, "Iniciando", status='executando')
+        try:
+            resultado = job.func(*job.args, **job.kwargs)
+            if job.cancelamento_solicitado:
+                raise JobCancelado()
+            job.resultado = resultado
+            job.finalizado_em = time.time()
+            job.atualizar(100, "Concluído", status='concluido')
+        except JobCancelado:
+            job.finalizado_em = time.time()
+            job.atualizar(mensagem="Cancelado", status='cancelado')
+        except Exception as e:
+            job.erro = str(e)
+            job.finalizado_em = time.time()
+            job.atualizar(mensagem="Erro", status='erro')
+        finally:
+            _local.job = None
+            if gevent is None:
+                self._notificar(job)
+
+    def _limpar_expirados(self):
+        limite = time.time() - self.ttl_resultados
+        with self._lock:
+            expirados = [jid for jid, job in self._jobs.items()
+                         if job.finalizado and job.finalizado_em and job.finalizado_em < limite]
+            for jid in expirados:
+                del self._jobs[jid]
+                self._versoes_notificadas.pop(jid, None)
+
+    # ------------------------------------------------------------------
+    # Notificação de progresso
+    # ------------------------------------------------------------------
+    def _notificar(self, job):
+        if self.notificador is None:
+            return
+        try:
+            self.notificador(job.to_dict())
+        except Exception as e:
+            print(f"⚠️ Erro ao notificar progresso do job {job.id}: {e}")
+
+    def _iniciar_notificador(self):
+        if gevent is None or self.notificador is None:
+            return
+        with self._lock:
+            if self._notificador_ativo:
+                return
+            self._notificador_ativo = True
+        gevent.spawn(self._loop_notificacao)
+
+    def _loop_notificacao(self):
+        """Greenlet no hub: envia ao JS os jobs cujo estado mudou"""
+        while True:
+            with self._lock:
+                jobs = list(self._jobs.values())
+            pendentes = False
+            for job in jobs:
+                if self._versoes_notificadas.get(job.id) != job.versao:
+                    self._versoes_notificadas[job.id] = job.versao
+                    self._notificar(job)
+                if not job.finalizado:
+                    pendentes = True
+            if not pendentes:
+                with self._lock:
+                    if not self._fila and self._executando == 0:
+                        self._notificador_ativo = False
+                        return
+            gevent.sleep(self.intervalo_notificacao)
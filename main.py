@@ -8,13 +8,28 @@ from datetime import datetime, timedelta
 import uuid
 import time
 import json
+import re
 from bottle import route, request, response
 from prazos_andamentos_manager import PrazosAndamentosManager
+from connection_pool import ConnectionPool
+from sqlite_storage import StorageMode, StorageProfile
+import threadpool
+from jobs import JobManager, reportar_progresso
+import metrics
+from slow_query_log import SlowQueryLog
+from schema_capabilities import SchemaCapabilities
+from migration_runner import MigrationRunner
+from backup_manager import BackupManager
+from pagination_cache import PaginationCache
+from columnar_encoding import aplicar_formato
+
+# Toda função exposta ao front-end é instrumentada (latência, SQL, linhas, payload)
+eel.expose = metrics.instrument_expose(eel.expose)
 
 class DatabaseManager:
     """Gerenciador do banco de dados SQLite"""
     
-    def __init__(self):
+    def __init__(self, storage_profile='padrao'):
         # Define o caminho do banco de dados
         if getattr(sys, 'frozen', False):
             # Executável PyInstaller - salva no AppData do usuário
@@ -26,17 +41,61 @@ class DatabaseManager:
             # Desenvolvimento - salva no diretório atual
             self.db_path = 'usuarios.db'
         
+        # Modo de armazenamento: WAL (leitores concorrentes, um escritor)
+        self.storage = StorageMode(journal_mode='wal', busy_timeout_ms=5000)
+        
+        # Colunas/tabelas opcionais verificadas uma única vez em init_database
+        self.schema = SchemaCapabilities()
+        
+        # Migrações versionadas de migrations/ aplicadas na inicialização
+        self.migrations = MigrationRunner(self.db_path, busy_timeout_ms=self.storage.busy_timeout_ms)
+        
+        # Pool compartilhado com o PrazosAndamentosManager
+        self.pool = ConnectionPool(self.db_path, timeout=self.storage.busy_timeout_ms / 1000,
+                                   factory=metrics.InstrumentedConnection)
+        self.pool.add_configurator(self.storage.configure_connection)
+        
+        # Perfil de I/O (mmap, cache de páginas, temp store) - ver StorageProfile.PERFIS
+        self.profile = StorageProfile.from_name(storage_profile)
+        self.pool.add_configurator(self.profile.configure_connection)
         self.init_database()
+        
+        # Log de consultas lentas (tabela rotativa slow_query_log)
+        self.slow_queries = SlowQueryLog(self.db_path, limiar_ms=200,
+                                         busy_timeout_ms=self.storage.busy_timeout_ms)
+        self.slow_queries.start()
+        metrics.registrar_observador_sql(self.slow_queries.observar)
+        
+        # Backups online (API de backup do SQLite); agendamento iniciado em main()
+        self.backups = BackupManager(self.db_path, intervalo_horas=24, retencao=10,
+                                     busy_timeout_ms=self.storage.busy_timeout_ms)
+        
+        # Totais e limites de página das listagens (invalidados por versao_tabelas)
+        self.paginacao = PaginationCache()
     
     def get_connection(self):
-        """Retorna conexão com o banco"""
-        return sqlite3.connect(self.db_path)
+        """Retorna conexão com o banco (emprestada do pool; close() devolve ao pool)"""
+        return self.pool.get_connection()
+    
+    def set_storage_profile(self, nome):
+        """Troca o perfil de I/O; conexões ociosas são descartadas para usar o novo perfil"""
+        self.profile.load(nome)
+        self.pool.close_all()
     
     def init_database(self):
         """Inicializa o banco de dados e cria tabelas"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # Ativar WAL antes de qualquer escrita (configuração persistente no arquivo)
+        self.storage.apply(conn)
+        
+        # Aplicar migrações pendentes (uma transação por etapa; nada a fazer se
+        # atualizado). Banco novo recebe o schema baseline antes das tabelas
+        # abaixo; se uma etapa falhar, o banco é restaurado e MigrationError
+        # interrompe a inicialização
+        self.migrations.run()
+        
         # Não apagar tabelas existentes para evitar perda de dados
 
         # Criar tabela usuarios unificada se não existir
@@ -119,8 +178,14 @@ class DatabaseManager:
         self.create_admin_user(cursor)
         
         conn.commit()
+        
+        # Garantir colunas/tabelas de migrações antigas e carregar flags do schema
+        self.schema.ensure(conn)
         conn.close()
-        print(f"✅ Banco de dados inicializado: {self.db_path}")
+        
+        # Checkpoint automático do WAL em segundo plano
+        self.storage.start_checkpointer(self.db_path)
+        print(f"✅ Banco de dados inicializado: {self.db_path} (journal_mode={self.storage.journal_mode_efetivo})")
     
     def create_admin_user(self, cursor):
         """Cria usuário admin padrão"""
@@ -262,8 +327,13 @@ class DatabaseManager:
             conn.close()
             return {"sucesso": False, "mensagem": f"Erro ao desativar usuário: {str(e)}"}
     
-    def get_paginated_users(self, search_term=None, page=1, per_page=10):
-        """Busca usuários da nova estrutura unificada com paginação e pesquisa, excluindo o admin"""
+    def get_paginated_users(self, search_term=None, page=1, per_page=10, cursor_pagina=None):
+        """Busca usuários da nova estrutura unificada com paginação e pesquisa, excluindo o admin
+        
+        O total vem do PaginationCache e as páginas são lidas por chave (nome, id)
+        a partir da página anterior; cursor_pagina (o proximo_cursor retornado)
+        permite continuar explicitamente de uma página já lida.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         
@@ -277,12 +347,22 @@ class DatabaseManager:
             search_term_like = f"%{search_term}%"
             search_params = [search_term_like, search_term_like]
 
-        # Contar total de usuários
-        cursor.execute(f"SELECT COUNT(*) FROM usuarios {where_clause}", search_params)
-        total_users = cursor.fetchone()[0]
+        # Contar total de usuários (em cache enquanto a tabela não mudar)
+        def contar():
+            cursor.execute(f"SELECT COUNT(*) FROM usuarios {where_clause}", search_params)
+            return cursor.fetchone()[0]
 
-        # Calcular offset para paginação
-        offset = (page - 1) * per_page
+        chave_cache = ('usuarios', search_term or '')
+        total_users, versao = self.paginacao.total(cursor, chave_cache, ('usuarios',), contar)
+
+        # Ponto de partida: cursor explícito, limite da página anterior ou OFFSET
+        if cursor_pagina:
+            limite, paginas_a_pular = tuple(cursor_pagina), 0
+        else:
+            limite, paginas_a_pular = self.paginacao.ponto_de_partida(chave_cache, versao, per_page, page)
+        if limite:
+            where_clause += " AND (nome, id) > (?, ?)"
+            search_params = search_params + list(limite)
 
         # Buscar usuários ordenados por nome
         query = f'''
@@ -290,11 +370,11 @@ class DatabaseManager:
                    created_at, updated_at, ativo, is_encarregado, is_operador, perfil
             FROM usuarios 
             {where_clause}
-            ORDER BY nome ASC
+            ORDER BY nome ASC, id ASC
             LIMIT ? OFFSET ?
         '''
         
-        all_params = search_params + [per_page, offset]
+        all_params = search_params + [per_page, paginas_a_pular * per_page]
         cursor.execute(query, all_params)
         
         all_users = cursor.fetchall()
@@ -324,7 +404,11 @@ class DatabaseManager:
         
         conn.close()
         
-        return {"users": users, "total": total_users}
+        proximo_cursor = [all_users[-1][4], all_users[-1][0]] if all_users else None
+        if not cursor_pagina:
+            self.paginacao.registrar(chave_cache, versao, per_page, page, proximo_cursor)
+        
+        return {"users": users, "total": total_users, "proximo_cursor": proximo_cursor}
     
     def get_stats(self):
         """Retorna estatísticas do sistema baseadas na nova estrutura unificada"""
@@ -361,14 +445,23 @@ class DatabaseManager:
             "novos_hoje": novos_hoje,
             "total_encarregados": total_encarregados,
             "total_operadores": total_operadores,
-            "banco_path": self.db_path
+            "banco_path": self.db_path,
+            "pool_conexoes": self.pool.get_stats(),
+            "armazenamento": self.storage.get_stats(),
+            "perfil_armazenamento": self.profile.get_stats(),
+            "threadpool": threadpool.get_stats(),
+            "consultas_lentas": self.slow_queries.get_stats(),
+            "schema": self.schema.as_dict(),
+            "migracoes": self.migrations.ultimo_resultado,
+            "backups": self.backups.get_stats(),
+            "paginacao": self.paginacao.get_stats()
         }
 
 # Inicializar gerenciador de banco
 db_manager = DatabaseManager()
 
 # Inicializar gerenciador de prazos e andamentos
-prazos_manager = PrazosAndamentosManager(db_manager.db_path)
+prazos_manager = PrazosAndamentosManager(db_manager.db_path, pool=db_manager.pool, schema=db_manager.schema)
 
 # Inicializar Eel
 eel.init('web')
@@ -771,63 +864,7 @@ def cadastrar_usuario(tipo_usuario, posto_graduacao, nome, matricula, is_encarre
 def buscar_pms_envolvidos(procedimento_id):
     """Busca todos os PMs envolvidos em um procedimento"""
     try:
-        conn = db_manager.get_connection()
-        cursor = conn.cursor()
-        
-        # Busca primeiro os dados da tabela de relacionamento
-        cursor.execute("""
-            SELECT id, pm_id, pm_tipo, ordem, status_pm
-            FROM procedimento_pms_envolvidos 
-            WHERE procedimento_id = ?
-            ORDER BY ordem
-        """, (procedimento_id,))
-        
-        pms_relacionamento = cursor.fetchall()
-        
-        resultado = []
-        for pm_rel in pms_relacionamento:
-            pm_envolvido_id, pm_id, pm_tipo_tabela, ordem, status_pm_env = pm_rel
-            
-            # Busca na tabela usuarios unificada
-            cursor.execute("""
-                SELECT nome, posto_graduacao, matricula 
-                FROM usuarios 
-                WHERE id = ? AND ativo = 1
-            """, (pm_id,))
-            
-            pm_data = cursor.fetchone()
-            
-            if pm_data:
-                nome = pm_data[0] or ""
-                posto = pm_data[1] or ""
-                matricula = pm_data[2] or ""
-                
-                # Montar nome completo removendo espaços extras
-                # Se for "A APURAR", mostrar apenas o nome
-                if nome == "A APURAR":
-                    nome_completo = "A APURAR"
-                else:
-                    nome_completo = f"{posto} {matricula} {nome}".strip()
-                    # Remover espaços duplos
-                    nome_completo = " ".join(nome_completo.split())
-                
-                # Buscar indícios associados a este PM
-                indicios = buscar_indicios_por_pm(pm_envolvido_id)
-                
-                resultado.append({
-                    'id': pm_id,
-                    'pm_envolvido_id': pm_envolvido_id,  # Adicionar o ID da tabela de relacionamento
-                    'tipo': pm_tipo_tabela,
-                    'ordem': ordem,
-                    'status_pm': status_pm_env,
-                    'nome': nome,
-                    'posto_graduacao': posto,
-                    'matricula': matricula,
-                    'nome_completo': nome_completo,
-                    'indicios': indicios
-                })
-        
-        conn.close()
+        resultado = carregar_pms_envolvidos_lote([procedimento_id], incluir_indicios=True).get(procedimento_id, [])
         print(f"🔍 Buscar PMs para procedimento {procedimento_id}: encontrou {len(resultado)} PMs")
         for pm in resultado:
             print(f"  - PM: {pm['nome_completo']}")
@@ -842,117 +879,190 @@ def buscar_indicios_por_pm(pm_envolvido_id):
     try:
         conn = db_manager.get_connection()
         cursor = conn.cursor()
+        indicios = _carregar_indicios_pms_lote(cursor, [pm_envolvido_id]).get(pm_envolvido_id)
+        conn.close()
+        return indicios
+    except Exception as e:
+        print(f"Erro ao buscar indícios do PM {pm_envolvido_id}: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+# Máximo de parâmetros por cláusula IN (limite de variáveis do SQLite)
+TAMANHO_LOTE_IN = 500
+
+def _em_lotes(valores, tamanho=TAMANHO_LOTE_IN):
+    """Divide uma lista de ids em lotes para cláusulas IN (...)"""
+    valores = list(dict.fromkeys(v for v in valores if v is not None))
+    for inicio in range(0, len(valores), tamanho):
+        yield valores[inicio:inicio + tamanho]
+
+def carregar_pms_envolvidos_lote(procedimento_ids, incluir_indicios=False):
+    """Carrega os PMs envolvidos de vários procedimentos de uma vez.
+    
+    Retorna {procedimento_id: [pm, ...]} com os mesmos campos de buscar_pms_envolvidos.
+    Usa 1 consulta por lote de ids (+4 quando incluir_indicios=True), independente
+    da quantidade de procedimentos e de PMs.
+    """
+    resultado = {pid: [] for pid in procedimento_ids}
+    if not resultado:
+        return resultado
+    
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        registros = []
+        for lote in _em_lotes(resultado.keys()):
+            marcadores = ','.join('?' * len(lote))
+            cursor.execute(f"""
+                SELECT pe.procedimento_id, pe.id, pe.pm_id, pe.pm_tipo, pe.ordem, pe.status_pm,
+                       u.nome, u.posto_graduacao, u.matricula
+                FROM procedimento_pms_envolvidos pe
+                JOIN usuarios u ON u.id = pe.pm_id AND u.ativo = 1
+                WHERE pe.procedimento_id IN ({marcadores})
+                ORDER BY pe.procedimento_id, pe.ordem
+            """, lote)
+            registros.extend(cursor.fetchall())
         
-        # Buscar o registro principal de indícios
-        cursor.execute("""
-            SELECT id, categorias_indicios, categoria
+        indicios_por_pm = {}
+        if incluir_indicios:
+            indicios_por_pm = _carregar_indicios_pms_lote(cursor, [r[1] for r in registros])
+    finally:
+        conn.close()
+    
+    for (procedimento_id, pm_envolvido_id, pm_id, pm_tipo_tabela, ordem, status_pm_env,
+         nome, posto, matricula) in registros:
+        nome = nome or ""
+        posto = posto or ""
+        matricula = matricula or ""
+        
+        # Se for "A APURAR", mostrar apenas o nome
+        if nome == "A APURAR":
+            nome_completo = "A APURAR"
+        else:
+            nome_completo = " ".join(f"{posto} {matricula} {nome}".split())
+        
+        resultado[procedimento_id].append({
+            'id': pm_id,
+            'pm_envolvido_id': pm_envolvido_id,
+            'tipo': pm_tipo_tabela,
+            'ordem': ordem,
+            'status_pm': status_pm_env,
+            'nome': nome,
+            'posto_graduacao': posto,
+            'matricula': matricula,
+            'nome_completo': nome_completo,
+            'indicios': indicios_por_pm.get(pm_envolvido_id)
+        })
+    return resultado
+
+def _carregar_indicios_pms_lote(cursor, pm_envolvido_ids):
+    """Carrega os indícios de vários PMs envolvidos: {pm_envolvido_id: indicios}"""
+    import json
+    
+    # Registro principal de indícios (o primeiro ativo de cada PM)
+    principais = {}
+    for lote in _em_lotes(pm_envolvido_ids):
+        marcadores = ','.join('?' * len(lote))
+        cursor.execute(f"""
+            SELECT id, pm_envolvido_id, categorias_indicios, categoria
             FROM pm_envolvido_indicios 
-            WHERE pm_envolvido_id = ? AND ativo = 1
-        """, (pm_envolvido_id,))
-        
-        indicios_result = cursor.fetchone()
-        if not indicios_result:
-            conn.close()
-            return None
+            WHERE pm_envolvido_id IN ({marcadores}) AND ativo = 1
+        """, lote)
+        for indicios_id, pm_envolvido_id, categorias_json, categoria_texto in cursor.fetchall():
+            if pm_envolvido_id in principais:
+                continue
             
-        indicios_id, categorias_json, categoria_texto = indicios_result
-        
-        # Parse das categorias do JSON
-        categorias = []
-        if categorias_json:
-            try:
-                import json
-                categorias = json.loads(categorias_json)
-                if not isinstance(categorias, list):
-                    categorias = [str(categorias)]
-            except:
-                if categoria_texto:
-                    categorias = [categoria_texto]
-        elif categoria_texto:
-            categorias = [categoria_texto]
+            # Parse das categorias do JSON
+            categorias = []
+            if categorias_json:
+                try:
+                    categorias = json.loads(categorias_json)
+                    if not isinstance(categorias, list):
+                        categorias = [str(categorias)]
+                except Exception:
+                    if categoria_texto:
+                        categorias = [categoria_texto]
+            elif categoria_texto:
+                categorias = [categoria_texto]
+            
+            principais[pm_envolvido_id] = (indicios_id, {
+                "categorias": categorias,
+                "crimes": [],
+                "rdpm": [],
+                "art29": []
+            })
+    
+    por_indicios_id = {indicios_id: dados for indicios_id, dados in principais.values()}
+    for lote in _em_lotes(por_indicios_id.keys()):
+        marcadores = ','.join('?' * len(lote))
         
-        # Buscar crimes associados
-        crimes = []
-        cursor.execute("""
-            SELECT c.id, c.tipo, c.dispositivo_legal, c.artigo, c.descricao_artigo, 
+        # Crimes associados
+        cursor.execute(f"""
+            SELECT pec.pm_indicios_id, c.id, c.tipo, c.dispositivo_legal, c.artigo, c.descricao_artigo, 
                    c.paragrafo, c.inciso, c.alinea
             FROM pm_envolvido_crimes pec
             JOIN crimes_contravencoes c ON c.id = pec.crime_id
-            WHERE pec.pm_indicios_id = ?
-        """, (indicios_id,))
-        
+            WHERE pec.pm_indicios_id IN ({marcadores})
+        """, lote)
         for row in cursor.fetchall():
-            codigo = f"{row[2]} Art. {row[3]}"
-            if row[5]:  # parágrafo
-                codigo += f" §{row[5]}"
-            if row[6]:  # inciso
-                codigo += f" {row[6]}"
-            if row[7]:  # alínea
+            codigo = f"{row[3]} Art. {row[4]}"
+            if row[6]:  # parágrafo
+                codigo += f" §{row[6]}"
+            if row[7]:  # inciso
                 codigo += f" {row[7]}"
-                
-            crimes.append({
-                "id": row[0],
-                "tipo": row[1],
+            if row[8]:  # alínea
+                codigo += f" {row[8]}"
+            por_indicios_id[row[0]]["crimes"].append({
+                "id": row[1],
+                "tipo": row[2],
                 "codigo": codigo,
-                "descricao": row[4] or ""
+                "descricao": row[5] or ""
             })
         
-        # Buscar transgressões RDPM associadas
-        rdpm = []
-        cursor.execute("""
-            SELECT t.id, t.gravidade, t.inciso, t.texto
+        # Transgressões RDPM associadas
+        cursor.execute(f"""
+            SELECT per.pm_indicios_id, t.id, t.gravidade, t.inciso, t.texto
             FROM pm_envolvido_rdpm per
             JOIN transgressoes t ON t.id = per.transgressao_id
-            WHERE per.pm_indicios_id = ?
-        """, (indicios_id,))
-        
+            WHERE per.pm_indicios_id IN ({marcadores})
+        """, lote)
         for row in cursor.fetchall():
-            rdpm.append({
-                "id": row[0],
-                "natureza": row[1],
-                "inciso": row[2],
-                "texto": row[3]
+            por_indicios_id[row[0]]["rdpm"].append({
+                "id": row[1],
+                "natureza": row[2],
+                "inciso": row[3],
+                "texto": row[4]
             })
         
-        # Buscar infrações Art. 29 associadas
-        art29 = []
-        cursor.execute("""
-            SELECT a.id, a.inciso, a.texto
+        # Infrações Art. 29 associadas
+        cursor.execute(f"""
+            SELECT pea.pm_indicios_id, a.id, a.inciso, a.texto
             FROM pm_envolvido_art29 pea
             JOIN infracoes_estatuto_art29 a ON a.id = pea.art29_id
-            WHERE pea.pm_indicios_id = ?
-        """, (indicios_id,))
-        
+            WHERE pea.pm_indicios_id IN ({marcadores})
+        """, lote)
         for row in cursor.fetchall():
-            art29.append({
-                "id": row[0],
-                "inciso": row[1],
-                "texto": row[2]
+            por_indicios_id[row[0]]["art29"].append({
+                "id": row[1],
+                "inciso": row[2],
+                "texto": row[3]
             })
-        
-        conn.close()
-        
-        return {
-            "categorias": categorias,
-            "crimes": crimes,
-            "rdpm": rdpm,
-            "art29": art29
-        }
-        
-    except Exception as e:
-        print(f"Erro ao buscar indícios do PM {pm_envolvido_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    
+    return {pm_envolvido_id: dados for pm_envolvido_id, (_, dados) in principais.items()}
 
 @eel.expose
-def listar_usuarios(search_term=None, page=1, per_page=10):
+def listar_usuarios(search_term=None, page=1, per_page=10, cursor_pagina=None):
     """Lista todos os usuários cadastrados com paginação e pesquisa"""
-    return db_manager.get_paginated_users(search_term, page, per_page)
+    return db_manager.get_paginated_users(search_term, page, per_page, cursor_pagina)
 
 @eel.expose
-def listar_todos_usuarios():
-    """Lista todos os usuários da nova estrutura unificada"""
+def listar_todos_usuarios(formato=None):
+    """Lista todos os usuários da nova estrutura unificada
+    
+    formato='colunar' devolve as colunas com dicionário de strings
+    (ver columnar_encoding.codificar_colunar).
+    """
     conn = db_manager.get_connection()
     cursor = conn.cursor()
     
@@ -995,7 +1105,7 @@ def listar_todos_usuarios():
             })
         
         conn.close()
-        return usuarios
+        return aplicar_formato(usuarios, formato)
         
     except Exception as e:
         print(f"Erro ao listar usuários: {e}")
@@ -1049,7 +1159,7 @@ def listar_encarregados_operadores():
 def obter_usuario_detalhado(user_id, user_type):
     """Obtém detalhes completos de um usuário para edição"""
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -1104,7 +1214,7 @@ def atualizar_usuario(user_id, user_type, tipo_usuario, posto_graduacao, nome, m
             if not perfil:
                 return {"sucesso": False, "mensagem": "Perfil é obrigatório para operadores!"}
 
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         # Atualizar usuário
@@ -1176,6 +1286,7 @@ def verificar_admin():
     return False
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatisticas_encarregados():
     """Retorna estatísticas detalhadas por encarregado"""
     try:
@@ -1191,6 +1302,53 @@ def obter_estatisticas_encarregados():
         ''')
         encarregados = cursor.fetchall()
         
+        # Matriz encarregado × tipo em uma única passada: cada processo ativo
+        # gera uma linha por papel preenchido; agrupando por (usuário, processo)
+        # o processo conta uma vez mesmo quando a pessoa ocupa mais de um papel.
+        # 'conselho' = responsável, presidente, interrogante ou escrivão do processo
+        cursor.execute('''
+            WITH papeis AS (
+                SELECT id, tipo_detalhe, responsavel_id AS usuario_id, 'responsavel' AS papel
+                FROM processos_procedimentos WHERE ativo = 1
+                UNION ALL
+                SELECT id, tipo_detalhe, escrivao_id, 'escrivao'
+                FROM processos_procedimentos WHERE ativo = 1
+                UNION ALL
+                SELECT id, tipo_detalhe, presidente_id, 'conselho'
+                FROM processos_procedimentos WHERE ativo = 1
+                UNION ALL
+                SELECT id, tipo_detalhe, interrogante_id, 'conselho'
+                FROM processos_procedimentos WHERE ativo = 1
+                UNION ALL
+                SELECT id, tipo_detalhe, escrivao_processo_id, 'conselho'
+                FROM processos_procedimentos WHERE ativo = 1
+            ),
+            por_processo AS (
+                SELECT usuario_id, tipo_detalhe,
+                       MAX(papel = 'responsavel') AS responsavel,
+                       MAX(papel = 'escrivao') AS escrivao,
+                       MAX(papel IN ('responsavel', 'conselho')) AS conselho
+                FROM papeis
+                WHERE usuario_id IS NOT NULL
+                GROUP BY usuario_id, id
+            )
+            SELECT usuario_id,
+                   SUM(responsavel AND tipo_detalhe IN ('SR', 'SINDICANCIA')),
+                   SUM(responsavel AND tipo_detalhe IN ('FP', 'FEITO_PRELIMINAR')),
+                   SUM(responsavel AND tipo_detalhe IN ('IPM', 'IPPM')),
+                   SUM(escrivao AND tipo_detalhe IN ('IPM', 'IPPM')),
+                   SUM(responsavel AND tipo_detalhe = 'PADS'),
+                   SUM(conselho AND tipo_detalhe = 'PAD'),
+                   SUM(conselho AND tipo_detalhe = 'CD'),
+                   SUM(conselho AND tipo_detalhe = 'CJ'),
+                   SUM(conselho AND tipo_detalhe = 'PADE'),
+                   SUM(responsavel AND tipo_detalhe = 'CP')
+            FROM por_processo
+            GROUP BY usuario_id
+        ''')
+        chaves = ('sr', 'fp', 'ipm', 'escrivao', 'pads', 'pad', 'cd', 'cj', 'pade', 'cp')
+        matriz = {row[0]: row[1:] for row in cursor.fetchall()}
+        
         estatisticas = []
         total_processos = 0
         mais_ativo = {"nome": "N/A", "total": 0}
@@ -1199,111 +1357,7 @@ def obter_estatisticas_encarregados():
             enc_id, posto, matricula, nome = encarregado
             nome_completo = f"{posto} {matricula} {nome}"
             
-            # Inicializar contadores
-            contadores = {
-                'sr': 0, 'fp': 0, 'ipm': 0, 'escrivao': 0,
-                'pads': 0, 'pad': 0, 'cd': 0, 'cj': 0
-            }
-            
-            # SR e Sindicâncias (como responsável)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE responsavel_id = ? 
-                AND (tipo_detalhe = 'SR' OR tipo_detalhe = 'SINDICANCIA')
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['sr'] = result[0] if result else 0
-            
-            # FP - Feito Preliminar (como responsável)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE responsavel_id = ? 
-                AND (tipo_detalhe = 'FP' OR tipo_detalhe = 'FEITO_PRELIMINAR')
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['fp'] = result[0] if result else 0
-            
-            # IPM (como responsável)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE responsavel_id = ? 
-                AND (tipo_detalhe = 'IPM' OR tipo_detalhe = 'IPPM')
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['ipm'] = result[0] if result else 0
-            
-            # Escrivão (quando foi escrivão em IPM)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE escrivao_id = ?
-                AND (tipo_detalhe = 'IPM' OR tipo_detalhe = 'IPPM')
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['escrivao'] = result[0] if result else 0
-            
-            # PADS (como responsável)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE responsavel_id = ? 
-                AND tipo_detalhe = 'PADS'
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['pads'] = result[0] if result else 0
-            
-            # PAD (como responsável, presidente, interrogante ou escrivão do processo)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE (responsavel_id = ? OR presidente_id = ? OR interrogante_id = ? OR escrivao_processo_id = ?)
-                AND tipo_detalhe = 'PAD'
-                AND ativo = 1
-            ''', (enc_id, enc_id, enc_id, enc_id))
-            result = cursor.fetchone()
-            contadores['pad'] = result[0] if result else 0
-            
-            # CD - Conselho de Disciplina (como responsável, presidente, interrogante ou escrivão do processo)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE (responsavel_id = ? OR presidente_id = ? OR interrogante_id = ? OR escrivao_processo_id = ?)
-                AND tipo_detalhe = 'CD'
-                AND ativo = 1
-            ''', (enc_id, enc_id, enc_id, enc_id))
-            result = cursor.fetchone()
-            contadores['cd'] = result[0] if result else 0
-            
-            # CJ - Conselho de Justificação (como responsável, presidente, interrogante ou escrivão do processo)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE (responsavel_id = ? OR presidente_id = ? OR interrogante_id = ? OR escrivao_processo_id = ?)
-                AND tipo_detalhe = 'CJ'
-                AND ativo = 1
-            ''', (enc_id, enc_id, enc_id, enc_id))
-            result = cursor.fetchone()
-            contadores['cj'] = result[0] if result else 0
-            
-            # PADE - Processo Administrativo Disciplinar Especial (como responsável, presidente, interrogante ou escrivão do processo)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE (responsavel_id = ? OR presidente_id = ? OR interrogante_id = ? OR escrivao_processo_id = ?)
-                AND tipo_detalhe = 'PADE'
-                AND ativo = 1
-            ''', (enc_id, enc_id, enc_id, enc_id))
-            result = cursor.fetchone()
-            contadores['pade'] = result[0] if result else 0
-            
-            # CP - Conselho Permanente (como responsável)
-            cursor.execute('''
-                SELECT COUNT(*) FROM processos_procedimentos 
-                WHERE responsavel_id = ?
-                AND tipo_detalhe = 'CP'
-                AND ativo = 1
-            ''', (enc_id,))
-            result = cursor.fetchone()
-            contadores['cp'] = result[0] if result else 0
+            contadores = dict(zip(chaves, matriz.get(enc_id, (0,) * len(chaves))))
             
             # Calcular total para este encarregado
             total_encarregado = sum(contadores.values())
@@ -1352,7 +1406,7 @@ def obter_ultimos_feitos_encarregado(encarregado_id):
                "data_recebimento", "data_remessa"}] ou "erro": str}
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         print(f"🔍 Buscando últimos feitos para encarregado ID: {encarregado_id}")
@@ -1413,15 +1467,18 @@ def obter_ultimos_feitos_encarregado(encarregado_id):
 
 @eel.expose
 def obter_anos_disponiveis():
-    """Retorna lista de anos com processos/procedimentos cadastrados"""
+    """Retorna lista de anos com processos/procedimentos cadastrados
+    
+    Lê a dimensão processo_anos (anos de instauração dos processos ativos,
+    mantida por triggers).
+    """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT DISTINCT strftime('%Y', data_instauracao) as ano
-            FROM processos_procedimentos
-            WHERE data_instauracao IS NOT NULL AND ativo = 1
+            SELECT ano FROM processo_anos
+            WHERE quantidade > 0
             ORDER BY ano DESC
         ''')
         
@@ -1437,20 +1494,21 @@ def obter_anos_disponiveis():
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_pads_solucoes(ano=None):
     """
     Estatística 1: Quantidade de PADS concluídos por tipo de solução
     (punido, absolvido, arquivado)
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = "WHERE tipo_detalhe = 'PADS' AND concluido = 1 AND ativo = 1"
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', data_instauracao) = ?"
+            where_clause += " AND ano_instauracao = ?"
             params.append(ano)
         
         cursor.execute(f'''
@@ -1481,21 +1539,40 @@ def obter_estatistica_pads_solucoes(ano=None):
         print(f"❌ Erro em obter_estatistica_pads_solucoes: {e}")
         return {"sucesso": False, "erro": str(e)}
 
+# Processo p com transgressão (RDPM ou Art. 29) nos indícios de algum PM.
+# Subconsultas correlacionadas: cada processo filtrado é resolvido pelos índices
+# de pm_envolvido_indicios(procedimento_id) e das associações (pm_indicios_id),
+# sem percorrer as tabelas de indícios inteiras (procedimento_id é NOT NULL,
+# então NOT EXISTS equivale ao NOT IN anterior)
+_SQL_PROCESSO_COM_TRANSGRESSAO = """(
+    EXISTS (
+        SELECT 1 FROM pm_envolvido_indicios i
+        INNER JOIN pm_envolvido_rdpm r ON i.id = r.pm_indicios_id
+        WHERE i.procedimento_id = p.id
+    )
+    OR EXISTS (
+        SELECT 1 FROM pm_envolvido_indicios i
+        INNER JOIN pm_envolvido_art29 a ON i.id = a.pm_indicios_id
+        WHERE i.procedimento_id = p.id
+    )
+)"""
+
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_ipm_indicios(ano=None):
     """
     Estatística 2: Quantidade de IPM concluídos por tipo de indício
     (crime militar, transgressões disciplinares, sem indícios)
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = "WHERE p.tipo_detalhe IN ('IPM', 'IPPM') AND p.concluido = 1 AND p.ativo = 1"
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         # Crime Militar (verifica no JSON categorias_indicios)
@@ -1510,39 +1587,24 @@ def obter_estatistica_ipm_indicios(ano=None):
         
         # Transgressões (verifica nas tabelas pm_envolvido_rdpm e pm_envolvido_art29)
         cursor.execute(f'''
-            SELECT COUNT(DISTINCT p.id)
+            SELECT COUNT(*)
             FROM processos_procedimentos p
-            WHERE p.id IN (
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_rdpm r ON i.id = r.pm_indicios_id
-                UNION
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_art29 a ON i.id = a.pm_indicios_id
-            )
-            {where_clause.replace('WHERE', 'AND')}
+            {where_clause}
+            AND {_SQL_PROCESSO_COM_TRANSGRESSAO}
         ''', params)
         transgressoes = cursor.fetchone()[0]
         
         # Sem indícios (não tem crime militar, nem transgressões)
         cursor.execute(f'''
-            SELECT COUNT(DISTINCT p.id)
+            SELECT COUNT(*)
             FROM processos_procedimentos p
             {where_clause}
-            AND p.id NOT IN (
-                SELECT procedimento_id FROM pm_envolvido_indicios 
-                WHERE categorias_indicios LIKE '%crime militar%' OR categoria LIKE '%crime militar%'
-            )
-            AND p.id NOT IN (
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_rdpm r ON i.id = r.pm_indicios_id
-                UNION
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_art29 a ON i.id = a.pm_indicios_id
+            AND NOT EXISTS (
+                SELECT 1 FROM pm_envolvido_indicios i
+                WHERE i.procedimento_id = p.id
+                AND (i.categorias_indicios LIKE '%crime militar%' OR i.categoria LIKE '%crime militar%')
             )
+            AND NOT {_SQL_PROCESSO_COM_TRANSGRESSAO}
         ''', params)
         sem_indicios = cursor.fetchone()[0]
         
@@ -1564,20 +1626,21 @@ def obter_estatistica_ipm_indicios(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_sr_indicios(ano=None):
     """
     Estatística 3: Quantidade de SR concluídos por tipo de indício
     (crime comum, transgressões disciplinares, sem indícios)
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = "WHERE p.tipo_detalhe = 'SR' AND p.concluido = 1 AND p.ativo = 1"
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         # Crime Comum (verifica no JSON categorias_indicios)
@@ -1592,39 +1655,24 @@ def obter_estatistica_sr_indicios(ano=None):
         
         # Transgressões (verifica nas tabelas pm_envolvido_rdpm e pm_envolvido_art29)
         cursor.execute(f'''
-            SELECT COUNT(DISTINCT p.id)
+            SELECT COUNT(*)
             FROM processos_procedimentos p
-            WHERE p.id IN (
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_rdpm r ON i.id = r.pm_indicios_id
-                UNION
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_art29 a ON i.id = a.pm_indicios_id
-            )
-            {where_clause.replace('WHERE', 'AND')}
+            {where_clause}
+            AND {_SQL_PROCESSO_COM_TRANSGRESSAO}
         ''', params)
         transgressoes = cursor.fetchone()[0]
         
         # Sem indícios
         cursor.execute(f'''
-            SELECT COUNT(DISTINCT p.id)
+            SELECT COUNT(*)
             FROM processos_procedimentos p
             {where_clause}
-            AND p.id NOT IN (
-                SELECT procedimento_id FROM pm_envolvido_indicios 
-                WHERE categorias_indicios LIKE '%crime comum%' OR categoria LIKE '%crime comum%'
-            )
-            AND p.id NOT IN (
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_rdpm r ON i.id = r.pm_indicios_id
-                UNION
-                SELECT i.procedimento_id 
-                FROM pm_envolvido_indicios i
-                INNER JOIN pm_envolvido_art29 a ON i.id = a.pm_indicios_id
+            AND NOT EXISTS (
+                SELECT 1 FROM pm_envolvido_indicios i
+                WHERE i.procedimento_id = p.id
+                AND (i.categorias_indicios LIKE '%crime comum%' OR i.categoria LIKE '%crime comum%')
             )
+            AND NOT {_SQL_PROCESSO_COM_TRANSGRESSAO}
         ''', params)
         sem_indicios = cursor.fetchone()[0]
         
@@ -1646,13 +1694,14 @@ def obter_estatistica_sr_indicios(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_top10_transgressoes(ano=None):
     """
     Estatística 4: Top 10 transgressões mais recorrentes como indícios em IPM/SR concluídos
     Retorna artigo formatado (Art. 17, Inciso I) e descrição
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause_ipm = "WHERE p.tipo_detalhe IN ('IPM', 'IPPM') AND p.concluido = 1 AND p.ativo = 1"
@@ -1660,8 +1709,8 @@ def obter_top10_transgressoes(ano=None):
         params = []
         
         if ano:
-            where_clause_ipm += " AND strftime('%Y', p.data_instauracao) = ?"
-            where_clause_sr += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause_ipm += " AND p.ano_instauracao = ?"
+            where_clause_sr += " AND p.ano_instauracao = ?"
             params = [ano, ano]
         
         # UNION de transgressões RDPM de IPM e SR
@@ -1764,20 +1813,21 @@ def obter_top10_transgressoes(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_ranking_motoristas_sinistros(ano=None):
     """
     Estatística 5: Ranking de PMs motoristas em sinistros de trânsito
     Inclui TODOS os procedimentos (em andamento e concluídos)
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = "WHERE p.motorista_id IS NOT NULL AND p.ativo = 1"
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         cursor.execute(f'''
@@ -1814,20 +1864,21 @@ def obter_ranking_motoristas_sinistros(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_naturezas_apuradas(ano=None):
     """
     Estatística 6: Principais naturezas apuradas em procedimentos
     Conta todos os procedimentos (em andamento e concluídos) que possuem natureza_procedimento
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = "WHERE p.natureza_procedimento IS NOT NULL AND p.natureza_procedimento != '' AND p.ativo = 1"
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         cursor.execute(f'''
@@ -1861,13 +1912,14 @@ def obter_estatistica_naturezas_apuradas(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_crimes_militares_ipm(ano=None):
     """
     Estatística 7: Crimes militares apontados em IPM
     Lista todos os crimes militares vinculados a IPMs
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = """WHERE p.tipo_detalhe = 'IPM' 
@@ -1877,7 +1929,7 @@ def obter_estatistica_crimes_militares_ipm(ano=None):
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         cursor.execute(f'''
@@ -1914,13 +1966,14 @@ def obter_estatistica_crimes_militares_ipm(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatistica_crimes_comuns(ano=None):
     """
     Estatística 8: Crimes comuns apontados em SR e IPM
     Lista todos os crimes comuns vinculados a IPMs e SRs
     """
     try:
-        conn = sqlite3.connect('usuarios.db')
+        conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         where_clause = """WHERE p.tipo_detalhe IN ('IPM', 'SR') 
@@ -1930,7 +1983,7 @@ def obter_estatistica_crimes_comuns(ano=None):
         params = []
         
         if ano:
-            where_clause += " AND strftime('%Y', p.data_instauracao) = ?"
+            where_clause += " AND p.ano_instauracao = ?"
             params.append(ano)
         
         cursor.execute(f'''
@@ -1967,6 +2020,7 @@ def obter_estatistica_crimes_comuns(ano=None):
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatisticas_processos_andamento():
     """Retorna estatísticas dos processos em andamento por tipo"""
     try:
@@ -2026,11 +2080,79 @@ def obter_estatisticas_processos_andamento():
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatisticas():
     """Retorna estatísticas do sistema"""
-    return db_manager.get_stats()
+    stats = db_manager.get_stats()
+    # Endpoints com maior tempo acumulado (detalhes em obter_metricas_endpoints)
+    stats["endpoints_mais_lentos"] = metrics.metricas.resumo(limite=10)
+    return stats
 
 @eel.expose
+def obter_metricas_endpoints(ordenar_por='tempo_total_ms', limite=None):
+    """Retorna as métricas por endpoint (latência, SQL, linhas, payload) - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    return {
+        "sucesso": True,
+        "desde": datetime.fromtimestamp(metrics.metricas.inicio).strftime("%Y-%m-%d %H:%M:%S"),
+        "endpoints": metrics.metricas.resumo(ordenar_por=ordenar_por, limite=limite)
+    }
+
+@eel.expose
+def listar_consultas_lentas(limite=50, ordenar_por='registrado_em'):
+    """Lista as consultas lentas registradas, com o plano de execução - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    try:
+        return {
+            "sucesso": True,
+            "consultas": db_manager.slow_queries.listar(limite, ordenar_por),
+            "config": db_manager.slow_queries.get_stats()
+        }
+    except Exception as e:
+        return {"sucesso": False, "mensagem": f"Erro ao listar consultas lentas: {str(e)}"}
+
+@eel.expose
+def configurar_consultas_lentas(limiar_ms):
+    """Altera o limiar (ms) do log de consultas lentas; None desativa - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    db_manager.slow_queries.limiar_ms = None if limiar_ms is None else float(limiar_ms)
+    return {"sucesso": True, "config": db_manager.slow_queries.get_stats()}
+
+@eel.expose
+@threadpool.run_in_threadpool
+def executar_backup_agora():
+    """Executa um backup online imediatamente - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    return db_manager.backups.executar_backup('manual')
+
+@eel.expose
+def listar_backups():
+    """Lista os backups online disponíveis e o histórico de execução - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    try:
+        return {
+            "sucesso": True,
+            "backups": db_manager.backups.listar(),
+            "status": db_manager.backups.get_stats()
+        }
+    except Exception as e:
+        return {"sucesso": False, "mensagem": f"Erro ao listar backups: {str(e)}"}
+
+@eel.expose
+def limpar_metricas_endpoints():
+    """Zera as métricas por endpoint - somente admin"""
+    if not (usuario_logado and usuario_logado.get('is_admin')):
+        return {"sucesso": False, "mensagem": "Acesso restrito a administradores"}
+    metrics.metricas.limpar()
+    return {"sucesso": True, "mensagem": "Métricas zeradas"}
+
+@eel.expose
+@threadpool.run_in_threadpool
 def registrar_processo(
     numero, tipo_geral, tipo_detalhe, documento_iniciador, processo_sei, responsavel_id, responsavel_tipo,
     local_origem=None, local_fatos=None, data_instauracao=None, data_recebimento=None, escrivao_id=None, status_pm=None, nome_pm_id=None,
@@ -2104,56 +2226,7 @@ def registrar_processo(
         conn = db_manager.get_connection()
         cursor = conn.cursor()
 
-        # Garantir existência das novas colunas/tabelas (idempotente)
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN data_remessa_encarregado DATE")
-        except Exception:
-            pass
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN data_julgamento DATE")
-        except Exception:
-            pass
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN solucao_tipo TEXT")
-        except Exception:
-            pass
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN penalidade_tipo TEXT")
-        except Exception:
-            pass
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN penalidade_dias INTEGER")
-        except Exception:
-            pass
-        try:
-            cursor.execute("ALTER TABLE processos_procedimentos ADD COLUMN indicios_categorias TEXT")
-        except Exception:
-            pass
-        # Tabelas de associação para indícios
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS procedimentos_indicios_crimes (
-                id TEXT PRIMARY KEY,
-                procedimento_id TEXT NOT NULL,
-                crime_id TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS procedimentos_indicios_rdpm (
-                id TEXT PRIMARY KEY,
-                procedimento_id TEXT NOT NULL,
-                transgressao_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS procedimentos_indicios_art29 (
-                id TEXT PRIMARY KEY,
-                procedimento_id TEXT NOT NULL,
-                art29_id INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        # Colunas novas e tabelas de indícios são garantidas em init_database (db_manager.schema)
 
     # Verificações específicas antes da inserção para mensagens de erro mais precisas
         print(f"🔍 Verificando conflitos para: número={numero}, tipo={tipo_detalhe}, doc={documento_iniciador}, local={local_origem}, ano={ano_instauracao}")
@@ -2357,13 +2430,8 @@ def registrar_processo(
 
         _insert_indicios(indicios_crimes, 'procedimentos_indicios_crimes', 'crime_id')
         _insert_indicios(indicios_rdpm, 'procedimentos_indicios_rdpm', 'transgressao_id')
-        # Detectar nome correto da coluna (migrações antigas podem ter infracao_id)
-        try:
-            cursor.execute("PRAGMA table_info(procedimentos_indicios_art29)")
-            cols_art29 = [r[1] for r in cursor.fetchall()]
-            col_art29 = 'art29_id' if 'art29_id' in cols_art29 else ('infracao_id' if 'infracao_id' in cols_art29 else 'art29_id')
-        except Exception:
-            col_art29 = 'art29_id'
+        # Nome correto da coluna (migrações antigas podem ter infracao_id)
+        col_art29 = db_manager.schema.art29_fk
         _insert_indicios(indicios_art29, 'procedimentos_indicios_art29', col_art29)
 
         # ======== PROCESSAR INDÍCIOS POR PM (MIGRAÇÃO 015) ========
@@ -2470,13 +2538,8 @@ def registrar_processo(
         traceback.print_exc()
         return {"sucesso": False, "mensagem": f"Erro ao registrar processo/procedimento: {str(e)}"}
 
-@eel.expose
-def listar_processos():
-    """Lista todos os processos cadastrados"""
-    conn = db_manager.get_connection()
-    cursor = conn.cursor()
-
-    cursor.execute("""
+# Consulta da listagem geral de processos (listar_processos e listar_processos_stream)
+SQL_LISTAR_PROCESSOS = """
         SELECT 
             p.id, p.numero, p.tipo_geral, p.tipo_detalhe, p.documento_iniciador, p.processo_sei,
             CASE 
@@ -2509,108 +2572,88 @@ def listar_processos():
     LEFT JOIN usuarios u2 ON p.nome_pm_id = u2.id
         WHERE p.ativo = 1
         ORDER BY p.created_at DESC
-    """)
+    """
 
-    processos = cursor.fetchall()
-    conn.close()
+# Linhas por lote enviado ao JS no modo streaming
+TAMANHO_LOTE_STREAM = 500
+
+def _formatar_numero_listagem(processo):
+    """Formata o número do procedimento baseado no numero_controle"""
+    numero_controle = processo[22]  # numero_controle é o índice 22
+    tipo_detalhe = processo[3]
+    local_origem = processo[8] or ""
+    data_instauracao = processo[9] or ""
+    ano_instauracao = ""
     
-    # Formatar o número do procedimento baseado no numero_controle
-    def formatar_numero_processo(processo):
-        numero_controle = processo[22]  # numero_controle é o índice 22
-        tipo_detalhe = processo[3]
-        documento = processo[4]
-        local_origem = processo[8] or ""
-        data_instauracao = processo[9] or ""
-        ano_instauracao = ""
-        
-        # Extrair o ano da data de instauração, se disponível
-        if data_instauracao:
-            try:
-                ano_instauracao = str(datetime.strptime(data_instauracao, "%Y-%m-%d").year)
-            except:
-                ano_instauracao = ""
-        
-        # Usar numero_controle para formatação
-        if numero_controle:
-            return f"{tipo_detalhe} nº {numero_controle}/{local_origem}/{ano_instauracao}"
+    # Extrair o ano da data de instauração, se disponível
+    if data_instauracao:
+        try:
+            ano_instauracao = str(datetime.strptime(data_instauracao, "%Y-%m-%d").year)
+        except:
+            ano_instauracao = ""
+    
+    # Usar numero_controle para formatação
+    if numero_controle:
+        return f"{tipo_detalhe} nº {numero_controle}/{local_origem}/{ano_instauracao}"
+    else:
+        # Fallback para o número do documento se numero_controle estiver vazio
+        numero_documento = processo[1]
+        if numero_documento:
+            return f"{tipo_detalhe} nº {numero_documento}/{local_origem}/{ano_instauracao}"
+    
+    return "S/N"
+
+def _formatar_pms_listagem(processo, pms_envolvidos):
+    """Formata a exibição dos PMs envolvidos considerando múltiplos PMs para procedimentos"""
+    # Procedimento com múltiplos PMs: mostrar primeiro + "e outros"
+    if processo[2] == 'procedimento' and pms_envolvidos:
+        primeiro_pm = pms_envolvidos[0]['nome_completo']
+        
+        if len(pms_envolvidos) > 1:
+            pm_display = f"{primeiro_pm} e outros"
+            # Criar tooltip com todos os nomes
+            todos_nomes = [pm['nome_completo'] for pm in pms_envolvidos]
+            tooltip = ", ".join(todos_nomes)
         else:
-            # Fallback para o número do documento se numero_controle estiver vazio
-            numero_documento = processo[1]
-            if numero_documento:
-                return f"{tipo_detalhe} nº {numero_documento}/{local_origem}/{ano_instauracao}"
+            pm_display = primeiro_pm
+            tooltip = primeiro_pm
         
-        return "S/N"
-
-    def formatar_pms_envolvidos(processo):
-        """Formata a exibição dos PMs envolvidos considerando múltiplos PMs para procedimentos"""
-        tipo_geral = processo[2]  # tipo_geral
-        processo_id = processo[0]  # id
-        
-        # Se for procedimento, buscar múltiplos PMs
-        if tipo_geral == 'procedimento':
-            pms_envolvidos = buscar_pms_envolvidos(processo_id)
-            
-            if pms_envolvidos:
-                # Se há múltiplos PMs, mostrar primeiro + "e outros"
-                primeiro_pm = pms_envolvidos[0]['nome_completo']
-                
-                if len(pms_envolvidos) > 1:
-                    pm_display = f"{primeiro_pm} e outros"
-                    # Criar tooltip com todos os nomes
-                    todos_nomes = [pm['nome_completo'] for pm in pms_envolvidos]
-                    tooltip = ", ".join(todos_nomes)
-                else:
-                    pm_display = primeiro_pm
-                    tooltip = primeiro_pm
-                
-                return {
-                    'display': pm_display,
-                    'tooltip': tooltip
-                }
-            else:
-                # Fallback para PM único se não há múltiplos
-                pm_nome = processo[11]  # nome_pm
-                pm_posto = processo[19] or ""  # nome_pm_pg
-                pm_matricula = processo[20] or ""  # nome_pm_matricula
-                
-                if pm_nome:
-                    pm_completo = f"{pm_posto} {pm_matricula} {pm_nome}".strip()
-                    return {
-                        'display': pm_completo,
-                        'tooltip': pm_completo
-                    }
-                else:
-                    return {
-                        'display': 'Não informado',
-                        'tooltip': 'Não informado'
-                    }
-        else:
-            # Para processos, usar PM único
-            pm_nome = processo[11]  # nome_pm
-            pm_posto = processo[19] or ""  # nome_pm_pg
-            pm_matricula = processo[20] or ""  # nome_pm_matricula
-            
-            if pm_nome:
-                pm_completo = f"{pm_posto} {pm_matricula} {pm_nome}".strip()
-                return {
-                    'display': pm_completo,
-                    'tooltip': pm_completo
-                }
-            else:
-                return {
-                    'display': 'Não informado',
-                    'tooltip': 'Não informado'
-                }
+        return {
+            'display': pm_display,
+            'tooltip': tooltip
+        }
+    
+    # Processos (ou procedimento sem PMs na tabela): usar PM único
+    pm_nome = processo[11]  # nome_pm
+    pm_posto = processo[19] or ""  # nome_pm_pg
+    pm_matricula = processo[20] or ""  # nome_pm_matricula
+    
+    if pm_nome:
+        pm_completo = f"{pm_posto} {pm_matricula} {pm_nome}".strip()
+        return {
+            'display': pm_completo,
+            'tooltip': pm_completo
+        }
+    return {
+        'display': 'Não informado',
+        'tooltip': 'Não informado'
+    }
 
+def _formatar_lote_listagem(processos):
+    """Formata linhas de SQL_LISTAR_PROCESSOS, resolvendo os PMs envolvidos do lote em bloco"""
+    pms_por_procedimento = carregar_pms_envolvidos_lote(
+        [processo[0] for processo in processos if processo[2] == 'procedimento']
+    )
+    
     resultado = []
     for processo in processos:
-        pms_info = formatar_pms_envolvidos(processo)
+        pms_info = _formatar_pms_listagem(processo, pms_por_procedimento.get(processo[0], []))
         
         resultado.append({
             "id": processo[0],
             "numero": processo[1],
             "numero_controle": processo[22],  # Incluir numero_controle
-            "numero_formatado": formatar_numero_processo(processo),
+            "numero_formatado": _formatar_numero_listagem(processo),
             "tipo_geral": processo[2],
             "tipo_detalhe": processo[3],
             "documento_iniciador": processo[4],
@@ -2636,6 +2679,90 @@ def listar_processos():
     
     return resultado
 
+@eel.expose
+@threadpool.run_in_threadpool
+@db_manager.pool.scoped
+def listar_processos():
+    """Lista todos os processos cadastrados"""
+    conn = db_manager.get_connection()
+    cursor = conn.cursor()
+    cursor.execute(SQL_LISTAR_PROCESSOS)
+    processos = cursor.fetchall()
+    conn.close()
+    
+    return _formatar_lote_listagem(processos)
+
+@threadpool.run_in_threadpool
+def _abrir_cursor_stream(conn):
+    cursor = conn.cursor()
+    cursor.execute(SQL_LISTAR_PROCESSOS)
+    return cursor
+
+@threadpool.run_in_threadpool
+def _ler_lote_stream(cursor, tamanho_lote):
+    """Próximo lote do cursor já formatado (vazio ao final)"""
+    return _formatar_lote_listagem(cursor.fetchmany(tamanho_lote))
+
+@eel.expose
+def listar_processos_stream(stream_id=None, tamanho_lote=TAMANHO_LOTE_STREAM):
+    """Lista todos os processos em lotes enviados à função JS receberLoteProcessos.
+    
+    Mesmos campos de listar_processos, mas apenas um lote fica em memória: o
+    cursor é lido com fetchmany e cada lote (com os PMs envolvidos resolvidos
+    em bloco) é enviado assim que formatado. As mensagens levam stream_id,
+    indice, processos e fim; a última (fim=True) traz total ou erro.
+    """
+    stream_id = stream_id or str(uuid.uuid4())
+    try:
+        tamanho_lote = max(1, min(int(tamanho_lote or TAMANHO_LOTE_STREAM), 5000))
+    except (TypeError, ValueError):
+        tamanho_lote = TAMANHO_LOTE_STREAM
+    
+    indice = 0
+    total = 0
+    conn = db_manager.get_connection()
+    try:
+        # A leitura roda no threadpool; o envio ao JS, no greenlet da chamada
+        cursor = _abrir_cursor_stream(conn)
+        while True:
+            lote = _ler_lote_stream(cursor, tamanho_lote)
+            if not lote:
+                break
+            eel.receberLoteProcessos({
+                "stream_id": stream_id,
+                "indice": indice,
+                "processos": lote,
+                "fim": False,
+            })
+            indice += 1
+            total += len(lote)
+            if len(lote) < tamanho_lote:
+                break
+        
+        eel.receberLoteProcessos({
+            "stream_id": stream_id,
+            "indice": indice,
+            "processos": [],
+            "fim": True,
+            "total": total,
+        })
+        return {"sucesso": True, "stream_id": stream_id, "total": total, "lotes": indice}
+    except Exception as e:
+        mensagem = f"Erro ao listar processos: {str(e)}"
+        try:
+            eel.receberLoteProcessos({
+                "stream_id": stream_id,
+                "indice": indice,
+                "processos": [],
+                "fim": True,
+                "erro": mensagem,
+            })
+        except Exception:
+            pass
+        return {"sucesso": False, "stream_id": stream_id, "mensagem": mensagem}
+    finally:
+        conn.close()
+
 def _determinar_natureza_processo(natureza_original, transgressoes_selecionadas):
     """Determina a natureza do processo baseado nas transgressões selecionadas"""
     if not transgressoes_selecionadas:
@@ -2666,6 +2793,7 @@ def _determinar_natureza_processo(natureza_original, transgressoes_selecionadas)
     return natureza_original
 
 @eel.expose
+@threadpool.run_in_threadpool
 def excluir_processo(processo_id):
     """Exclui um processo/procedimento (soft delete)"""
     try:
@@ -3082,10 +3210,8 @@ def obter_processo(processo_id):
                 pass
             # art29
             try:
-                # Detectar coluna (art29_id ou infracao_id)
-                cur_i.execute("PRAGMA table_info(procedimentos_indicios_art29)")
-                ccols = [r[1] for r in cur_i.fetchall()]
-                col_fk = 'art29_id' if 'art29_id' in ccols else ('infracao_id' if 'infracao_id' in ccols else 'art29_id')
+                # Coluna art29_id ou infracao_id (detectada na inicialização)
+                col_fk = db_manager.schema.art29_fk
                 cur_i.execute(
                     f"""
                     SELECT a.id, a.inciso, a.texto
@@ -3212,6 +3338,7 @@ def obter_processo(processo_id):
         return None
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_procedimento_completo(procedimento_id):
     """Obtém dados consolidados para a página de visualização"""
     try:
@@ -3469,6 +3596,7 @@ def obter_envolvidos_procedimento(procedimento_id):
         return {"sucesso": False, "mensagem": f"Erro ao obter envolvidos: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def atualizar_processo(
     processo_id, numero, tipo_geral, tipo_detalhe, documento_iniciador, processo_sei, responsavel_id, responsavel_tipo,
     local_origem=None, local_fatos=None, data_instauracao=None, data_recebimento=None, escrivao_id=None, status_pm=None, nome_pm_id=None,
@@ -3725,13 +3853,8 @@ def atualizar_processo(
                         "INSERT INTO procedimentos_indicios_rdpm (id, procedimento_id, transgressao_id) VALUES (?, ?, ?)",
                         (str(uuid.uuid4()), processo_id, tid)
                     )
-                # detectar nome da coluna FK de art29
-                try:
-                    cursor.execute("PRAGMA table_info(procedimentos_indicios_art29)")
-                    cols_art29 = [r[1] for r in cursor.fetchall()]
-                    col_art29 = 'art29_id' if 'art29_id' in cols_art29 else ('infracao_id' if 'infracao_id' in cols_art29 else 'art29_id')
-                except Exception:
-                    col_art29 = 'art29_id'
+                # nome da coluna FK de art29 (detectado na inicialização)
+                col_art29 = db_manager.schema.art29_fk
                 for aid in art29_ids:
                     cursor.execute(
                         f"INSERT INTO procedimentos_indicios_art29 (id, procedimento_id, {col_art29}) VALUES (?, ?, ?)",
@@ -3988,6 +4111,7 @@ def obter_prazos_vencidos():
         return {"sucesso": False, "mensagem": f"Erro ao obter prazos vencidos: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def backfill_tipos_funcoes_processo():
     """Backfill presidente_tipo/interrogante_tipo/escrivao_processo_tipo onde ID existe e tipo está NULL/errado."""
     try:
@@ -4005,7 +4129,9 @@ def backfill_tipos_funcoes_processo():
         cursor.execute("SELECT id, presidente_id, presidente_tipo, interrogante_id, interrogante_tipo, escrivao_processo_id, escrivao_processo_tipo FROM processos_procedimentos WHERE ativo = 1")
         rows = cursor.fetchall()
         upd = 0
-        for (pid, pres_id, pres_tp, int_id, int_tp, escp_id, escp_tp) in rows:
+        for indice, (pid, pres_id, pres_tp, int_id, int_tp, escp_id, escp_tp) in enumerate(rows):
+            if indice % 50 == 0:
+                reportar_progresso(indice * 100 // len(rows), f"{indice}/{len(rows)} processos verificados")
             # Sempre resolver o tipo atual baseado na origem real do ID
             resolved_pres = resolve_tipo(pres_id) if pres_id else None
             resolved_int = resolve_tipo(int_id) if int_id else None
@@ -4121,6 +4247,7 @@ def obter_status_detalhado_processo(processo_id):
         return {"sucesso": False, "mensagem": f"Erro ao obter status: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_dashboard_prazos():
     """Obtém dados para dashboard de prazos"""
     try:
@@ -4130,6 +4257,7 @@ def obter_dashboard_prazos():
         return {"sucesso": False, "mensagem": f"Erro ao obter dashboard: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def gerar_relatorio_processo(processo_id):
     """Gera relatório completo de um processo"""
     try:
@@ -4139,6 +4267,7 @@ def gerar_relatorio_processo(processo_id):
         return {"sucesso": False, "mensagem": f"Erro ao gerar relatório: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def gerar_relatorio_prazos(filtros=None):
     """Gera relatório de prazos com filtros opcionais"""
     try:
@@ -4258,6 +4387,76 @@ def calcular_prazo_processo(tipo_detalhe, documento_iniciador, data_recebimento,
             "vencido": False
         }
 
+def resolver_prazos_ativos_lote(processo_ids):
+    """Prazo ativo e total de prorrogações de vários processos de uma vez.
+    
+    Retorna {processo_id: (prorrogacoes_dias, data_limite_ativo)}; processos sem
+    registros em prazos_processo ficam com (0, None). Uma consulta agrupada por
+    lote de ids.
+    """
+    resultado = {pid: (0, None) for pid in processo_ids}
+    if not resultado:
+        return resultado
+    
+    conn = db_manager.get_connection()
+    try:
+        cursor = conn.cursor()
+        for lote in _em_lotes(resultado):
+            placeholders = ','.join('?' * len(lote))
+            cursor.execute(f"""
+                SELECT processo_id,
+                       SUM(CASE WHEN tipo_prazo='prorrogacao' THEN COALESCE(dias_adicionados,0) ELSE 0 END) as soma_prorrog,
+                       MAX(CASE WHEN ativo=1 THEN data_vencimento END) as data_venc_ativa
+                FROM prazos_processo
+                WHERE processo_id IN ({placeholders})
+                GROUP BY processo_id
+            """, lote)
+            for processo_id, soma_prorrog, data_venc_ativa in cursor.fetchall():
+                resultado[processo_id] = (int(soma_prorrog or 0), data_venc_ativa)
+    finally:
+        conn.close()
+    return resultado
+
+def aplicar_prazo_ativo(calculo_prazo, data_limite_ativo):
+    """Ajusta o cálculo de prazo pela data de vencimento do prazo ativo, se existir"""
+    if not data_limite_ativo:
+        return calculo_prazo
+    try:
+        data_limite_dt = datetime.strptime(data_limite_ativo, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return calculo_prazo
+    calculo_prazo["data_limite"] = data_limite_ativo
+    calculo_prazo["data_limite_formatada"] = data_limite_dt.strftime("%d/%m/%Y")
+    dias_rest = (data_limite_dt - datetime.now()).days
+    calculo_prazo["dias_restantes"] = dias_rest
+    if dias_rest < 0:
+        calculo_prazo["status_prazo"] = f"Vencido há {abs(dias_rest)} dias"
+        calculo_prazo["vencido"] = True
+    elif dias_rest == 0:
+        calculo_prazo["status_prazo"] = "Vence hoje"
+        calculo_prazo["vencido"] = False
+    elif dias_rest <= 5:
+        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias (URGENTE)"
+        calculo_prazo["vencido"] = False
+    elif dias_rest <= 10:
+        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias (ATENÇÃO)"
+        calculo_prazo["vencido"] = False
+    else:
+        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias"
+        calculo_prazo["vencido"] = False
+    return calculo_prazo
+
+def calcular_prazo_com_ativo(tipo_detalhe, documento_iniciador, data_recebimento, prazo_ativo):
+    """calcular_prazo_processo com as prorrogações e o prazo ativo de resolver_prazos_ativos_lote"""
+    prorrogacoes_dias, data_limite_ativo = prazo_ativo or (0, None)
+    calculo_prazo = calcular_prazo_processo(
+        tipo_detalhe=tipo_detalhe,
+        documento_iniciador=documento_iniciador,
+        data_recebimento=data_recebimento,
+        prorrogacoes_dias=prorrogacoes_dias,
+    )
+    return aplicar_prazo_ativo(calculo_prazo, data_limite_ativo)
+
 @eel.expose
 def calcular_prazo_por_processo(processo_id):
     """Calcula o prazo de um processo específico"""
@@ -4282,22 +4481,10 @@ def calcular_prazo_por_processo(processo_id):
         
         tipo_detalhe, documento_iniciador, data_recebimento, numero, tipo_geral = processo
         
-        # Buscar prorrogações existentes na tabela de prazos
-        prorrogacoes_dias = 0
-        try:
-            prazos_existentes = prazos_manager.listar_prazos_processo(processo_id)
-            for prazo in prazos_existentes:
-                if prazo.get('prorrogacoes_dias'):
-                    prorrogacoes_dias += prazo['prorrogacoes_dias']
-        except:
-            pass  # Se ainda não há prazos cadastrados, continua sem prorrogações
-        
-        # Calcular prazo
-        calculo_prazo = calcular_prazo_processo(
-            tipo_detalhe=tipo_detalhe,
-            documento_iniciador=documento_iniciador,
-            data_recebimento=data_recebimento,
-            prorrogacoes_dias=prorrogacoes_dias
+        # Calcular prazo com prorrogações e prazo ativo (mesma regra da listagem)
+        calculo_prazo = calcular_prazo_com_ativo(
+            tipo_detalhe, documento_iniciador, data_recebimento,
+            resolver_prazos_ativos_lote([processo_id])[processo_id]
         )
         
         return {
@@ -4449,26 +4636,250 @@ def remover_andamento(processo_id, andamento_id):
         print(f"Erro ao remover andamento: {e}")
         return {"sucesso": False, "mensagem": f"Erro ao remover andamento: {str(e)}"}
 
+# ============================================
+# BUSCA DE TEXTO COMPLETO (FTS5)
+# ============================================
+
+# Pesos do bm25 por coluna de processos_busca (números/identificadores primeiro)
+PESOS_BUSCA = (10.0, 2.0, 1.0, 8.0, 8.0, 8.0, 8.0, 3.0, 3.0, 1.0)
+
+def consulta_fts(termo):
+    """Converte o texto digitado em consulta FTS5 de prefixos ("joao"* "silva"*)
+    
+    Todos os termos precisam aparecer (AND); retorna None quando não há termos.
+    """
+    termos = re.findall(r'\w+', termo or '')
+    if not termos:
+        return None
+    return ' '.join(f'"{termo_busca}"*' for termo_busca in termos)
+
 @eel.expose
-def listar_processos_com_prazos(search_term=None, page=1, per_page=6, filtros=None):
-    """Lista processos com cálculo de prazo automático, paginação e filtros avançados"""
+@threadpool.run_in_threadpool
+def buscar_processos(termo, limite=20):
+    """Busca rápida ranqueada por relevância (número, SEI, portaria, nomes e resumo dos fatos)"""
+    consulta = consulta_fts(termo)
+    if not consulta:
+        return {"sucesso": True, "processos": []}
+    if not db_manager.schema.busca_fts:
+        return {"sucesso": False, "mensagem": "Índice de busca indisponível neste banco"}
+    
+    try:
+        limite = max(1, min(int(limite or 20), 100))
+        conn = db_manager.get_connection()
+        cursor = conn.cursor()
+        pesos = ', '.join(str(peso) for peso in PESOS_BUSCA)
+        cursor.execute(f"""
+            SELECT p.id, p.numero, p.numero_controle, p.tipo_geral, p.tipo_detalhe,
+                   p.local_origem, p.processo_sei, p.data_instauracao, p.concluido,
+                   bm25(processos_busca, {pesos}) AS relevancia
+            FROM processos_busca
+            JOIN processos_busca_ids b ON b.id_busca = processos_busca.rowid
+            JOIN processos_procedimentos p ON p.id = b.processo_id
+            WHERE processos_busca MATCH ? AND p.ativo = 1
+            ORDER BY relevancia
+            LIMIT ?
+        """, (consulta, limite))
+        
+        processos = []
+        for row in cursor.fetchall():
+            ano = row[7][:4] if row[7] else ""
+            numero_exibicao = row[2] or row[1]
+            processos.append({
+                "id": row[0],
+                "numero": row[1],
+                "numero_controle": row[2],
+                "numero_formatado": f"{row[4]} nº {numero_exibicao}/{row[5] or ''}/{ano}" if numero_exibicao else "S/N",
+                "tipo_geral": row[3],
+                "tipo_detalhe": row[4],
+                "local_origem": row[5],
+                "processo_sei": row[6],
+                "data_instauracao": row[7],
+                "concluido": bool(row[8]),
+                "relevancia": round(-row[9], 4),
+            })
+        conn.close()
+        
+        return {"sucesso": True, "processos": processos}
+    except Exception as e:
+        return {"sucesso": False, "mensagem": f"Erro na busca: {str(e)}"}
+
+# Campos de listar_processos_com_prazos e a coluna de processo_listagem de cada um
+# (na ordem de saída); "prazo" é calculado a partir de tipo_detalhe,
+# documento_iniciador, data_recebimento e do prazo ativo
+CAMPOS_LISTAGEM_PRAZOS = {
+    "id": "processo_id",
+    "numero": "numero",
+    "numero_controle": "numero_controle",
+    "numero_formatado": "numero_formatado",
+    "tipo_geral": "tipo_geral",
+    "tipo_detalhe": "tipo_detalhe",
+    "documento_iniciador": "documento_iniciador",
+    "data_recebimento": "data_recebimento",
+    "data_recebimento_formatada": "data_recebimento_formatada",
+    "data_instauracao": "data_instauracao",
+    "data_instauracao_formatada": "data_instauracao_formatada",
+    "responsavel": "responsavel_completo",
+    "encarregado_display": "encarregado_display",
+    "encarregado_tooltip": "encarregado_tooltip",
+    "responsavel_posto": "responsavel_posto",
+    "responsavel_matricula": "responsavel_matricula",
+    "responsavel_nome": "responsavel_nome",
+    "presidente_nome_completo": "presidente_completo",
+    "interrogante_nome_completo": "interrogante_completo",
+    "escrivao_nome_completo": "escrivao_completo",
+    "local_origem": "local_origem",
+    "processo_sei": "processo_sei",
+    "nome_pm_id": "nome_pm_id",
+    "pm_envolvido_nome": "pm_envolvido_nome",
+    "pm_envolvido_tooltip": "pm_envolvido_tooltip",
+    "pm_envolvido_posto": "pm_envolvido_posto",
+    "pm_envolvido_matricula": "pm_envolvido_matricula",
+    "status_pm": "status_pm",
+    "data_criacao": "created_at",
+    "concluido": "concluido",
+    "data_conclusao": "data_conclusao",
+}
+
+def _montar_processos_com_prazos(processos, campos_saida, incluir_prazo):
+    """Dicts de saída de listar_processos_com_prazos a partir das linhas lidas de processo_listagem"""
+    # Prorrogações e prazo ativo de todas as linhas em uma consulta agrupada
+    prazos_ativos = {}
+    if incluir_prazo:
+        prazos_ativos = resolver_prazos_ativos_lote([processo["processo_id"] for processo in processos])
+
+    processos_com_prazos = []
+    for indice, processo in enumerate(processos):
+        if indice % 100 == 0:
+            reportar_progresso(indice * 100 // len(processos), f"{indice}/{len(processos)} processos")
+
+        item = {campo: processo[CAMPOS_LISTAGEM_PRAZOS[campo]] for campo in campos_saida}
+        if "concluido" in item:
+            item["concluido"] = bool(item["concluido"]) if item["concluido"] is not None else False
+
+        if incluir_prazo:
+            # Prazo depende da data atual: calculado a cada chamada
+            item["prazo"] = calcular_prazo_com_ativo(
+                processo["tipo_detalhe"], processo["documento_iniciador"], processo["data_recebimento"],
+                prazos_ativos.get(processo["processo_id"])
+            )
+
+        processos_com_prazos.append(item)
+    return processos_com_prazos
+
+def _sincronizar_processos_com_prazos(cursor, where_clause, params, colunas, campos_saida, incluir_prazo,
+                                     consulta, marca):
+    """Modo sincronização de listar_processos_com_prazos (linhas alteradas desde a marca)"""
+    # Contador lido antes das linhas: gravações concorrentes com versão maior
+    # voltam na próxima sincronização (reaplicá-las é inofensivo)
+    cursor.execute("SELECT versao FROM versao_tabelas WHERE tabela = 'processo_listagem'")
+    linha_versao = cursor.fetchone()
+    versao_atual = linha_versao[0] if linha_versao else None
+
+    # Os prazos dependem do dia e as linhas, da busca/filtros/campos
+    id_consulta = hashlib.sha1(json.dumps(consulta, default=str).encode()).hexdigest()[:16]
+    completo = (
+        versao_atual is None
+        or not isinstance(marca, dict)
+        or marca.get("consulta") != id_consulta
+        or not isinstance(marca.get("versao"), int)
+    )
+
+    selecao = ', '.join('l.' + coluna for coluna in colunas)
+    if completo:
+        cursor.execute(f"""
+            SELECT {selecao}, 1
+            FROM processo_listagem l
+            {where_clause}
+            ORDER BY l.ordem DESC, l.processo_id DESC
+        """, params)
+    else:
+        # Alteradas desde a marca; o CASE diz se a linha ainda atende aos filtros
+        condicao = where_clause[len("WHERE "):]
+        cursor.execute(f"""
+            SELECT {selecao}, CASE WHEN {condicao} THEN 1 ELSE 0 END
+            FROM processo_listagem l
+            WHERE l.versao > ?
+            ORDER BY l.ordem DESC, l.processo_id DESC
+        """, list(params) + [marca["versao"]])
+
+    processos = []
+    removidos = []
+    for linha in cursor.fetchall():
+        processo = dict(zip(colunas, linha))
+        if linha[-1]:
+            processos.append(processo)
+        else:
+            removidos.append(processo["processo_id"])
+
+    if not completo:
+        cursor.execute(
+            "SELECT processo_id FROM processo_listagem_removidos WHERE versao > ?",
+            (marca["versao"],)
+        )
+        removidos.extend(row[0] for row in cursor.fetchall())
+
+    return {
+        "sucesso": True,
+        "completo": completo,
+        "processos": _montar_processos_com_prazos(processos, campos_saida, incluir_prazo),
+        "ordem": [[processo["ordem"], processo["processo_id"]] for processo in processos],
+        "removidos": removidos,
+        "marca": {"versao": versao_atual, "consulta": id_consulta} if versao_atual is not None else None,
+    }
+
+@eel.expose
+@threadpool.run_in_threadpool
+@db_manager.pool.scoped
+def listar_processos_com_prazos(search_term=None, page=1, per_page=6, filtros=None, cursor_pagina=None, campos=None,
+                                sincronizar_desde=None):
+    """Lista processos com cálculo de prazo automático, paginação e filtros avançados
+    
+    Lê a tabela materializada processo_listagem (campos de exibição já
+    formatados, mantidos por triggers). O total vem do PaginationCache e as
+    páginas são lidas por chave (ordem, processo_id) a partir da página anterior;
+    cursor_pagina (o proximo_cursor retornado) continua de uma página já lida.
+    campos (lista de chaves de CAMPOS_LISTAGEM_PRAZOS e/ou "prazo") restringe
+    as colunas lidas e a saída; "id" sempre vem e nomes desconhecidos são
+    ignorados. Sem "prazo", os prazos ativos não são consultados nem calculados.
+    
+    Com sincronizar_desde (a "marca" da última sincronização, ou {} na
+    primeira), a resposta traz a lista inteira, sem paginação, só na primeira
+    vez ou quando a marca não vale mais (outro dia, busca, filtros ou campos).
+    Nas demais, vêm só as linhas gravadas depois da marca (processo_listagem.versao)
+    que atendem aos filtros, e em "removidos" os ids que deixaram de atender
+    (inativados, excluídos ou fora do filtro). "ordem" traz a chave de ordenação
+    [ordem, id] de cada linha, para o cliente reordenar a lista mesclada.
+    """
     try:
         conn = db_manager.get_connection()
         cursor = conn.cursor()
 
         # Construir a cláusula WHERE para pesquisa
-        where_clause = "WHERE p.ativo = 1"
+        where_clause = "WHERE l.ativo = 1"
         search_params = []
 
-        # Adicionar busca por texto se fornecida
-        if search_term:
-            where_clause += """ AND (
-                p.numero LIKE ? OR p.tipo_detalhe LIKE ? OR p.local_origem LIKE ? OR
-                p.processo_sei LIKE ? OR p.numero_portaria LIKE ? OR p.numero_memorando LIKE ? OR
-                p.numero_feito LIKE ? OR 
-                COALESCE(u_resp.nome, '') LIKE ? OR
-                COALESCE(u_pm.nome, '') LIKE ? OR
-                COALESCE(p.resumo_fatos, '') LIKE ?
+        # Adicionar busca por texto se fornecida: índice FTS5 quando disponível
+        consulta_busca = consulta_fts(search_term) if search_term and db_manager.schema.busca_fts else None
+        if consulta_busca:
+            where_clause += """ AND l.processo_id IN (
+                SELECT b.processo_id
+                FROM processos_busca
+                JOIN processos_busca_ids b ON b.id_busca = processos_busca.rowid
+                WHERE processos_busca MATCH ?
+            )"""
+            search_params = [consulta_busca]
+        elif search_term:
+            where_clause += """ AND l.processo_id IN (
+                SELECT p.id
+                FROM processos_procedimentos p
+                LEFT JOIN usuarios u_resp ON p.responsavel_id = u_resp.id
+                LEFT JOIN usuarios u_pm ON p.nome_pm_id = u_pm.id
+                WHERE p.numero LIKE ? OR p.tipo_detalhe LIKE ? OR p.local_origem LIKE ? OR
+                    p.processo_sei LIKE ? OR p.numero_portaria LIKE ? OR p.numero_memorando LIKE ? OR
+                    p.numero_feito LIKE ? OR 
+                    COALESCE(u_resp.nome, '') LIKE ? OR
+                    COALESCE(u_pm.nome, '') LIKE ? OR
+                    COALESCE(p.resumo_fatos, '') LIKE ?
             )"""
             search_term_like = f"%{search_term}%"
             search_params = [search_term_like] * 10
@@ -4476,351 +4887,143 @@ def listar_processos_com_prazos(search_term=None, page=1, per_page=6, filtros=No
         # Adicionar filtros avançados se fornecidos
         if filtros:
             if filtros.get('tipo'):
-                where_clause += " AND p.tipo_detalhe = ?"
+                where_clause += " AND l.tipo_detalhe = ?"
                 search_params.append(filtros['tipo'])
 
             if filtros.get('origem'):
-                where_clause += " AND p.local_origem = ?"
+                where_clause += " AND l.local_origem = ?"
                 search_params.append(filtros['origem'])
 
             if filtros.get('local_fatos'):
-                where_clause += " AND p.local_fatos = ?"
+                where_clause += " AND l.local_fatos = ?"
                 search_params.append(filtros['local_fatos'])
 
             if filtros.get('documento'):
-                where_clause += " AND p.documento_iniciador = ?"
+                where_clause += " AND l.documento_iniciador = ?"
                 search_params.append(filtros['documento'])
 
             if filtros.get('status'):
-                where_clause += " AND p.status_pm = ?"
+                where_clause += " AND l.status_pm = ?"
                 search_params.append(filtros['status'])
 
             if filtros.get('encarregado'):
-                where_clause += """ AND (
-                    TRIM(COALESCE(
-                        u_resp.posto_graduacao || ' ' || u_resp.matricula || ' ' || u_resp.nome,
-                        ''
-                    )) = ?
-                )"""
+                # "posto matrícula nome" do responsável
+                where_clause += " AND l.responsavel_filtro = ?"
                 search_params.append(filtros['encarregado'])
 
             if filtros.get('ano'):
-                # Priorizar data_instauracao, depois data_recebimento, depois created_at
-                where_clause += """ AND (
-                    CASE 
-                        WHEN p.data_instauracao IS NOT NULL THEN strftime('%Y', p.data_instauracao)
-                        WHEN p.data_recebimento IS NOT NULL THEN strftime('%Y', p.data_recebimento)
-                        ELSE strftime('%Y', p.created_at)
-                    END = ?
-                )"""
+                # Ano de data_instauracao, depois data_recebimento, depois created_at
+                where_clause += " AND l.ano_filtro = ?"
                 search_params.append(filtros['ano'])
 
             if filtros.get('pm_envolvido'):
-                where_clause += """ AND (
-                    TRIM(COALESCE(
-                        u_pm.posto_graduacao || ' ' || u_pm.matricula || ' ' || u_pm.nome,
-                        ''
-                    )) = ?
-                )"""
+                # "posto matrícula nome" do PM envolvido
+                where_clause += " AND l.pm_filtro = ?"
                 search_params.append(filtros['pm_envolvido'])
 
             if filtros.get('vitima'):
-                where_clause += " AND p.nome_vitima = ?"
+                where_clause += " AND l.nome_vitima = ?"
                 search_params.append(filtros['vitima'])
 
             # Filtro por período de instauração
             if filtros.get('data_inicio') and filtros.get('data_fim'):
                 # Ambas as datas fornecidas - filtrar pelo intervalo (inclusive)
-                where_clause += " AND p.data_instauracao BETWEEN ? AND ?"
+                where_clause += " AND l.data_instauracao BETWEEN ? AND ?"
                 search_params.append(filtros['data_inicio'])
                 search_params.append(filtros['data_fim'])
             elif filtros.get('data_inicio'):
                 # Apenas data inicial - filtrar a partir dessa data
-                where_clause += " AND p.data_instauracao >= ?"
+                where_clause += " AND l.data_instauracao >= ?"
                 search_params.append(filtros['data_inicio'])
             elif filtros.get('data_fim'):
                 # Apenas data final - filtrar até essa data
-                where_clause += " AND p.data_instauracao <= ?"
+                where_clause += " AND l.data_instauracao <= ?"
                 search_params.append(filtros['data_fim'])
 
             if filtros.get('situacao'):
                 if filtros['situacao'] == 'concluido':
-                    where_clause += " AND p.concluido = 1"
+                    where_clause += " AND l.concluido = 1"
                 elif filtros['situacao'] == 'em_andamento':
-                    where_clause += " AND (p.concluido = 0 OR p.concluido IS NULL)"
+                    where_clause += " AND (l.concluido = 0 OR l.concluido IS NULL)"
                 elif filtros['situacao'] == 'em_andamento_no_prazo':
-                    # Em andamento e com prazo não vencido
-                    where_clause += """ AND (p.concluido = 0 OR p.concluido IS NULL) 
-                                      AND p.data_recebimento IS NOT NULL 
-                                      AND (
-                                          CASE 
-                                              WHEN p.documento_iniciador = 'Feito Preliminar' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) < 15
-                                              WHEN p.tipo_detalhe = 'IPM' OR p.tipo_detalhe LIKE '%IPM%' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) < 40
-                                              WHEN p.tipo_detalhe = 'SR' OR p.tipo_detalhe LIKE '%SR%' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) < 30
-                                              ELSE
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) < 30
-                                          END
-                                      )"""
+                    # Em andamento e com prazo não vencido (data_limite considera prorrogações)
+                    where_clause += " AND (l.concluido = 0 OR l.concluido IS NULL) AND l.data_limite > ?"
+                    search_params.append(datetime.now().strftime("%Y-%m-%d"))
                 elif filtros['situacao'] == 'em_andamento_vencido':
-                    # Em andamento e com prazo vencido
-                    where_clause += """ AND (p.concluido = 0 OR p.concluido IS NULL) 
-                                      AND p.data_recebimento IS NOT NULL 
-                                      AND (
-                                          CASE 
-                                              WHEN p.documento_iniciador = 'Feito Preliminar' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) >= 15
-                                              WHEN p.tipo_detalhe = 'IPM' OR p.tipo_detalhe LIKE '%IPM%' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) >= 40
-                                              WHEN p.tipo_detalhe = 'SR' OR p.tipo_detalhe LIKE '%SR%' THEN
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) >= 30
-                                              ELSE
-                                                  CAST((julianday('now') - julianday(p.data_recebimento)) AS INTEGER) >= 30
-                                          END
-                                      )"""
-
-        # Contar total de registros
-        count_query = f"""
-            SELECT COUNT(*)
-            FROM processos_procedimentos p
-            LEFT JOIN usuarios u_resp ON p.responsavel_id = u_resp.id
-            LEFT JOIN usuarios u_pm ON p.nome_pm_id = u_pm.id
-            {where_clause}
-        """
-        cursor.execute(count_query, search_params)
-        total_processos = cursor.fetchone()[0]
+                    # Em andamento e com prazo vencido (vence no próprio dia, como em calcular_prazo_processo)
+                    where_clause += " AND (l.concluido = 0 OR l.concluido IS NULL) AND l.data_limite <= ?"
+                    search_params.append(datetime.now().strftime("%Y-%m-%d"))
+
+        # Projeção: só as colunas dos campos pedidos (todos quando campos é None)
+        campos_pedidos = set(campos) if campos else None
+        campos_saida = [
+            campo for campo in CAMPOS_LISTAGEM_PRAZOS
+            if campos_pedidos is None or campo in campos_pedidos or campo == "id"
+        ]
+        incluir_prazo = campos_pedidos is None or "prazo" in campos_pedidos
+        colunas = ["processo_id", "ordem"] + [CAMPOS_LISTAGEM_PRAZOS[campo] for campo in campos_saida]
+        if incluir_prazo:
+            colunas += ["tipo_detalhe", "documento_iniciador", "data_recebimento"]
+        colunas = list(dict.fromkeys(colunas))
+
+        # Contar total de registros (em cache enquanto as tabelas não mudarem)
+        def contar():
+            cursor.execute(f"SELECT COUNT(*) FROM processo_listagem l {where_clause}", search_params)
+            return cursor.fetchone()[0]
+
+        # Filtros de situação dependem da data atual (o dia faz parte da chave); o
+        # contador de processo_listagem avança a cada linha gravada, inclusive com
+        # data_limite recalculada a partir de prazos_processo
+        chave_cache = (
+            'processos_com_prazos', search_term or '',
+            json.dumps(filtros or {}, sort_keys=True, default=str),
+            datetime.now().strftime("%Y-%m-%d"),
+        )
+        total_processos, versao = db_manager.paginacao.total(
+            cursor, chave_cache, ('processo_listagem',), contar
+        )
+
+        if sincronizar_desde is not None:
+            resultado = _sincronizar_processos_com_prazos(
+                cursor, where_clause, search_params, colunas, campos_saida, incluir_prazo,
+                chave_cache + (sorted(campos_pedidos) if campos_pedidos else None,), sincronizar_desde
+            )
+            conn.close()
+            resultado["total"] = total_processos
+            return resultado
 
-        # Calcular offset para paginação
-        offset = (page - 1) * per_page
+        # Ponto de partida: cursor explícito, limite da página anterior ou OFFSET
+        if cursor_pagina:
+            limite, paginas_a_pular = tuple(cursor_pagina), 0
+        else:
+            limite, paginas_a_pular = db_manager.paginacao.ponto_de_partida(chave_cache, versao, per_page, page)
+        params_pagina = list(search_params)
+        if limite:
+            # Forma expandida de (ordem, processo_id) < (?, ?): busca por faixa no índice
+            where_clause += " AND l.ordem <= ? AND (l.ordem < ? OR l.processo_id < ?)"
+            params_pagina += [limite[0], limite[0], limite[1]]
+        offset = paginas_a_pular * per_page
 
         # Query principal com paginação - ordenado por data_instauracao DESC (mais recente primeiro)
-        main_query = f"""
-            SELECT 
-                p.id, p.numero, p.tipo_geral, p.tipo_detalhe, p.documento_iniciador, 
-                p.data_recebimento, p.created_at, p.data_instauracao,
-                COALESCE(u_resp.nome, 'Desconhecido') as responsavel_nome,
-                COALESCE(u_resp.posto_graduacao, '') as responsavel_posto,
-                COALESCE(u_resp.matricula, '') as responsavel_matricula,
-                -- Dados de funções (PAD/CD/CJ)
-                COALESCE(u_pres.nome, '') as presidente_nome,
-                COALESCE(u_pres.posto_graduacao, '') as presidente_posto,
-                COALESCE(u_pres.matricula, '') as presidente_matricula,
-                COALESCE(u_int.nome, '') as interrogante_nome,
-                COALESCE(u_int.posto_graduacao, '') as interrogante_posto,
-                COALESCE(u_int.matricula, '') as interrogante_matricula,
-                COALESCE(u_escr.nome, '') as escrivao_nome,
-                COALESCE(u_escr.posto_graduacao, '') as escrivao_posto,
-                COALESCE(u_escr.matricula, '') as escrivao_matricula,
-                p.local_origem, p.processo_sei, p.nome_pm_id, p.status_pm,
-                COALESCE(u_pm.nome, 'Não informado') as pm_envolvido_nome,
-                COALESCE(u_pm.posto_graduacao, '') as pm_envolvido_posto,
-                COALESCE(u_pm.matricula, '') as pm_envolvido_matricula,
-                p.numero_controle,
-                p.concluido,
-                p.data_conclusao
-            FROM processos_procedimentos p
-            LEFT JOIN usuarios u_resp ON p.responsavel_id = u_resp.id
-            LEFT JOIN usuarios u_pm ON p.nome_pm_id = u_pm.id
-            -- Junções para funções específicas em processos (PAD/CD/CJ)
-            LEFT JOIN usuarios u_pres ON p.presidente_id = u_pres.id
-            LEFT JOIN usuarios u_int ON p.interrogante_id = u_int.id
-            LEFT JOIN usuarios u_escr ON p.escrivao_processo_id = u_escr.id
+        cursor.execute(f"""
+            SELECT {', '.join('l.' + coluna for coluna in colunas)}
+            FROM processo_listagem l
             {where_clause}
-            ORDER BY 
-                CASE WHEN p.data_instauracao IS NOT NULL THEN p.data_instauracao ELSE p.created_at END DESC
+            ORDER BY l.ordem DESC, l.processo_id DESC
             LIMIT ? OFFSET ?
-        """
-        cursor.execute(main_query, search_params + [per_page, offset])
+        """, params_pagina + [per_page, offset])
 
-        processos = cursor.fetchall()
+        processos = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
         conn.close()
 
-        processos_com_prazos = []
-
-        for processo in processos:
-            (processo_id, numero, tipo_geral, tipo_detalhe, documento_iniciador, 
-             data_recebimento, created_at, data_instauracao, responsavel_nome, responsavel_posto, responsavel_matricula,
-             presidente_nome, presidente_posto, presidente_matricula,
-             interrogante_nome, interrogante_posto, interrogante_matricula,
-             escrivao_nome, escrivao_posto, escrivao_matricula,
-             local_origem, processo_sei, nome_pm_id, status_pm, 
-             pm_envolvido_nome, pm_envolvido_posto, pm_envolvido_matricula, numero_controle, 
-             concluido, data_conclusao) = processo
-
-            # Formatar responsável completo: "posto/grad + matrícula + nome"
-            responsavel_completo = f"{responsavel_posto} {responsavel_matricula} {responsavel_nome}".strip()
-            if responsavel_completo == "Desconhecido":
-                responsavel_completo = "Desconhecido"
-
-            # Formatar nomes completos das funções (quando houver)
-            def monta_nome_completo(posto, matricula, nome):
-                if not nome:
-                    return None
-                return f"{posto} {matricula} {nome}".strip()
-
-            presidente_completo = monta_nome_completo(presidente_posto, presidente_matricula, presidente_nome)
-            interrogante_completo = monta_nome_completo(interrogante_posto, interrogante_matricula, interrogante_nome)
-            escrivao_completo = monta_nome_completo(escrivao_posto, escrivao_matricula, escrivao_nome)
-
-            # Formatar PM envolvido - para procedimentos, buscar múltiplos PMs
-            if tipo_geral == 'procedimento':
-                pms_envolvidos = buscar_pms_envolvidos(processo_id)
-                if pms_envolvidos:
-                    primeiro_pm = pms_envolvidos[0]['nome_completo']
-                    if len(pms_envolvidos) > 1:
-                        pm_envolvido_completo = f"{primeiro_pm} e outros"
-                        # Criar lista de todos os PMs para tooltip
-                        todos_pms = [pm['nome_completo'] for pm in pms_envolvidos]
-                        pm_envolvido_tooltip = '; '.join(todos_pms)
-                    else:
-                        pm_envolvido_completo = primeiro_pm
-                        pm_envolvido_tooltip = primeiro_pm
-                else:
-                    pm_envolvido_completo = "Não informado"
-                    pm_envolvido_tooltip = "Não informado"
-            else:
-                # Para processos, usar o sistema antigo (um único PM)
-                if pm_envolvido_nome != "Não informado":
-                    # Se for "A APURAR", mostrar apenas o nome
-                    if pm_envolvido_nome == "A APURAR":
-                        pm_envolvido_completo = "A APURAR"
-                    else:
-                        pm_envolvido_completo = f"{pm_envolvido_posto} {pm_envolvido_matricula} {pm_envolvido_nome}".strip()
-                else:
-                    pm_envolvido_completo = "Não informado"
-                pm_envolvido_tooltip = pm_envolvido_completo
-
-            # Montar exibição do "Encarregado" para PAD/CD/CJ
-            encarregado_display = responsavel_completo
-            encarregado_tooltip = responsavel_completo
-            if tipo_geral == 'processo' and (tipo_detalhe in ('PAD', 'CD', 'CJ')):
-                if presidente_completo:
-                    encarregado_display = f"{presidente_completo} e outros"
-                else:
-                    encarregado_display = "Não se aplica"
-                # Tooltip com todas as funções disponíveis
-                partes = []
-                if presidente_completo:
-                    partes.append(f"Presidente: {presidente_completo}")
-                if interrogante_completo:
-                    partes.append(f"Interrogante: {interrogante_completo}")
-                if escrivao_completo:
-                    partes.append(f"Escrivão do Processo: {escrivao_completo}")
-                encarregado_tooltip = '; '.join(partes) if partes else encarregado_display
-
-            # Buscar prorrogações e prazo ativo
-            prorrogacoes_dias = 0
-            data_limite_ativo = None
-            try:
-                conn2 = db_manager.get_connection()
-                c2 = conn2.cursor()
-                c2.execute(
-                    """
-                    SELECT SUM(CASE WHEN tipo_prazo='prorrogacao' THEN COALESCE(dias_adicionados,0) ELSE 0 END) as soma_prorrog,
-                           MAX(CASE WHEN ativo=1 THEN data_vencimento END) as data_venc_ativa
-                    FROM prazos_processo
-                    WHERE processo_id = ?
-                    """,
-                    (processo_id,),
-                )
-                rowp = c2.fetchone()
-                if rowp:
-                    prorrogacoes_dias = int(rowp[0] or 0)
-                    data_limite_ativo = rowp[1]
-                conn2.close()
-            except Exception:
-                pass
+        # Chave da última linha: limite para a página seguinte
+        proximo_cursor = None
+        if processos:
+            proximo_cursor = [processos[-1]["ordem"], processos[-1]["processo_id"]]
+            if not cursor_pagina:
+                db_manager.paginacao.registrar(chave_cache, versao, per_page, page, proximo_cursor)
 
-            # Calcular prazo para cada processo
-            calculo_prazo = calcular_prazo_processo(
-                tipo_detalhe=tipo_detalhe,
-                documento_iniciador=documento_iniciador,
-                data_recebimento=data_recebimento,
-                prorrogacoes_dias=prorrogacoes_dias,
-            )
-            # Ajustar com data ativa, se existir
-            if data_limite_ativo:
-                try:
-                    calculo_prazo["data_limite"] = data_limite_ativo
-                    data_limite_dt = datetime.strptime(data_limite_ativo, "%Y-%m-%d")
-                    calculo_prazo["data_limite_formatada"] = data_limite_dt.strftime("%d/%m/%Y")
-                    hoje = datetime.now()
-                    dias_rest = (data_limite_dt - hoje).days
-                    calculo_prazo["dias_restantes"] = dias_rest
-                    if dias_rest < 0:
-                        calculo_prazo["status_prazo"] = f"Vencido há {abs(dias_rest)} dias"
-                        calculo_prazo["vencido"] = True
-                    elif dias_rest == 0:
-                        calculo_prazo["status_prazo"] = "Vence hoje"
-                        calculo_prazo["vencido"] = False
-                    elif dias_rest <= 5:
-                        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias (URGENTE)"
-                        calculo_prazo["vencido"] = False
-                    elif dias_rest <= 10:
-                        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias (ATENÇÃO)"
-                        calculo_prazo["vencido"] = False
-                    else:
-                        calculo_prazo["status_prazo"] = f"Vence em {dias_rest} dias"
-                        calculo_prazo["vencido"] = False
-                except Exception:
-                    pass
-
-            # Formatar numero do processo usando numero_controle
-            def formatar_numero_processo():
-                ano_instauracao = ""
-
-                # Usar data_instauracao primeiro, se não existir usar data_recebimento
-                data_para_ano = data_instauracao or data_recebimento
-                if data_para_ano:
-                    try:
-                        ano_instauracao = str(datetime.strptime(data_para_ano, "%Y-%m-%d").year)
-                    except Exception:
-                        ano_instauracao = ""
-
-                # Usar numero_controle primeiro, depois fallback para numero
-                numero_para_formatacao = numero_controle or numero
-                if numero_para_formatacao:
-                    return f"{tipo_detalhe} nº {numero_para_formatacao}/{local_origem or ''}/{ano_instauracao}"
-                return "S/N"
-
-            processo_formatado = {
-                "id": processo_id,
-                "numero": numero,
-                "numero_controle": numero_controle,
-                "numero_formatado": formatar_numero_processo(),
-                "tipo_geral": tipo_geral,
-                "tipo_detalhe": tipo_detalhe,
-                "documento_iniciador": documento_iniciador,
-                "data_recebimento": data_recebimento,
-                "data_recebimento_formatada": datetime.strptime(data_recebimento, "%Y-%m-%d").strftime("%d/%m/%Y") if data_recebimento else None,
-                "data_instauracao": data_instauracao,
-                "data_instauracao_formatada": datetime.strptime(data_instauracao, "%Y-%m-%d").strftime("%d/%m/%Y") if data_instauracao else None,
-                "responsavel": responsavel_completo,
-                "encarregado_display": encarregado_display,
-                "encarregado_tooltip": encarregado_tooltip,
-                "responsavel_posto": responsavel_posto,
-                "responsavel_matricula": responsavel_matricula,
-                "responsavel_nome": responsavel_nome,
-                "presidente_nome_completo": presidente_completo,
-                "interrogante_nome_completo": interrogante_completo,
-                "escrivao_nome_completo": escrivao_completo,
-                "local_origem": local_origem,
-                "processo_sei": processo_sei,
-                "nome_pm_id": nome_pm_id,
-                "pm_envolvido_nome": pm_envolvido_completo,
-                "pm_envolvido_tooltip": pm_envolvido_tooltip,
-                "pm_envolvido_posto": pm_envolvido_posto,
-                "pm_envolvido_matricula": pm_envolvido_matricula,
-                "status_pm": status_pm,
-                "data_criacao": created_at,
-                "concluido": bool(concluido) if concluido is not None else False,
-                "data_conclusao": data_conclusao,
-                "prazo": calculo_prazo,
-            }
-
-            processos_com_prazos.append(processo_formatado)
+        processos_com_prazos = _montar_processos_com_prazos(processos, campos_saida, incluir_prazo)
 
         return {
             "sucesso": True,
@@ -4829,6 +5032,7 @@ def listar_processos_com_prazos(search_term=None, page=1, per_page=6, filtros=No
             "page": page,
             "per_page": per_page,
             "total_pages": (total_processos + per_page - 1) // per_page,
+            "proximo_cursor": proximo_cursor,
         }
 
     except Exception as e:
@@ -4837,12 +5041,16 @@ def listar_processos_com_prazos(search_term=None, page=1, per_page=6, filtros=No
         return {"sucesso": False, "mensagem": f"Erro ao listar processos com prazos: {str(e)}"}
 
 @eel.expose
-def listar_todos_processos_com_prazos():
-    """Lista todos os processos com cálculo de prazo (sem paginação) - para compatibilidade"""
+@threadpool.run_in_threadpool
+def listar_todos_processos_com_prazos(campos=None, formato=None):
+    """Lista todos os processos com cálculo de prazo (sem paginação) - para compatibilidade
+    
+    formato='colunar' devolve "processos" em colunas com dicionário de strings.
+    """
     try:
-        resultado = listar_processos_com_prazos(search_term=None, page=1, per_page=999999)
+        resultado = listar_processos_com_prazos(search_term=None, page=1, per_page=999999, campos=campos)
         if resultado["sucesso"]:
-            return {"sucesso": True, "processos": resultado["processos"]}
+            return {"sucesso": True, "processos": aplicar_formato(resultado["processos"], formato)}
         return resultado
     except Exception as e:
         import traceback
@@ -4850,51 +5058,58 @@ def listar_todos_processos_com_prazos():
         return {"sucesso": False, "mensagem": f"Erro ao listar todos os processos: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
+@db_manager.pool.scoped
 def obter_dashboard_prazos_simples():
-    """Obtém estatísticas simples de prazos para dashboard"""
+    """Obtém estatísticas simples de prazos para dashboard
+    
+    Uma consulta agregada sobre processo_listagem.data_limite, em cache até a
+    próxima gravação na listagem (ou a virada do dia). Mesmos critérios
+    de calcular_prazo_processo: vencido a partir da data limite e dias_restantes
+    = dias até a data limite - 1.
+    """
     try:
-        # Buscar todos os processos ativos
-        resultado = listar_todos_processos_com_prazos()
-        
-        if not resultado["sucesso"]:
-            return resultado
+        conn = db_manager.get_connection()
+        cursor = conn.cursor()
         
-        processos = resultado["processos"]
+        hoje = datetime.now().date()
+        limites = {
+            "hoje": hoje.isoformat(),
+            "ate_5_dias": (hoje + timedelta(days=6)).isoformat(),
+            "ate_10_dias": (hoje + timedelta(days=11)).isoformat(),
+        }
         
-        # Calcular estatísticas
-        total_processos = len(processos)
-        vencidos = 0
-        vencendo_5_dias = 0
-        vencendo_10_dias = 0
-        em_dia = 0
-        sem_data_recebimento = 0
+        def contar():
+            cursor.execute("""
+                SELECT
+                    COUNT(*),
+                    SUM(CASE WHEN COALESCE(data_recebimento, '') = '' THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN COALESCE(data_recebimento, '') <> '' AND data_limite <= :hoje THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN COALESCE(data_recebimento, '') <> '' AND data_limite > :hoje
+                              AND data_limite <= :ate_5_dias THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN COALESCE(data_recebimento, '') <> '' AND data_limite > :ate_5_dias
+                              AND data_limite <= :ate_10_dias THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN COALESCE(data_recebimento, '') <> '' AND data_limite > :ate_10_dias THEN 1 ELSE 0 END)
+                FROM processo_listagem
+                WHERE ativo = 1
+            """, limites)
+            total, sem_data, vencidos, vencendo_5, vencendo_10, em_dia = cursor.fetchone()
+            return {
+                "total_processos": total,
+                "vencidos": vencidos or 0,
+                "vencendo_5_dias": vencendo_5 or 0,
+                "vencendo_10_dias": vencendo_10 or 0,
+                "em_dia": em_dia or 0,
+                "sem_data_recebimento": sem_data or 0
+            }
         
-        for processo in processos:
-            prazo = processo["prazo"]
-            
-            if not processo["data_recebimento"]:
-                sem_data_recebimento += 1
-            elif prazo["vencido"]:
-                vencidos += 1
-            elif prazo["dias_restantes"] is not None:
-                if prazo["dias_restantes"] <= 5:
-                    vencendo_5_dias += 1
-                elif prazo["dias_restantes"] <= 10:
-                    vencendo_10_dias += 1
-                else:
-                    em_dia += 1
+        dashboard, _ = db_manager.paginacao.total(
+            cursor, ('dashboard_prazos', limites["hoje"]),
+            ('processo_listagem',), contar
+        )
+        conn.close()
         
-        return {
-            "sucesso": True,
-            "dashboard": {
-                "total_processos": total_processos,
-                "vencidos": vencidos,
-                "vencendo_5_dias": vencendo_5_dias,
-                "vencendo_10_dias": vencendo_10_dias,
-                "em_dia": em_dia,
-                "sem_data_recebimento": sem_data_recebimento
-            }
-        }
+        return {"sucesso": True, "dashboard": dict(dashboard)}
         
     except Exception as e:
         return {"sucesso": False, "mensagem": f"Erro ao obter dashboard: {str(e)}"}
@@ -4952,95 +5167,48 @@ def obter_status_processo():
     ]
     return {"sucesso": True, "status": status}
 
+# Dimensão de processo_facetas (chave em filtros) -> chave em "opcoes"
+OPCOES_FILTROS = {
+    "tipo": "tipos",
+    "origem": "origens",
+    "local_fatos": "locais_fatos",
+    "documento": "documentos",
+    "status": "status",
+    "encarregado": "encarregados",
+    "pm_envolvido": "pm_envolvidos",
+    "vitima": "vitimas",
+    "ano": "anos",
+}
+
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_opcoes_filtros():
-    """Retorna todas as opções disponíveis para os filtros (baseado em todos os processos do banco)"""
+    """Retorna todas as opções disponíveis para os filtros (baseado em todos os processos do banco)
+    
+    Lê processo_facetas (mantida por triggers): cada opção é um valor usado
+    pelos processos ativos e "contagens" traz quantos processos cada opção
+    retorna no filtro correspondente de listar_processos_com_prazos.
+    """
     try:
         conn = db_manager.get_connection()
         cursor = conn.cursor()
         
-        # Buscar todos os valores únicos para cada campo de filtro
-        cursor.execute("""
-            SELECT DISTINCT 
-                p.tipo_detalhe,
-                p.local_origem,
-                p.local_fatos,
-                p.documento_iniciador,
-                p.status_pm,
-                p.nome_vitima,
-                COALESCE(u_resp.nome, 'Desconhecido') as responsavel_nome,
-                COALESCE(u_resp.posto_graduacao, '') as responsavel_posto,
-                COALESCE(u_resp.matricula, '') as responsavel_matricula,
-                COALESCE(
-                    u_pm.posto_graduacao || ' ' || u_pm.matricula || ' ' || u_pm.nome,
-                    ''
-                ) as pm_envolvido_completo,
-                strftime('%Y', p.data_instauracao) as ano_instauracao,
-                strftime('%Y', p.data_recebimento) as ano_recebimento
-            FROM processos_procedimentos p
-            LEFT JOIN usuarios u_resp ON p.responsavel_id = u_resp.id
-            LEFT JOIN usuarios u_pm ON p.nome_pm_id = u_pm.id
-            WHERE p.ativo = 1
-        """)
-        
+        cursor.execute("SELECT dimensao, valor, quantidade FROM processo_facetas")
         resultados = cursor.fetchall()
         conn.close()
         
-        # Processar resultados
-        tipos = set()
-        origens = set()
-        locais_fatos = set()
-        documentos = set()
-        status = set()
-        encarregados = set()
-        pm_envolvidos = set()
-        vitimas = set()
-        anos = set()
+        contagens = {chave: {} for chave in OPCOES_FILTROS.values()}
+        for dimensao, valor, quantidade in resultados:
+            if dimensao in OPCOES_FILTROS:
+                contagens[OPCOES_FILTROS[dimensao]][valor] = quantidade
         
-        for row in resultados:
-            (tipo_detalhe, local_origem, local_fatos, documento_iniciador, status_pm, nome_vitima,
-             responsavel_nome, responsavel_posto, responsavel_matricula, pm_envolvido_completo,
-             ano_instauracao, ano_recebimento) = row
-            
-            if tipo_detalhe:
-                tipos.add(tipo_detalhe)
-            if local_origem:
-                origens.add(local_origem)
-            if local_fatos:
-                locais_fatos.add(local_fatos)
-            if documento_iniciador:
-                documentos.add(documento_iniciador)
-            if status_pm:
-                status.add(status_pm)
-            if nome_vitima:
-                vitimas.add(nome_vitima)
-            if pm_envolvido_completo and pm_envolvido_completo.strip():
-                pm_envolvidos.add(pm_envolvido_completo.strip())
-            
-            # Formatar responsável completo
-            if responsavel_nome and responsavel_nome != 'Desconhecido':
-                responsavel_completo = f"{responsavel_posto} {responsavel_matricula} {responsavel_nome}".strip()
-                encarregados.add(responsavel_completo)
-            
-            # Adicionar anos
-            if ano_instauracao:
-                anos.add(ano_instauracao)
-            if ano_recebimento:
-                anos.add(ano_recebimento)
+        opcoes = {chave: sorted(valores) for chave, valores in contagens.items()}
+        opcoes["anos"].reverse()  # Anos mais recentes primeiro
         
         return {
             "sucesso": True,
-            "opcoes": {
-                "tipos": sorted(list(tipos)),
-                "origens": sorted(list(origens)),
-                "locais_fatos": sorted(list(locais_fatos)),
-                "documentos": sorted(list(documentos)),
-                "status": sorted(list(status)),
-                "encarregados": sorted(list(encarregados)),
-                "pm_envolvidos": sorted(list(pm_envolvidos)),
-                "vitimas": sorted(list(vitimas)),
-                "anos": sorted(list(anos), reverse=True)  # Anos mais recentes primeiro
-            }
+            "opcoes": opcoes,
+            "contagens": contagens
         }
         
     except Exception as e:
@@ -5149,6 +5317,7 @@ def buscar_transgressoes(termo, gravidade=None):
         return {"sucesso": False, "mensagem": f"Erro ao buscar transgressões: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def obter_estatisticas_usuario(user_id, user_type):
     """Obtém estatísticas detalhadas de um usuário específico"""
     try:
@@ -5408,6 +5577,12 @@ def main():
     print("👤 Login admin: admin / 123456")
     print("\n🌐 Abrindo aplicação...")
     
+    # Threadpool para consultas pesadas (mantém o loop do Eel responsivo)
+    threadpool.configure()
+    
+    # Backup online agendado
+    db_manager.backups.start_scheduler()
+    
     try:
         # Tenta Chrome primeiro
         eel.start('login.html',
@@ -6119,6 +6294,7 @@ def excluir_infracao_estatuto_art29(infracao_id):
 # ====================================================================
 
 @eel.expose
+@threadpool.run_in_threadpool
 def salvar_indicios_pm_envolvido(pm_envolvido_id, indicios_data):
     """
     Salva os indícios específicos de um PM envolvido
@@ -6327,6 +6503,7 @@ def carregar_indicios_pm_envolvido(pm_envolvido_id):
         return {"sucesso": False, "mensagem": f"Erro ao carregar indícios: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def listar_pms_envolvidos_com_indicios(procedimento_id):
     """
     Lista todos os PMs envolvidos em um procedimento com seus indícios
@@ -6631,8 +6808,13 @@ def buscar_art29_para_indicios(termo=''):
 # ===============================
 
 @eel.expose
-def gerar_mapa_mensal(mes, ano, tipo_processo):
-    """Gera o mapa mensal para um tipo específico de processo/procedimento"""
+@threadpool.run_in_threadpool
+@db_manager.pool.scoped
+def gerar_mapa_mensal(mes, ano, tipo_processo, formato=None):
+    """Gera o mapa mensal para um tipo específico de processo/procedimento
+    
+    formato='colunar' devolve "dados" em colunas com dicionário de strings.
+    """
     try:
         conn = db_manager.get_connection()
         cursor = conn.cursor()
@@ -6710,7 +6892,8 @@ def gerar_mapa_mensal(mes, ano, tipo_processo):
         processos = cursor.fetchall()
         dados_mapa = []
         
-        for processo in processos:
+        for indice, processo in enumerate(processos):
+            reportar_progresso(indice * 100 // len(processos), f"{indice}/{len(processos)} processos")
             processo_id = processo[0]
             
             # Obter dados de PMs envolvidos
@@ -6793,7 +6976,7 @@ def gerar_mapa_mensal(mes, ano, tipo_processo):
         
         return {
             "sucesso": True,
-            "dados": dados_mapa,
+            "dados": aplicar_formato(dados_mapa, formato),
             "meta": {
                 "mes": mes,
                 "ano": ano,
@@ -6811,6 +6994,7 @@ def gerar_mapa_mensal(mes, ano, tipo_processo):
         return {"sucesso": False, "mensagem": f"Erro ao gerar mapa: {str(e)}"}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def salvar_mapa_mensal(dados_mapa, usuario_id=None):
     """Salva um mapa mensal gerado para acesso posterior"""
     try:
@@ -7007,16 +7191,17 @@ def excluir_mapa_salvo(mapa_id):
 
 @eel.expose
 def obter_anos_relatorio_anual():
-    """Obtém lista de anos que possuem processos/procedimentos instaurados"""
+    """Obtém lista de anos que possuem processos/procedimentos instaurados
+    
+    Lê a dimensão processo_anos (mantida por triggers).
+    """
     try:
         conn = db_manager.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
-            SELECT DISTINCT strftime('%Y', data_instauracao) as ano
-            FROM processos_procedimentos
-            WHERE data_instauracao IS NOT NULL
-            AND ativo = 1
+            SELECT ano FROM processo_anos
+            WHERE quantidade > 0
             ORDER BY ano DESC
         """)
         
@@ -7032,6 +7217,7 @@ def obter_anos_relatorio_anual():
         return {"sucesso": False, "erro": str(e)}
 
 @eel.expose
+@threadpool.run_in_threadpool
 def gerar_relatorio_anual(ano):
     """Gera relatório anual completo com estatísticas e gráficos em PDF"""
     import base64
@@ -7049,7 +7235,7 @@ def gerar_relatorio_anual(ano):
         # Total de processos (tipo_geral = 'processo')
         cursor.execute("""
             SELECT COUNT(*) FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'processo'
             AND ativo = 1
         """, (str(ano),))
@@ -7058,7 +7244,7 @@ def gerar_relatorio_anual(ano):
         # Total de procedimentos (tipo_geral = 'procedimento')
         cursor.execute("""
             SELECT COUNT(*) FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'procedimento'
             AND ativo = 1
         """, (str(ano),))
@@ -7067,12 +7253,13 @@ def gerar_relatorio_anual(ano):
         total_geral = total_processos + total_procedimentos
         
         # ============ ESTATÍSTICAS POR TIPO ============
+        reportar_progresso(20, "Estatísticas por tipo")
         
         # Processos por tipo_detalhe (apenas processos)
         cursor.execute("""
             SELECT tipo_detalhe, COUNT(*) as qtd 
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'processo'
             AND ativo = 1
             GROUP BY tipo_detalhe
@@ -7083,7 +7270,7 @@ def gerar_relatorio_anual(ano):
         cursor.execute("""
             SELECT tipo_detalhe, COUNT(*) as qtd 
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'procedimento'
             AND ativo = 1
             GROUP BY tipo_detalhe
@@ -7101,7 +7288,7 @@ def gerar_relatorio_anual(ano):
                 END as status,
                 COUNT(*) as qtd 
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'processo'
             AND ativo = 1
             GROUP BY status
@@ -7117,7 +7304,7 @@ def gerar_relatorio_anual(ano):
                 END as status,
                 COUNT(*) as qtd 
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_geral = 'procedimento'
             AND ativo = 1
             GROUP BY status
@@ -7132,7 +7319,7 @@ def gerar_relatorio_anual(ano):
                 indicios_categorias,
                 COUNT(*) as qtd
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_detalhe IN ('IPM', 'Sindicância')
             AND concluido = 1
             AND ativo = 1
@@ -7156,7 +7343,7 @@ def gerar_relatorio_anual(ano):
                 solucao_tipo,
                 COUNT(*) as qtd
             FROM processos_procedimentos 
-            WHERE strftime('%Y', data_instauracao) = ?
+            WHERE ano_instauracao = ?
             AND tipo_detalhe IN ('PAD', 'PADS')
             AND concluido = 1
             AND ativo = 1
@@ -7197,6 +7384,7 @@ def gerar_relatorio_anual(ano):
         conn.close()
         
         # ============ GERAR PDF ============
+        reportar_progresso(60, "Gerando PDF")
         pdf_base64 = _gerar_pdf_relatorio_anual(estatisticas)
         
         print(f"✅ Relatório anual gerado com sucesso!")
@@ -7788,9 +7976,7 @@ def _obter_indicios_para_mapa(cursor, processo_id):
         
         # Se não encontrou Art. 29 no sistema novo, buscar no antigo
         if not indicios["art29"]:
-            cursor.execute("PRAGMA table_info(procedimentos_indicios_art29)")
-            cols = [r[1] for r in cursor.fetchall()]
-            col_fk = 'art29_id' if 'art29_id' in cols else 'infracao_id'
+            col_fk = db_manager.schema.art29_fk
             
             cursor.execute(f"""
                 SELECT a.inciso, a.texto
@@ -7889,5 +8075,91 @@ def obter_tipos_processo_para_mapa():
         print(f"❌ Erro ao obter tipos de processo: {e}")
         return {"sucesso": False, "mensagem": f"Erro: {str(e)}"}
 
+# ===============================
+# JOBS EM SEGUNDO PLANO
+# ===============================
+
+def _notificar_progresso_job(dados):
+    """Envia o estado do job para o callback JS exposto (atualizarProgressoJob)"""
+    eel.atualizarProgressoJob(dados)
+
+job_manager = JobManager(notificador=_notificar_progresso_job)
+
+# Funções que podem ser executadas como job (nome -> função)
+JOBS_DISPONIVEIS = {
+    "gerar_relatorio_anual": gerar_relatorio_anual,
+    "gerar_mapa_mensal": gerar_mapa_mensal,
+    "listar_todos_processos_com_prazos": listar_todos_processos_com_prazos,
+    "backfill_tipos_funcoes_processo": backfill_tipos_funcoes_processo,
+}
+
+def _dono_job():
+    """Id do usuário logado, dono dos jobs que ele inicia (None sem login)"""
+    return usuario_logado.get('id') if usuario_logado else None
+
+@eel.expose
+def iniciar_job(tipo, parametros=None):
+    """Inicia uma função demorada em segundo plano e retorna o id do job.
+    
+    parametros: lista de argumentos posicionais ou dict de argumentos nomeados.
+    O progresso é enviado para a função JS atualizarProgressoJob. O job pertence
+    ao usuário logado: só ele consulta, cancela ou lê o resultado.
+    """
+    try:
+        dono = _dono_job()
+        if dono is None:
+            return {"sucesso": False, "mensagem": "Usuário não autenticado"}
+        func = JOBS_DISPONIVEIS.get(tipo)
+        if func is None:
+            return {"sucesso": False, "mensagem": f"Tipo de job inválido: {tipo}"}
+        
+        if isinstance(parametros, dict):
+            if 'dono' in parametros:
+                return {"sucesso": False, "mensagem": "Parâmetro inválido: dono"}
+            job = job_manager.submit(tipo, func, dono=dono, **parametros)
+        else:
+            job = job_manager.submit(tipo, func, *(parametros or []), dono=dono)
+        return {"sucesso": True, "job_id": job.id, "job": job.to_dict()}
+    except Exception as e:
+        print(f"❌ Erro ao iniciar job: {e}")
+        return {"sucesso": False, "mensagem": f"Erro ao iniciar job: {str(e)}"}
+
+@eel.expose
+def obter_status_job(job_id):
+    """Retorna o estado atual de um job do usuário logado (sem o resultado)"""
+    dono = _dono_job()
+    job = job_manager.get(job_id, dono) if dono else None
+    if job is None:
+        return {"sucesso": False, "mensagem": "Job não encontrado ou expirado"}
+    return {"sucesso": True, "job": job.to_dict()}
+
+@eel.expose
+def obter_resultado_job(job_id):
+    """Retorna o resultado de um job concluído do usuário logado (disponível até expirar o TTL)"""
+    dono = _dono_job()
+    job = job_manager.get(job_id, dono) if dono else None
+    if job is None:
+        return {"sucesso": False, "mensagem": "Job não encontrado ou expirado"}
+    if job.status != 'concluido':
+        return {"sucesso": False, "mensagem": f"Job ainda não concluído (status: {job.status})", "job": job.to_dict()}
+    return {"sucesso": True, "job": job.to_dict(), "resultado": job.resultado}
+
+@eel.expose
+def cancelar_job(job_id):
+    """Solicita o cancelamento de um job do usuário logado"""
+    dono = _dono_job()
+    job = job_manager.cancel(job_id, dono) if dono else None
+    if job is None:
+        return {"sucesso": False, "mensagem": "Job não encontrado ou expirado"}
+    return {"sucesso": True, "mensagem": "Cancelamento solicitado", "job": job.to_dict()}
+
+@eel.expose
+def listar_jobs():
+    """Lista os jobs do usuário logado em andamento e os resultados ainda disponíveis"""
+    dono = _dono_job()
+    if dono is None:
+        return {"sucesso": False, "mensagem": "Usuário não autenticado"}
+    return {"sucesso": True, "jobs": job_manager.list(dono)}
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
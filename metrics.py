@@ -0,0 +1,406 @@
+# metrics.py - Instrumentação por endpoint (latência, SQL executado, linhas e payload)
+import bisect
+import functools
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import threadpool
+
+try:
+    from greenlet import getcurrent as _contexto_atual
+except ImportError:  # pragma: no cover
+    _contexto_atual = threading.current_thread
+
+# Limites (ms) dos buckets do histograma de latência
+BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# Chamadas em andamento por greenlet/thread: lista de frames (chamadas aninhadas)
+_frames = {}
+
+# Funções observador(sql, parametros, duracao_ms) chamadas após cada comando
+_observadores_sql = []
+
+
+class _Frame:
+    __slots__ = ('nome', 'sql', 'linhas', 'medir_payload', 'payload')
+
+    def __init__(self, nome, medir_payload=True):
+        self.nome = nome
+        self.sql = 0
+        self.linhas = 0
+        self.medir_payload = medir_payload
+        # Tamanho medido na thread do threadpool (None: medir ao retornar)
+        self.payload = None
+
+
+def _frames_atuais():
+    return _frames.get(_contexto_atual())
+
+
+def capturar_contexto():
+    """Frames do chamador, para continuar a contagem na thread do threadpool"""
+    return _frames_atuais()
+
+
+@contextmanager
+def instalar_contexto(frames):
+    if not frames:
+        yield
+        return
+    chave = _contexto_atual()
+    anterior = _frames.get(chave)
+    _frames[chave] = frames
+    try:
+        yield
+    finally:
+        if anterior is None:
+            _frames.pop(chave, None)
+        else:
+            _frames[chave] = anterior
+
+
+threadpool.registrar_propagador(capturar_contexto, instalar_contexto)
+
+
+def registrar_observador_sql(observador):
+    """Registra ``observador(sql, parametros, duracao_ms)`` para todo comando executado"""
+    _observadores_sql.append(observador)
+
+
+def endpoint_atual():
+    """Nome da chamada instrumentada mais interna em andamento (ou None)"""
+    frames = _frames_atuais()
+    return frames[-1].nome if frames else None
+
+
+def _observar(sql, parametros, inicio):
+    _notificar(sql, parametros, (time.perf_counter() - inicio) * 1000)
+
+
+def _notificar(sql, parametros, duracao_ms):
+    for observador in _observadores_sql:
+        try:
+            observador(sql, parametros, duracao_ms)
+        except Exception as e:
+            print(f"⚠️ Erro no observador de SQL: {e}")
+
+
+def registrar_sql(quantidade=1):
+    """Contabiliza comandos SQL executados nas chamadas em andamento"""
+    frames = _frames_atuais()
+    if frames:
+        for frame in frames:
+            frame.sql += quantidade
+
+
+def registrar_linhas(quantidade):
+    """Contabiliza linhas lidas nas chamadas em andamento"""
+    if not quantidade:
+        return
+    frames = _frames_atuais()
+    if frames:
+        for frame in frames:
+            frame.linhas += quantidade
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que contabiliza comandos executados e linhas lidas
+
+    Com observadores registrados, a duração de uma consulta soma o execute e
+    as leituras das linhas: no SQLite a maior parte do trabalho de um SELECT
+    acontece em fetch*/iteração. Os observadores são chamados quando as linhas
+    acabam, no próximo execute, no close() ou quando o cursor é descartado.
+    """
+
+    # [sql, parametros, segundos acumulados] da consulta em andamento
+    _pendente = None
+
+    def _acumular(self, inicio, fim=False):
+        if self._pendente is not None:
+            self._pendente[2] += time.perf_counter() - inicio
+            if fim:
+                self._concluir()
+
+    def _concluir(self):
+        pendente = self._pendente
+        if pendente is not None:
+            self._pendente = None
+            _notificar(pendente[0], pendente[1], pendente[2] * 1000)
+
+    def execute(self, sql, parametros=()):
+        registrar_sql()
+        if not _observadores_sql:
+            return super().execute(sql, parametros)
+        self._concluir()
+        self._pendente = [sql, parametros, 0.0]
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            # Sem linhas a ler (INSERT/UPDATE/DDL): o comando terminou no execute
+            self._acumular(inicio, fim=self.description is None)
+
+    def executemany(self, sql, seq_parametros):
+        registrar_sql()
+        if not _observadores_sql:
+            return super().executemany(sql, seq_parametros)
+        self._concluir()
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_parametros)
+        finally:
+            _observar(sql, None, inicio)
+
+    def executescript(self, script):
+        registrar_sql()
+        self._concluir()
+        return super().executescript(script)
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        row = super().fetchone()
+        self._acumular(inicio, fim=row is None)
+        if row is not None:
+            registrar_linhas(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        tamanho = kwargs.get('size', args[0] if args else self.arraysize)
+        inicio = time.perf_counter()
+        rows = super().fetchmany(*args, **kwargs)
+        self._acumular(inicio, fim=len(rows) < tamanho)
+        registrar_linhas(len(rows))
+        return rows
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        rows = super().fetchall()
+        self._acumular(inicio, fim=True)
+        registrar_linhas(len(rows))
+        return rows
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._acumular(inicio, fim=True)
+            raise
+        self._acumular(inicio)
+        registrar_linhas(1)
+        return row
+
+    def close(self):
+        self._concluir()
+        super().close()
+
+    def __del__(self):
+        self._concluir()
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive de ``conn.execute``) são instrumentados"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Os atalhos do sqlite3 criam cursores internos sem passar por cursor()
+    def execute(self, *args):
+        return self.cursor().execute(*args)
+
+    def executemany(self, *args):
+        return self.cursor().executemany(*args)
+
+    def executescript(self, *args):
+        return self.cursor().executescript(*args)
+
+
+class EndpointMetrics:
+    """Histograma em memória por endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados = {}
+        self.inicio = time.time()
+
+    def _registro(self, nome):
+        registro = self._dados.get(nome)
+        if registro is None:
+            registro = {
+                "chamadas": 0,
+                "erros": 0,
+                "tempo_total_ms": 0.0,
+                "tempo_max_ms": 0.0,
+                "sql_total": 0,
+                "sql_max": 0,
+                "linhas_total": 0,
+                "linhas_max": 0,
+                "payload_total_bytes": 0,
+                "payload_max_bytes": 0,
+                "histograma": [0] * (len(BUCKETS_MS) + 1),
+            }
+            self._dados[nome] = registro
+        return registro
+
+    def registrar(self, nome, duracao_ms, sql, linhas, payload_bytes, erro=False):
+        with self._lock:
+            r = self._registro(nome)
+            r["chamadas"] += 1
+            r["erros"] += 1 if erro else 0
+            r["tempo_total_ms"] += duracao_ms
+            r["tempo_max_ms"] = max(r["tempo_max_ms"], duracao_ms)
+            r["sql_total"] += sql
+            r["sql_max"] = max(r["sql_max"], sql)
+            r["linhas_total"] += linhas
+            r["linhas_max"] = max(r["linhas_max"], linhas)
+            r["payload_total_bytes"] += payload_bytes
+            r["payload_max_bytes"] = max(r["payload_max_bytes"], payload_bytes)
+            r["histograma"][bisect.bisect_left(BUCKETS_MS, duracao_ms)] += 1
+
+    @staticmethod
+    def _percentil(histograma, total, p):
+        """Estimativa pelo limite superior do bucket que contém o percentil"""
+        alvo = total * p
+        acumulado = 0
+        for indice, quantidade in enumerate(histograma):
+            acumulado += quantidade
+            if acumulado >= alvo and quantidade:
+                return BUCKETS_MS[indice] if indice < len(BUCKETS_MS) else None
+        return None
+
+    def resumo(self, ordenar_por='tempo_total_ms', limite=None):
+        """Lista de endpoints com médias, percentis e histograma"""
+        with self._lock:
+            dados = {nome: dict(r, histograma=list(r["histograma"])) for nome, r in self._dados.items()}
+        resultado = []
+        for nome, r in dados.items():
+            chamadas = r["chamadas"] or 1
+            resultado.append({
+                "endpoint": nome,
+                "chamadas": r["chamadas"],
+                "erros": r["erros"],
+                "tempo_total_ms": round(r["tempo_total_ms"], 2),
+                "tempo_medio_ms": round(r["tempo_total_ms"] / chamadas, 2),
+                "tempo_max_ms": round(r["tempo_max_ms"], 2),
+                "p50_ms": self._percentil(r["histograma"], r["chamadas"], 0.50),
+                "p95_ms": self._percentil(r["histograma"], r["chamadas"], 0.95),
+                "sql_medio": round(r["sql_total"] / chamadas, 1),
+                "sql_max": r["sql_max"],
+                "linhas_medio": round(r["linhas_total"] / chamadas, 1),
+                "linhas_max": r["linhas_max"],
+                "payload_medio_bytes": int(r["payload_total_bytes"] / chamadas),
+                "payload_max_bytes": r["payload_max_bytes"],
+                "histograma": dict(zip([f"<={b}ms" for b in BUCKETS_MS] + ["mais"], r["histograma"])),
+            })
+        resultado.sort(key=lambda item: item.get(ordenar_por) or 0, reverse=True)
+        return resultado[:limite] if limite else resultado
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+            self.inicio = time.time()
+
+
+metricas = EndpointMetrics()
+
+
+def _tamanho_payload(resultado):
+    try:
+        return len(json.dumps(resultado, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _medir_payload_na_thread(resultado):
+    """Mede o payload da chamada despachada ainda na thread de trabalho.
+
+    O frame mais interno é o da chamada instrumentada que despachou a função
+    (frames aninhados na thread já foram removidos ao retornar).
+    """
+    frames = _frames_atuais()
+    if frames:
+        frame = frames[-1]
+        if frame.medir_payload and frame.payload is None:
+            frame.payload = _tamanho_payload(resultado)
+
+
+threadpool.registrar_finalizador(_medir_payload_na_thread)
+
+
+def instrument(nome, medir_payload=True):
+    """Decorator: registra latência, SQL, linhas e payload de ``nome``
+
+    Em funções despachadas ao threadpool o payload é medido na thread de
+    trabalho; o loop do gevent não serializa o resultado novamente.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            chave = _contexto_atual()
+            frames = _frames.get(chave)
+            if frames is None:
+                frames = _frames[chave] = []
+            frame = _Frame(nome, medir_payload)
+            frames.append(frame)
+            inicio = time.perf_counter()
+            erro = False
+            resultado = None
+            try:
+                resultado = func(*args, **kwargs)
+                if isinstance(resultado, dict) and resultado.get("sucesso") is False:
+                    erro = True
+                return resultado
+            except Exception:
+                erro = True
+                raise
+            finally:
+                duracao_ms = (time.perf_counter() - inicio) * 1000
+                frames.pop()
+                if not frames:
+                    _frames.pop(chave, None)
+                if frame.payload is not None:
+                    payload = frame.payload
+                else:
+                    payload = _tamanho_payload(resultado) if medir_payload else 0
+                metricas.registrar(nome, duracao_ms, frame.sql, frame.linhas, payload, erro)
+        wrapper.__instrumentado__ = True
+        return wrapper
+    return decorator
+
+
+def instrument_expose(expose, prefixo=''):
+    """Envolve ``eel.expose``: toda função exposta é registrada já instrumentada
+
+    Aceita as mesmas formas do decorator do Eel (``@expose``, ``@expose()`` e
+    ``@expose("nome")``) e devolve a função instrumentada, de modo que as
+    chamadas diretas (testes, outros endpoints) também são medidas.
+    """
+    def instrumentar(nome, func):
+        if getattr(func, '__instrumentado__', False):
+            return func
+        return instrument(prefixo + nome)(func)
+
+    @functools.wraps(expose)
+    def expose_instrumentado(nome_ou_funcao=None):
+        if nome_ou_funcao is None:
+            return expose_instrumentado
+        if isinstance(nome_ou_funcao, str):
+            registrar = expose(nome_ou_funcao)
+            return lambda func: registrar(instrumentar(nome_ou_funcao, func))
+        # O Eel expõe pelo __name__, preservado por functools.wraps
+        return expose(instrumentar(nome_ou_funcao.__name__, nome_ou_funcao))
+    return expose_instrumentado
+
+
+def instrument_class(prefixo):
+    """Decorator de classe: instrumenta todos os métodos públicos"""
+    def decorator(cls):
+        for nome, atributo in list(vars(cls).items()):
+            if nome.startswith('_') or not callable(atributo) or nome == 'get_connection':
+                continue
+            setattr(cls, nome, instrument(f"{prefixo}.{nome}")(atributo))
+        return cls
+    return decorator
@@ -0,0 +1,272 @@
+# migration_runner.py - Executor versionado e transacional das migrações
+import os
+import re
+import sqlite3
+import sys
+import time
+import importlib.util
+from datetime import datetime
+
+# Migrações até esta versão foram aplicadas manualmente (scripts e .sql antigos,
+# com números duplicados). Em bancos existentes elas são registradas como
+# baseline e nunca reexecutadas pelo executor.
+VERSAO_BASELINE = 25
+
+# Tabelas criadas pelas migrações antigas: com todas presentes o banco é
+# existente (marcado como baseline); sem nenhuma, é novo e recebe o schema da
+# versão baseline (BASELINE_SQL), já que as migrações antigas foram escritas
+# para schemas anteriores e não recriam o banco do zero.
+TABELAS_BASELINE = ('procedimento_pms_envolvidos', 'prazos_processo')
+
+# Schema completo da versão VERSAO_BASELINE, em migrations/ (não numerado: o
+# executor não o confunde com uma migração)
+BASELINE_SQL = f'baseline_{VERSAO_BASELINE:03d}.sql'
+
+PADRAO_ARQUIVO = re.compile(r'^(\d{3})_[\w-]+\.(sql|py)$')
+PADRAO_CONTROLE_TRANSACAO = re.compile(
+    r'^\s*(BEGIN(\s+(DEFERRED|IMMEDIATE|EXCLUSIVE))?(\s+TRANSACTION)?|COMMIT(\s+TRANSACTION)?|END(\s+TRANSACTION)?)\s*;\s*$',
+    re.IGNORECASE
+)
+
+
+class MigrationError(RuntimeError):
+    """Migração não aplicada; o banco foi restaurado e a inicialização deve parar"""
+
+
+def diretorio_migracoes_padrao():
+    """Pasta migrations/ (dentro do executável quando empacotado com PyInstaller)"""
+    base = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, 'migrations')
+
+
+def dividir_sql(script):
+    """Divide um script em comandos completos (respeita corpos de triggers)"""
+    comandos, atual = [], ''
+    for linha in script.splitlines(keepends=True):
+        atual += linha
+        if sqlite3.complete_statement(atual):
+            comando = atual.strip()
+            atual = ''
+            # Remover comentários de linha antes do comando
+            sem_comentarios = '\n'.join(
+                l for l in comando.splitlines() if not l.strip().startswith('--')
+            ).strip()
+            if not sem_comentarios or PADRAO_CONTROLE_TRANSACAO.match(sem_comentarios):
+                continue
+            comandos.append(comando)
+    if atual.strip() and '\n'.join(l for l in atual.splitlines() if not l.strip().startswith('--')).strip():
+        comandos.append(atual.strip())
+    return comandos
+
+
+class MigrationRunner:
+    """Aplica as migrações pendentes de ``migrations/``, uma transação por etapa.
+
+    Arquivos ``NNN_nome.sql`` (comandos SQL, sem BEGIN/COMMIT) ou ``NNN_nome.py``
+    (com ``upgrade(conn)``, sem commit). A versão aplicada fica em
+    ``schema_migrations`` e em ``PRAGMA user_version``: quando o banco já está
+    na última versão, a inicialização faz apenas uma leitura desse PRAGMA.
+    Migrações antigas (até ``VERSAO_BASELINE``) nunca são executadas: bancos
+    existentes são marcados como baseline e bancos novos recebem ``BASELINE_SQL``.
+    Se uma etapa falhar, o banco volta ao backup feito antes da execução e
+    ``run()`` levanta ``MigrationError``.
+    """
+
+    def __init__(self, db_path, diretorio=None, busy_timeout_ms=5000):
+        self.db_path = db_path
+        self.diretorio = diretorio or diretorio_migracoes_padrao()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.ultimo_resultado = None
+
+    def descobrir(self):
+        """Lista (versao, nome, caminho) ordenada por versão e nome"""
+        if not os.path.isdir(self.diretorio):
+            return []
+        migracoes = []
+        for nome in os.listdir(self.diretorio):
+            match = PADRAO_ARQUIVO.match(nome)
+            if match:
+                migracoes.append((int(match.group(1)), nome, os.path.join(self.diretorio, nome)))
+        return sorted(migracoes)
+
+    def _conectar(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+        conn.isolation_level = None  # transações controladas manualmente
+        return conn
+
+    @staticmethod
+    def _garantir_tabela(conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                migration_name TEXT UNIQUE NOT NULL,
+                executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                execution_time_ms INTEGER,
+                success BOOLEAN DEFAULT 1
+            )
+        ''')
+
+    def run(self):
+        """Aplica o que estiver pendente e retorna o resumo da execução"""
+        inicio = time.perf_counter()
+        migracoes = self.descobrir()
+        versao_alvo = max([v for v, _, _ in migracoes] + [VERSAO_BASELINE])
+        resultado = {
+            "versao_anterior": None,
+            "versao_atual": None,
+            "aplicadas": [],
+            "baseline": 0,
+            "schema_baseline_criado": False,
+            "backup": None,
+            "erro": None,
+        }
+
+        conn = self._conectar()
+        try:
+            versao = conn.execute("PRAGMA user_version").fetchone()[0]
+            resultado["versao_anterior"] = versao
+            if versao >= versao_alvo:
+                # Banco atualizado: nada a fazer
+                resultado["versao_atual"] = versao
+                return self._finalizar(resultado, inicio)
+
+            # Backup antes de qualquer alteração (inclusive do baseline)
+            proxima = min((n for n, _, _ in migracoes if n > max(versao, VERSAO_BASELINE)), default=versao_alvo)
+            resultado["backup"] = self._backup(conn, proxima)
+            try:
+                self._migrar(conn, migracoes, versao, versao_alvo, resultado)
+            except Exception as e:
+                resultado["erro"] = str(e)
+                print(f"❌ Erro ao aplicar migrações: {e}")
+                self._restaurar(conn, resultado["backup"])
+                resultado["versao_atual"] = conn.execute("PRAGMA user_version").fetchone()[0]
+                self._finalizar(resultado, inicio)
+                raise MigrationError(
+                    f"Migrações não aplicadas ({e}); banco restaurado de {resultado['backup']}"
+                ) from e
+        finally:
+            conn.close()
+        return self._finalizar(resultado, inicio)
+
+    def _migrar(self, conn, migracoes, versao, versao_alvo, resultado):
+        self._garantir_tabela(conn)
+        registradas = {
+            row[0] for row in conn.execute(
+                "SELECT migration_name FROM schema_migrations WHERE success = 1"
+            ).fetchall()
+        }
+
+        # Baseline: migrações antigas contam como aplicadas; banco novo recebe o schema
+        if versao < VERSAO_BASELINE:
+            novo = self._banco_novo(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if novo:
+                    self._criar_schema_baseline(conn)
+                    resultado["schema_baseline_criado"] = True
+                for numero, nome, _ in migracoes:
+                    if numero <= VERSAO_BASELINE and nome not in registradas:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO schema_migrations (migration_name, execution_time_ms, success) VALUES (?, NULL, 1)",
+                            (nome,)
+                        )
+                        resultado["baseline"] += 1
+                conn.execute(f"PRAGMA user_version = {VERSAO_BASELINE}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            versao = VERSAO_BASELINE
+            if novo:
+                print(f"🆕 Schema baseline criado: {BASELINE_SQL}")
+
+        pendentes = [m for m in migracoes if m[0] > VERSAO_BASELINE and m[1] not in registradas]
+        for numero, nome, caminho in pendentes:
+            tempo_ms = self._aplicar(conn, numero, nome, caminho, versao)
+            versao = max(versao, numero)
+            resultado["aplicadas"].append({"migracao": nome, "tempo_ms": tempo_ms})
+            print(f"🔧 Migração aplicada: {nome} ({tempo_ms} ms)")
+
+        if versao < versao_alvo:
+            conn.execute(f"PRAGMA user_version = {versao_alvo}")
+        resultado["versao_atual"] = max(versao, versao_alvo)
+
+    @staticmethod
+    def _banco_novo(conn):
+        """True sem nenhuma tabela antiga, False com todas; schema parcial é erro"""
+        existentes = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        ).fetchall()}
+        presentes = [tabela for tabela in TABELAS_BASELINE if tabela in existentes]
+        if presentes and len(presentes) < len(TABELAS_BASELINE):
+            faltando = [tabela for tabela in TABELAS_BASELINE if tabela not in existentes]
+            raise MigrationError(f"Schema antigo incompleto: faltam as tabelas {', '.join(faltando)}")
+        return not presentes
+
+    def _criar_schema_baseline(self, conn):
+        """Executa BASELINE_SQL (dentro da transação do chamador)"""
+        caminho = os.path.join(self.diretorio, BASELINE_SQL)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for comando in dividir_sql(f.read()):
+                conn.execute(comando)
+
+    def _aplicar(self, conn, numero, nome, caminho, versao_atual):
+        """Executa uma migração em uma única transação e registra o resultado"""
+        inicio = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if nome.endswith('.sql'):
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    for comando in dividir_sql(f.read()):
+                        conn.execute(comando)
+            else:
+                spec = importlib.util.spec_from_file_location(f"migracao_{numero}", caminho)
+                modulo = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(modulo)
+                modulo.upgrade(conn)
+            tempo_ms = int((time.perf_counter() - inicio) * 1000)
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_migrations (migration_name, executed_at, execution_time_ms, success) VALUES (?, CURRENT_TIMESTAMP, ?, 1)",
+                (nome,  tempo_ms)
+            )
+            conn.execute(f"PRAGMA user_version = {max(versao_atual, numero)}")
+            conn.execute("COMMIT")
+            return tempo_ms
+        except Exception:
+            conn.execute("ROLLBACK")
+            tempo_ms = int((time.perf_counter() - inicio) * 1000)
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_migrations (migration_name, executed_at, execution_time_ms, success) VALUES (?, CURRENT_TIMESTAMP, ?, 0)",
+                (nome, tempo_ms)
+            )
+            raise
+
+    def _backup(self, conn, versao):
+        """Cópia única do banco antes de aplicar as migrações pendentes"""
+        pasta = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'backups')
+        os.makedirs(pasta, exist_ok=True)
+        destino = os.path.join(
+            pasta, f"pre_migracao_{versao:03d}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+        )
+        backup = sqlite3.connect(destino)
+        try:
+            conn.backup(backup)
+        finally:
+            backup.close()
+        print(f"💾 Backup antes das migrações: {destino}")
+        return destino
+
+    @staticmethod
+    def _restaurar(conn, origem):
+        """Copia o backup de volta para o banco (desfaz as etapas já aplicadas)"""
+        backup = sqlite3.connect(origem)
+        try:
+            backup.backup(conn)
+        finally:
+            backup.close()
+        print(f"↩️ Banco restaurado do backup: {origem}")
+
+    def _finalizar(self, resultado, inicio):
+        resultado["tempo_total_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        self.ultimo_resultado = resultado
+        return resultado
@@ -0,0 +1,8 @@
+-- Migration 026: Índice para a listagem de processos ativos por data de criação
+-- Data: 2026-10-17
+-- Descrição: listar_processos/listar_processos_stream percorrem os ativos em
+-- ORDER BY created_at DESC; com o índice o SQLite entrega as primeiras linhas
+-- sem ordenar a tabela inteira em memória.
+
+CREATE INDEX IF NOT EXISTS idx_processos_ativo_created_at
+ON processos_procedimentos(ativo, created_at DESC);
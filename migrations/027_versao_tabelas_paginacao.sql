@@ -0,0 +1,58 @@
+-- Migration 027: Versões de tabela para cache de paginação e índices de ordenação
+-- Data: 2026-10-17
+-- Descrição: versao_tabelas é incrementada por triggers a cada escrita em
+-- processos_procedimentos/usuarios; o PaginationCache reaproveita totais e
+-- limites de página enquanto a versão não mudar. Os índices cobrem a ordem
+-- das listagens paginadas (chave de ordenação + id) para a paginação por chave.
+
+CREATE TABLE IF NOT EXISTS versao_tabelas (
+    tabela TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO versao_tabelas (tabela, versao) VALUES ('processos_procedimentos', 0);
+INSERT OR IGNORE INTO versao_tabelas (tabela, versao) VALUES ('usuarios', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_processos_insert
+AFTER INSERT ON processos_procedimentos
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processos_procedimentos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_processos_update
+AFTER UPDATE ON processos_procedimentos
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processos_procedimentos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_processos_delete
+AFTER DELETE ON processos_procedimentos
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processos_procedimentos';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_usuarios_insert
+AFTER INSERT ON usuarios
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_usuarios_update
+AFTER UPDATE ON usuarios
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_usuarios_delete
+AFTER DELETE ON usuarios
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'usuarios';
+END;
+
+-- Ordem de listar_processos_com_prazos: COALESCE(data_instauracao, created_at) DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_processos_ordem_listagem
+ON processos_procedimentos(ativo, COALESCE(data_instauracao, created_at) DESC, id DESC);
+
+-- Ordem de get_paginated_users: nome, id
+CREATE INDEX IF NOT EXISTS idx_usuarios_ativo_nome
+ON usuarios(ativo, nome, id);
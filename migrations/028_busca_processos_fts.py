@@ -0,0 +1,128 @@
+# Migration 028: Índice de texto completo (FTS5) para a busca de processos
+# Data: 2026-10-17
+# Descrição: processos_busca indexa os campos da busca livre de
+# listar_processos_com_prazos (número, SEI, portaria, resumo dos fatos e nomes
+# do responsável/PM). Triggers em processos_procedimentos e usuarios mantêm o
+# índice sincronizado. processos_busca_ids liga o rowid do FTS ao id (TEXT) do
+# processo com um INTEGER PRIMARY KEY, que não muda com VACUUM.
+#
+# Em builds do SQLite sem FTS5 a migração não cria nada e a busca continua
+# usando LIKE (SchemaCapabilities.busca_fts = False).
+
+import sqlite3
+
+# Colunas indexadas (mesma ordem nos INSERTs abaixo)
+COLUNAS = (
+    "numero, tipo_detalhe, local_origem, processo_sei, numero_portaria, "
+    "numero_memorando, numero_feito, responsavel_nome, pm_nome, resumo_fatos"
+)
+
+
+def _valores(p):
+    """Expressões das colunas indexadas para o processo ``p`` (NEW ou alias)"""
+    return (
+        f"{p}.numero, {p}.tipo_detalhe, {p}.local_origem, {p}.processo_sei, {p}.numero_portaria, "
+        f"{p}.numero_memorando, {p}.numero_feito, "
+        f"(SELECT nome FROM usuarios WHERE id = {p}.responsavel_id), "
+        f"(SELECT nome FROM usuarios WHERE id = {p}.nome_pm_id), "
+        f"{p}.resumo_fatos"
+    )
+
+
+COMANDOS = [
+    """
+    CREATE TABLE IF NOT EXISTS processos_busca_ids (
+        id_busca INTEGER PRIMARY KEY,
+        processo_id TEXT UNIQUE NOT NULL
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS processos_busca USING fts5(
+        {COLUNAS},
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # Carga inicial
+    """
+    INSERT OR IGNORE INTO processos_busca_ids (processo_id)
+    SELECT id FROM processos_procedimentos
+    """,
+    f"""
+    INSERT INTO processos_busca (rowid, {COLUNAS})
+    SELECT b.id_busca, {_valores('p')}
+    FROM processos_procedimentos p
+    JOIN processos_busca_ids b ON b.processo_id = p.id
+    """,
+    # Sincronização: processos
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_busca_processos_insert
+    AFTER INSERT ON processos_procedimentos
+    BEGIN
+        INSERT OR IGNORE INTO processos_busca_ids (processo_id) VALUES (NEW.id);
+        INSERT INTO processos_busca (rowid, {COLUNAS})
+        SELECT id_busca, {_valores('NEW')}
+        FROM processos_busca_ids WHERE processo_id = NEW.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_busca_processos_update
+    AFTER UPDATE OF id, numero, tipo_detalhe, local_origem, processo_sei, numero_portaria,
+                    numero_memorando, numero_feito, responsavel_id, nome_pm_id, resumo_fatos
+    ON processos_procedimentos
+    BEGIN
+        DELETE FROM processos_busca
+        WHERE rowid = (SELECT id_busca FROM processos_busca_ids WHERE processo_id = OLD.id);
+        DELETE FROM processos_busca_ids WHERE processo_id = OLD.id AND OLD.id <> NEW.id;
+        INSERT OR IGNORE INTO processos_busca_ids (processo_id) VALUES (NEW.id);
+        INSERT INTO processos_busca (rowid, {COLUNAS})
+        SELECT id_busca, {_valores('NEW')}
+        FROM processos_busca_ids WHERE processo_id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_busca_processos_delete
+    AFTER DELETE ON processos_procedimentos
+    BEGIN
+        DELETE FROM processos_busca
+        WHERE rowid = (SELECT id_busca FROM processos_busca_ids WHERE processo_id = OLD.id);
+        DELETE FROM processos_busca_ids WHERE processo_id = OLD.id;
+    END
+    """,
+    # Sincronização: nome do responsável/PM alterado
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_busca_usuarios_nome
+    AFTER UPDATE OF nome ON usuarios
+    WHEN OLD.nome IS NOT NEW.nome
+    BEGIN
+        DELETE FROM processos_busca WHERE rowid IN (
+            SELECT b.id_busca
+            FROM processos_procedimentos p
+            JOIN processos_busca_ids b ON b.processo_id = p.id
+            WHERE p.responsavel_id = NEW.id OR p.nome_pm_id = NEW.id
+        );
+        INSERT INTO processos_busca (rowid, {COLUNAS})
+        SELECT b.id_busca, {_valores('p')}
+        FROM processos_procedimentos p
+        JOIN processos_busca_ids b ON b.processo_id = p.id
+        WHERE p.responsavel_id = NEW.id OR p.nome_pm_id = NEW.id;
+    END
+    """,
+]
+
+
+def fts5_disponivel(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.teste_fts5 USING fts5(x)")
+        conn.execute("DROP TABLE temp.teste_fts5")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def upgrade(conn):
+    if not fts5_disponivel(conn):
+        print("⚠️ SQLite sem FTS5: busca de processos continuará usando LIKE")
+        return
+    for comando in COMANDOS:
+        conn.execute(comando)
@@ -0,0 +1,255 @@
+# Migration 029: Listagem de processos materializada (processo_listagem)
+# Data: 2026-10-17
+# Descrição: processo_listagem guarda, por processo, os campos de exibição de
+# listar_processos_com_prazos já formatados (número formatado, responsável
+# completo, "Presidente e outros" de PAD/CD/CJ, "PM e outros" com tooltip,
+# datas dd/mm/aaaa) e as colunas usadas nos filtros. Triggers em
+# processos_procedimentos, procedimento_pms_envolvidos e usuarios recalculam
+# as linhas afetadas, de modo que a listagem lê uma única tabela indexada.
+# As regras abaixo reproduzem a formatação que era feita em Python.
+
+COLUNAS = (
+    "processo_id, ativo, ordem, numero, numero_controle, numero_formatado, "
+    "tipo_geral, tipo_detalhe, documento_iniciador, "
+    "data_recebimento, data_recebimento_formatada, data_instauracao, data_instauracao_formatada, "
+    "created_at, responsavel_completo, responsavel_posto, responsavel_matricula, responsavel_nome, "
+    "encarregado_display, encarregado_tooltip, "
+    "presidente_completo, interrogante_completo, escrivao_completo, "
+    "local_origem, local_fatos, processo_sei, nome_pm_id, status_pm, nome_vitima, "
+    "pm_envolvido_nome, pm_envolvido_tooltip, pm_envolvido_posto, pm_envolvido_matricula, "
+    "responsavel_filtro, pm_filtro, ano_filtro, concluido, data_conclusao"
+)
+
+
+def _nome_funcao(u):
+    """posto + matrícula + nome do usuário ``u`` (NULL sem nome)"""
+    return (
+        f"CASE WHEN COALESCE({u}.nome, '') = '' THEN NULL "
+        f"ELSE TRIM(COALESCE({u}.posto_graduacao, '') || ' ' || COALESCE({u}.matricula, '') || ' ' || {u}.nome) END"
+    )
+
+
+def _filtro_usuario(u):
+    """Texto comparado pelos filtros encarregado/pm_envolvido"""
+    return f"TRIM(COALESCE({u}.posto_graduacao || ' ' || {u}.matricula || ' ' || {u}.nome, ''))"
+
+
+# Nome completo de um PM envolvido (mesma regra de carregar_pms_envolvidos_lote)
+NOME_PM_ENVOLVIDO = (
+    "CASE WHEN u.nome = 'A APURAR' THEN 'A APURAR' "
+    "ELSE TRIM(REPLACE(COALESCE(u.posto_graduacao, '') || ' ' || COALESCE(u.matricula, '') || ' ' "
+    "|| COALESCE(u.nome, ''), '  ', ' ')) END"
+)
+
+PMS_PROCEDIMENTO = (
+    "FROM procedimento_pms_envolvidos pe "
+    "JOIN usuarios u ON u.id = pe.pm_id AND u.ativo = 1 "
+    "WHERE pe.procedimento_id = p.id"
+)
+
+
+def sql_atualizar(where):
+    """INSERT OR REPLACE das linhas de processo_listagem dos processos ``p`` em ``where``"""
+    return f"""
+    INSERT OR REPLACE INTO processo_listagem ({COLUNAS})
+    SELECT
+        b.id, b.ativo, COALESCE(b.data_instauracao, b.created_at),
+        b.numero, b.numero_controle,
+        CASE WHEN b.numero_exibicao IS NULL THEN 'S/N'
+             ELSE b.tipo_detalhe || ' nº ' || b.numero_exibicao || '/' || COALESCE(b.local_origem, '') || '/'
+                  || COALESCE(strftime('%Y', COALESCE(NULLIF(b.data_instauracao, ''), NULLIF(b.data_recebimento, ''))), '')
+        END,
+        b.tipo_geral, b.tipo_detalhe, b.documento_iniciador,
+        b.data_recebimento, strftime('%d/%m/%Y', b.data_recebimento),
+        b.data_instauracao, strftime('%d/%m/%Y', b.data_instauracao),
+        b.created_at,
+        b.responsavel_completo, b.responsavel_posto, b.responsavel_matricula, b.responsavel_nome,
+        CASE WHEN b.funcoes_pad THEN COALESCE(b.presidente_completo || ' e outros', 'Não se aplica')
+             ELSE b.responsavel_completo END,
+        CASE WHEN b.funcoes_pad THEN COALESCE(
+                 NULLIF(SUBSTR(COALESCE('; Presidente: ' || b.presidente_completo, '')
+                               || COALESCE('; Interrogante: ' || b.interrogante_completo, '')
+                               || COALESCE('; Escrivão do Processo: ' || b.escrivao_completo, ''), 3), ''),
+                 COALESCE(b.presidente_completo || ' e outros', 'Não se aplica'))
+             ELSE b.responsavel_completo END,
+        b.presidente_completo, b.interrogante_completo, b.escrivao_completo,
+        b.local_origem, b.local_fatos, b.processo_sei, b.nome_pm_id, b.status_pm, b.nome_vitima,
+        CASE WHEN b.tipo_geral = 'procedimento' THEN
+                 CASE WHEN b.pms_qtd = 0 THEN 'Não informado'
+                      WHEN b.pms_qtd = 1 THEN b.pm_primeiro
+                      ELSE b.pm_primeiro || ' e outros' END
+             ELSE b.pm_unico END,
+        CASE WHEN b.tipo_geral = 'procedimento' THEN
+                 CASE WHEN b.pms_qtd = 0 THEN 'Não informado'
+                      WHEN b.pms_qtd = 1 THEN b.pm_primeiro
+                      ELSE b.pms_todos END
+             ELSE b.pm_unico END,
+        b.pm_posto, b.pm_matricula,
+        b.responsavel_filtro, b.pm_filtro, b.ano_filtro, b.concluido, b.data_conclusao
+    FROM (
+        SELECT
+            p.id, p.ativo, p.numero, p.numero_controle, p.tipo_geral, p.tipo_detalhe,
+            p.documento_iniciador, p.data_recebimento, p.data_instauracao, p.created_at,
+            p.local_origem, p.local_fatos, p.processo_sei, p.nome_pm_id, p.status_pm, p.nome_vitima,
+            p.concluido, p.data_conclusao,
+            COALESCE(NULLIF(p.numero_controle, ''), NULLIF(p.numero, '')) AS numero_exibicao,
+            p.tipo_geral = 'processo' AND p.tipo_detalhe IN ('PAD', 'CD', 'CJ') AS funcoes_pad,
+            TRIM(COALESCE(u_resp.posto_graduacao, '') || ' ' || COALESCE(u_resp.matricula, '') || ' '
+                 || COALESCE(u_resp.nome, 'Desconhecido')) AS responsavel_completo,
+            COALESCE(u_resp.posto_graduacao, '') AS responsavel_posto,
+            COALESCE(u_resp.matricula, '') AS responsavel_matricula,
+            COALESCE(u_resp.nome, 'Desconhecido') AS responsavel_nome,
+            {_nome_funcao('u_pres')} AS presidente_completo,
+            {_nome_funcao('u_int')} AS interrogante_completo,
+            {_nome_funcao('u_escr')} AS escrivao_completo,
+            CASE WHEN u_pm.nome IS NULL THEN 'Não informado'
+                 WHEN u_pm.nome = 'A APURAR' THEN 'A APURAR'
+                 ELSE TRIM(COALESCE(u_pm.posto_graduacao, '') || ' ' || COALESCE(u_pm.matricula, '') || ' ' || u_pm.nome)
+            END AS pm_unico,
+            COALESCE(u_pm.posto_graduacao, '') AS pm_posto,
+            COALESCE(u_pm.matricula, '') AS pm_matricula,
+            (SELECT COUNT(*) {PMS_PROCEDIMENTO}) AS pms_qtd,
+            (SELECT {NOME_PM_ENVOLVIDO} {PMS_PROCEDIMENTO} ORDER BY pe.ordem LIMIT 1) AS pm_primeiro,
+            (SELECT group_concat(nome_completo, '; ') FROM (
+                SELECT {NOME_PM_ENVOLVIDO} AS nome_completo {PMS_PROCEDIMENTO} ORDER BY pe.ordem
+            )) AS pms_todos,
+            {_filtro_usuario('u_resp')} AS responsavel_filtro,
+            {_filtro_usuario('u_pm')} AS pm_filtro,
+            CASE
+                WHEN p.data_instauracao IS NOT NULL THEN strftime('%Y', p.data_instauracao)
+                WHEN p.data_recebimento IS NOT NULL THEN strftime('%Y', p.data_recebimento)
+                ELSE strftime('%Y', p.created_at)
+            END AS ano_filtro
+        FROM processos_procedimentos p
+        LEFT JOIN usuarios u_resp ON p.responsavel_id = u_resp.id
+        LEFT JOIN usuarios u_pm ON p.nome_pm_id = u_pm.id
+        LEFT JOIN usuarios u_pres ON p.presidente_id = u_pres.id
+        LEFT JOIN usuarios u_int ON p.interrogante_id = u_int.id
+        LEFT JOIN usuarios u_escr ON p.escrivao_processo_id = u_escr.id
+        WHERE {where}
+    ) b
+    """
+
+
+COMANDOS = [
+    """
+    CREATE TABLE IF NOT EXISTS processo_listagem (
+        processo_id TEXT PRIMARY KEY,
+        ativo BOOLEAN,
+        ordem TEXT,
+        numero TEXT,
+        numero_controle TEXT,
+        numero_formatado TEXT,
+        tipo_geral TEXT,
+        tipo_detalhe TEXT,
+        documento_iniciador TEXT,
+        data_recebimento DATE,
+        data_recebimento_formatada TEXT,
+        data_instauracao DATE,
+        data_instauracao_formatada TEXT,
+        created_at TIMESTAMP,
+        responsavel_completo TEXT,
+        responsavel_posto TEXT,
+        responsavel_matricula TEXT,
+        responsavel_nome TEXT,
+        encarregado_display TEXT,
+        encarregado_tooltip TEXT,
+        presidente_completo TEXT,
+        interrogante_completo TEXT,
+        escrivao_completo TEXT,
+        local_origem TEXT,
+        local_fatos TEXT,
+        processo_sei TEXT,
+        nome_pm_id TEXT,
+        status_pm TEXT,
+        nome_vitima TEXT,
+        pm_envolvido_nome TEXT,
+        pm_envolvido_tooltip TEXT,
+        pm_envolvido_posto TEXT,
+        pm_envolvido_matricula TEXT,
+        responsavel_filtro TEXT,
+        pm_filtro TEXT,
+        ano_filtro TEXT,
+        concluido BOOLEAN,
+        data_conclusao DATE
+    )
+    """,
+    # Ordem da listagem (ordem DESC, processo_id DESC) para a paginação por chave
+    """
+    CREATE INDEX IF NOT EXISTS idx_processo_listagem_ordem
+    ON processo_listagem(ativo, ordem DESC, processo_id DESC)
+    """,
+    # Carga inicial
+    sql_atualizar("1 = 1"),
+    # Processos
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_processos_insert
+    AFTER INSERT ON processos_procedimentos
+    BEGIN
+        {sql_atualizar("p.id = NEW.id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_processos_update
+    AFTER UPDATE ON processos_procedimentos
+    BEGIN
+        DELETE FROM processo_listagem WHERE processo_id = OLD.id AND OLD.id <> NEW.id;
+        {sql_atualizar("p.id = NEW.id")};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_processos_delete
+    AFTER DELETE ON processos_procedimentos
+    BEGIN
+        DELETE FROM processo_listagem WHERE processo_id = OLD.id;
+    END
+    """,
+    # PMs envolvidos dos procedimentos
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_pms_insert
+    AFTER INSERT ON procedimento_pms_envolvidos
+    BEGIN
+        {sql_atualizar("p.id = NEW.procedimento_id")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_pms_update
+    AFTER UPDATE ON procedimento_pms_envolvidos
+    BEGIN
+        {sql_atualizar("p.id IN (OLD.procedimento_id, NEW.procedimento_id)")};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_pms_delete
+    AFTER DELETE ON procedimento_pms_envolvidos
+    BEGIN
+        {sql_atualizar("p.id = OLD.procedimento_id")};
+    END
+    """,
+    # Usuários exibidos (responsável, PM, funções de PAD/CD/CJ, PMs envolvidos)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_listagem_usuarios_update
+    AFTER UPDATE OF nome, posto_graduacao, matricula, ativo ON usuarios
+    WHEN OLD.nome IS NOT NEW.nome OR OLD.posto_graduacao IS NOT NEW.posto_graduacao
+      OR OLD.matricula IS NOT NEW.matricula OR OLD.ativo IS NOT NEW.ativo
+    BEGIN
+        {sql_atualizar(
+            "NEW.id IN (p.responsavel_id, p.nome_pm_id, p.presidente_id, p.interrogante_id, p.escrivao_processo_id) "
+            "OR p.id IN (SELECT procedimento_id FROM procedimento_pms_envolvidos WHERE pm_id = NEW.id)"
+        )};
+    END
+    """,
+]
+
+
+# Tabelas lidas pelas triggers e pela carga inicial
+TABELAS_NECESSARIAS = ("processos_procedimentos", "usuarios", "procedimento_pms_envolvidos")
+
+
+def upgrade(conn):
+    existentes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    faltando = [tabela for tabela in TABELAS_NECESSARIAS if tabela not in existentes]
+    if faltando:
+        raise RuntimeError(f"processo_listagem requer as tabelas: {', '.join(faltando)}")
+    for comando in COMANDOS:
+        conn.execute(comando)
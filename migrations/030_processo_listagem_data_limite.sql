@@ -0,0 +1,111 @@
+-- Migration 030: Data limite persistida e indexada em processo_listagem
+-- Data: 2026-10-17
+-- Descrição: data_limite segue a mesma regra de calcular_prazo_com_ativo:
+-- vencimento do prazo ativo em prazos_processo, se houver; senão
+-- data_recebimento + prazo base (15 para Feito Preliminar e SV, 40 para IPM,
+-- 30 para os demais) + dias de prorrogação. É recalculada quando a linha da
+-- listagem é regravada (inserção/alteração do processo) e a cada alteração em
+-- prazos_processo (prorrogações). Os filtros de situação do prazo passam a
+-- ser faixas em data_limite.
+
+ALTER TABLE processo_listagem ADD COLUMN data_limite DATE;
+
+UPDATE processo_listagem SET data_limite = COALESCE(
+    (SELECT MAX(pz.data_vencimento) FROM prazos_processo pz
+     WHERE pz.processo_id = processo_listagem.processo_id AND pz.ativo = 1),
+    date(NULLIF(data_recebimento, ''), '+' || (
+        CASE
+            WHEN documento_iniciador = 'Feito Preliminar' THEN 15
+            WHEN tipo_detalhe = 'SV' THEN 15
+            WHEN tipo_detalhe = 'IPM' THEN 40
+            ELSE 30
+        END
+        + COALESCE((SELECT SUM(COALESCE(pz.dias_adicionados, 0)) FROM prazos_processo pz
+                    WHERE pz.processo_id = processo_listagem.processo_id AND pz.tipo_prazo = 'prorrogacao'), 0)
+    ) || ' days')
+);
+
+CREATE INDEX IF NOT EXISTS idx_processo_listagem_data_limite
+ON processo_listagem(ativo, data_limite);
+
+-- Linha da listagem regravada (INSERT OR REPLACE dos triggers da migração 029)
+CREATE TRIGGER IF NOT EXISTS trg_listagem_data_limite_insert
+AFTER INSERT ON processo_listagem
+BEGIN
+    UPDATE processo_listagem SET data_limite = COALESCE(
+        (SELECT MAX(pz.data_vencimento) FROM prazos_processo pz
+         WHERE pz.processo_id = NEW.processo_id AND pz.ativo = 1),
+        date(NULLIF(NEW.data_recebimento, ''), '+' || (
+            CASE
+                WHEN NEW.documento_iniciador = 'Feito Preliminar' THEN 15
+                WHEN NEW.tipo_detalhe = 'SV' THEN 15
+                WHEN NEW.tipo_detalhe = 'IPM' THEN 40
+                ELSE 30
+            END
+            + COALESCE((SELECT SUM(COALESCE(pz.dias_adicionados, 0)) FROM prazos_processo pz
+                        WHERE pz.processo_id = NEW.processo_id AND pz.tipo_prazo = 'prorrogacao'), 0)
+        ) || ' days')
+    )
+    WHERE processo_id = NEW.processo_id;
+END;
+
+-- Prazos/prorrogações incluídos, alterados ou removidos
+CREATE TRIGGER IF NOT EXISTS trg_listagem_data_limite_prazo_insert
+AFTER INSERT ON prazos_processo
+BEGIN
+    UPDATE processo_listagem SET data_limite = COALESCE(
+        (SELECT MAX(pz.data_vencimento) FROM prazos_processo pz
+         WHERE pz.processo_id = NEW.processo_id AND pz.ativo = 1),
+        date(NULLIF(data_recebimento, ''), '+' || (
+            CASE
+                WHEN documento_iniciador = 'Feito Preliminar' THEN 15
+                WHEN tipo_detalhe = 'SV' THEN 15
+                WHEN tipo_detalhe = 'IPM' THEN 40
+                ELSE 30
+            END
+            + COALESCE((SELECT SUM(COALESCE(pz.dias_adicionados, 0)) FROM prazos_processo pz
+                        WHERE pz.processo_id = NEW.processo_id AND pz.tipo_prazo = 'prorrogacao'), 0)
+        ) || ' days')
+    )
+    WHERE processo_id = NEW.processo_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_listagem_data_limite_prazo_update
+AFTER UPDATE ON prazos_processo
+BEGIN
+    UPDATE processo_listagem SET data_limite = COALESCE(
+        (SELECT MAX(pz.data_vencimento) FROM prazos_processo pz
+         WHERE pz.processo_id = processo_listagem.processo_id AND pz.ativo = 1),
+        date(NULLIF(data_recebimento, ''), '+' || (
+            CASE
+                WHEN documento_iniciador = 'Feito Preliminar' THEN 15
+                WHEN tipo_detalhe = 'SV' THEN 15
+                WHEN tipo_detalhe = 'IPM' THEN 40
+                ELSE 30
+            END
+            + COALESCE((SELECT SUM(COALESCE(pz.dias_adicionados, 0)) FROM prazos_processo pz
+                        WHERE pz.processo_id = processo_listagem.processo_id AND pz.tipo_prazo = 'prorrogacao'), 0)
+        ) || ' days')
+    )
+    WHERE processo_id IN (OLD.processo_id, NEW.processo_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_listagem_data_limite_prazo_delete
+AFTER DELETE ON prazos_processo
+BEGIN
+    UPDATE processo_listagem SET data_limite = COALESCE(
+        (SELECT MAX(pz.data_vencimento) FROM prazos_processo pz
+         WHERE pz.processo_id = OLD.processo_id AND pz.ativo = 1),
+        date(NULLIF(data_recebimento, ''), '+' || (
+            CASE
+                WHEN documento_iniciador = 'Feito Preliminar' THEN 15
+                WHEN tipo_detalhe = 'SV' THEN 15
+                WHEN tipo_detalhe = 'IPM' THEN 40
+                ELSE 30
+            END
+            + COALESCE((SELECT SUM(COALESCE(pz.dias_adicionados, 0)) FROM prazos_processo pz
+                        WHERE pz.processo_id = OLD.processo_id AND pz.tipo_prazo = 'prorrogacao'), 0)
+        ) || ' days')
+    )
+    WHERE processo_id = OLD.processo_id;
+END;
@@ -0,0 +1,32 @@
+-- Migration 031: Contadores do dashboard de prazos
+-- Data: 2026-10-17
+-- Descrição: prazos_processo passa a ter versão em versao_tabelas, para que o
+-- resultado agregado do dashboard fique em cache até a próxima escrita em
+-- processos ou prazos. O índice (ativo, data_limite, data_recebimento) cobre a
+-- agregação (leitura só do índice) e os filtros por data_limite, substituindo
+-- o índice da migração 030.
+
+INSERT OR IGNORE INTO versao_tabelas (tabela, versao) VALUES ('prazos_processo', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_prazos_insert
+AFTER INSERT ON prazos_processo
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'prazos_processo';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_prazos_update
+AFTER UPDATE ON prazos_processo
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'prazos_processo';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_versao_prazos_delete
+AFTER DELETE ON prazos_processo
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'prazos_processo';
+END;
+
+CREATE INDEX IF NOT EXISTS idx_processo_listagem_prazo
+ON processo_listagem(ativo, data_limite, data_recebimento);
+
+DROP INDEX IF EXISTS idx_processo_listagem_data_limite;
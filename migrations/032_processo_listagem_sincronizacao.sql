@@ -0,0 +1,53 @@
+-- Migration 032: Versão por linha de processo_listagem (sincronização incremental)
+-- Data: 2026-10-17
+-- Descrição: cada gravação de uma linha da listagem (processo incluído,
+-- alterado ou inativado, PMs envolvidos, nomes de usuários, prazos) recebe o
+-- próximo valor do contador 'processo_listagem' em versao_tabelas. Linhas
+-- excluídas fisicamente ficam em processo_listagem_removidos com a versão da
+-- exclusão. O cliente envia a última versão vista e recebe só as linhas com
+-- versão maior (índice em versao).
+
+INSERT OR IGNORE INTO versao_tabelas (tabela, versao) VALUES ('processo_listagem', 0);
+
+ALTER TABLE processo_listagem ADD COLUMN versao INTEGER NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_processo_listagem_versao
+ON processo_listagem(versao);
+
+CREATE TABLE IF NOT EXISTS processo_listagem_removidos (
+    processo_id TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_processo_listagem_removidos_versao
+ON processo_listagem_removidos(versao);
+
+-- Linha regravada (INSERT OR REPLACE dos triggers da migração 029)
+CREATE TRIGGER IF NOT EXISTS trg_listagem_versao_insert
+AFTER INSERT ON processo_listagem
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processo_listagem';
+    UPDATE processo_listagem
+    SET versao = (SELECT versao FROM versao_tabelas WHERE tabela = 'processo_listagem')
+    WHERE processo_id = NEW.processo_id;
+    DELETE FROM processo_listagem_removidos WHERE processo_id = NEW.processo_id;
+END;
+
+-- data_limite recalculada (prazos, migração 030)
+CREATE TRIGGER IF NOT EXISTS trg_listagem_versao_update
+AFTER UPDATE OF data_limite ON processo_listagem
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processo_listagem';
+    UPDATE processo_listagem
+    SET versao = (SELECT versao FROM versao_tabelas WHERE tabela = 'processo_listagem')
+    WHERE processo_id = NEW.processo_id;
+END;
+
+-- Processo excluído fisicamente
+CREATE TRIGGER IF NOT EXISTS trg_listagem_versao_delete
+AFTER DELETE ON processo_listagem
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processo_listagem';
+    INSERT OR REPLACE INTO processo_listagem_removidos (processo_id, versao)
+    SELECT OLD.processo_id, versao FROM versao_tabelas WHERE tabela = 'processo_listagem';
+END;
@@ -0,0 +1,98 @@
+# Migration 033: Facetas dos filtros da listagem com contagem (processo_facetas)
+# Data: 2026-10-17
+# Descrição: uma linha por (dimensão, valor) com a quantidade de processos
+# ativos, para obter_opcoes_filtros. Os valores são as mesmas colunas de
+# processo_listagem comparadas pelos filtros de listar_processos_com_prazos,
+# então a contagem é o número de processos que o filtro retorna. Triggers em
+# processo_listagem mantêm as contagens: a linha antiga é descontada antes de
+# ser regravada (o REPLACE não dispara triggers de DELETE) e a nova é somada.
+
+# (dimensão, coluna de processo_listagem); dimensão = chave em filtros
+DIMENSOES = [
+    ("tipo", "tipo_detalhe"),
+    ("origem", "local_origem"),
+    ("local_fatos", "local_fatos"),
+    ("documento", "documento_iniciador"),
+    ("status", "status_pm"),
+    ("encarregado", "responsavel_filtro"),
+    ("pm_envolvido", "pm_filtro"),
+    ("vitima", "nome_vitima"),
+    ("ano", "ano_filtro"),
+]
+
+
+def _valores(linha, origem=""):
+    """(dimensao, valor) das colunas de ``linha`` (NEW, OLD ou alias de ``origem``) em UNION ALL"""
+    return "\n        UNION ALL ".join(
+        f"SELECT '{dimensao}' AS dimensao, {linha}.{coluna} AS valor{origem}"
+        for dimensao, coluna in DIMENSOES
+    )
+
+
+def _somar(linha, ativo):
+    return f"""
+    INSERT INTO processo_facetas (dimensao, valor, quantidade)
+    SELECT dimensao, valor, 1 FROM (
+        {_valores(linha)}
+    )
+    WHERE {ativo} AND COALESCE(valor, '') <> ''
+    ON CONFLICT(dimensao, valor) DO UPDATE SET quantidade = quantidade + 1;
+    """
+
+
+def _descontar(linha, origem=""):
+    return f"""
+    UPDATE processo_facetas SET quantidade = quantidade - 1
+    WHERE (dimensao, valor) IN (
+        {_valores(linha, origem)}
+    );
+    DELETE FROM processo_facetas WHERE quantidade <= 0;
+    """
+
+
+COMANDOS = [
+    """
+    CREATE TABLE IF NOT EXISTS processo_facetas (
+        dimensao TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        quantidade INTEGER NOT NULL,
+        PRIMARY KEY (dimensao, valor)
+    ) WITHOUT ROWID
+    """,
+    # Carga inicial
+    f"""
+    INSERT INTO processo_facetas (dimensao, valor, quantidade)
+    SELECT dimensao, valor, COUNT(*) FROM (
+        {_valores('l', " FROM processo_listagem l WHERE l.ativo = 1")}
+    ) WHERE COALESCE(valor, '') <> ''
+    GROUP BY dimensao, valor
+    """,
+    # Linha regravada: desconta a versão anterior (ainda presente no BEFORE)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_facetas_listagem_antes_insert
+    BEFORE INSERT ON processo_listagem
+    BEGIN
+        {_descontar('l', " FROM processo_listagem l WHERE l.processo_id = NEW.processo_id AND l.ativo = 1")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_facetas_listagem_insert
+    AFTER INSERT ON processo_listagem
+    BEGIN
+        {_somar('NEW', 'NEW.ativo = 1')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_facetas_listagem_delete
+    AFTER DELETE ON processo_listagem
+    WHEN OLD.ativo = 1
+    BEGIN
+        {_descontar('OLD')}
+    END
+    """,
+]
+
+
+def upgrade(conn):
+    for comando in COMANDOS:
+        conn.execute(comando)
@@ -0,0 +1,59 @@
+-- Migration 034: Índices de cobertura para as consultas executadas pelo sistema
+-- Data: 2026-10-17
+-- Descrição: a migração 002 cobre tabelas antigas (encarregados/operadores) e
+-- colunas genéricas. Os índices abaixo seguem o formato das consultas atuais
+-- (gerar_mapa_mensal, PMs envolvidos e indícios em lote, andamentos,
+-- estatísticas), de modo que nenhuma delas percorra a tabela inteira.
+-- Índices que viram prefixo de um novo são removidos. ANALYZE grava as
+-- estatísticas (sqlite_stat1) para o planejador preferir os índices seletivos
+-- aos de baixa cardinalidade como (ativo). Os planos são verificados em
+-- test_planos_consulta.py.
+
+-- gerar_mapa_mensal e estatísticas de IPM: tipo + concluído + período,
+-- apenas processos ativos
+CREATE INDEX IF NOT EXISTS idx_processos_mapa_ativos
+ON processos_procedimentos(tipo_detalhe, concluido, data_conclusao, data_instauracao)
+WHERE ativo = 1;
+
+-- (ativo) sozinho não seleciona nada e é prefixo de idx_processos_ativo_created_at
+DROP INDEX IF EXISTS idx_processos_ativo;
+
+-- PMs envolvidos por procedimento, na ordem de exibição (carregar_pms_envolvidos_lote)
+CREATE INDEX IF NOT EXISTS idx_pme_procedimento_ordem_cobertura
+ON procedimento_pms_envolvidos(procedimento_id, ordem, pm_id, pm_tipo, status_pm, id);
+DROP INDEX IF EXISTS idx_procedimento_pms_ordem;
+DROP INDEX IF EXISTS idx_procedimento_pms_procedimento;
+
+-- Procedimentos em que um usuário é PM envolvido (estatísticas do usuário)
+CREATE INDEX IF NOT EXISTS idx_pme_pm_procedimento
+ON procedimento_pms_envolvidos(pm_id, procedimento_id);
+
+-- Indícios ativos de um PM envolvido
+CREATE INDEX IF NOT EXISTS idx_pm_indicios_pm_envolvido_ativos
+ON pm_envolvido_indicios(pm_envolvido_id, id)
+WHERE ativo = 1;
+
+-- Indícios por procedimento (joins com as tabelas de RDPM/Art. 29/crimes)
+CREATE INDEX IF NOT EXISTS idx_pm_indicios_procedimento_id
+ON pm_envolvido_indicios(procedimento_id, id);
+DROP INDEX IF EXISTS idx_pm_indicios_procedimento;
+
+-- Associações por pm_indicios_id, cobrindo o id do item associado
+CREATE INDEX IF NOT EXISTS idx_pm_crimes_indicios_crime
+ON pm_envolvido_crimes(pm_indicios_id, crime_id);
+DROP INDEX IF EXISTS idx_pm_crimes_indicios;
+
+CREATE INDEX IF NOT EXISTS idx_pm_rdpm_indicios_transgressao
+ON pm_envolvido_rdpm(pm_indicios_id, transgressao_id);
+DROP INDEX IF EXISTS idx_pm_rdpm_indicios;
+
+CREATE INDEX IF NOT EXISTS idx_pm_art29_indicios_art29
+ON pm_envolvido_art29(pm_indicios_id, art29_id);
+DROP INDEX IF EXISTS idx_pm_art29_indicios;
+
+-- Andamentos de um processo, já na ordem de exibição (mais recente primeiro)
+CREATE INDEX IF NOT EXISTS idx_andamentos_processo_data
+ON andamentos_processo(processo_id, data_movimentacao DESC, created_at DESC);
+DROP INDEX IF EXISTS idx_andamentos_processo_id;
+
+ANALYZE;
@@ -0,0 +1,123 @@
+-- Migration 035: ano_instauracao sempre preenchido e indexado; dimensão de anos
+-- Data: 2026-10-17
+-- Descrição: ano_instauracao era gravado só pelos caminhos de cadastro/edição
+-- de main.py. Triggers passam a mantê-lo a partir de data_instauracao em
+-- qualquer gravação, com a mesma regra do cadastro (4 primeiros caracteres da
+-- data; NULL sem data), para que os filtros por ano das estatísticas e do
+-- relatório anual usem a coluna indexada em vez de strftime('%Y', ...).
+-- processo_anos guarda os anos com processos ativos e a quantidade de cada um,
+-- substituindo o SELECT DISTINCT das listas de anos.
+
+-- Registros antigos. UPDATE simples (OR IGNORE valeria também para o INSERT OR
+-- REPLACE dos triggers de processo_listagem, que seria descartado depois de as
+-- facetas já terem sido descontadas). Registros cujo novo ano colidiria com a
+-- restrição UNIQUE (numero, documento_iniciador, ano_instauracao) de outro
+-- registro, atual ou também corrigido aqui, mantêm o valor atual.
+UPDATE processos_procedimentos
+SET ano_instauracao = CASE WHEN COALESCE(data_instauracao, '') = '' THEN NULL
+                           ELSE substr(data_instauracao, 1, 4) END
+WHERE ano_instauracao IS NOT (CASE WHEN COALESCE(data_instauracao, '') = '' THEN NULL
+                                   ELSE substr(data_instauracao, 1, 4) END)
+  AND NOT EXISTS (
+      SELECT 1 FROM processos_procedimentos p2
+      WHERE p2.id <> processos_procedimentos.id
+        AND p2.numero = processos_procedimentos.numero
+        AND p2.documento_iniciador = processos_procedimentos.documento_iniciador
+        AND (p2.ano_instauracao = substr(processos_procedimentos.data_instauracao, 1, 4)
+             OR substr(NULLIF(p2.data_instauracao, ''), 1, 4) = substr(processos_procedimentos.data_instauracao, 1, 4))
+  );
+
+CREATE TRIGGER IF NOT EXISTS trg_processos_ano_instauracao_insert
+AFTER INSERT ON processos_procedimentos
+WHEN NEW.ano_instauracao IS NOT (CASE WHEN COALESCE(NEW.data_instauracao, '') = '' THEN NULL
+                                      ELSE substr(NEW.data_instauracao, 1, 4) END)
+BEGIN
+    UPDATE processos_procedimentos
+    SET ano_instauracao = CASE WHEN COALESCE(NEW.data_instauracao, '') = '' THEN NULL
+                               ELSE substr(NEW.data_instauracao, 1, 4) END
+    WHERE id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_processos_ano_instauracao_update
+AFTER UPDATE OF data_instauracao, ano_instauracao ON processos_procedimentos
+WHEN NEW.ano_instauracao IS NOT (CASE WHEN COALESCE(NEW.data_instauracao, '') = '' THEN NULL
+                                      ELSE substr(NEW.data_instauracao, 1, 4) END)
+BEGIN
+    UPDATE processos_procedimentos
+    SET ano_instauracao = CASE WHEN COALESCE(NEW.data_instauracao, '') = '' THEN NULL
+                               ELSE substr(NEW.data_instauracao, 1, 4) END
+    WHERE id = NEW.id;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_processos_ano_tipo
+ON processos_procedimentos(ano_instauracao, tipo_detalhe);
+
+-- Dimensão de anos (processos ativos com data de instauração)
+CREATE TABLE IF NOT EXISTS processo_anos (
+    ano TEXT PRIMARY KEY,
+    quantidade INTEGER NOT NULL
+) WITHOUT ROWID;
+
+INSERT OR REPLACE INTO processo_anos (ano, quantidade)
+SELECT substr(data_instauracao, 1, 4), COUNT(*)
+FROM processos_procedimentos
+WHERE ativo = 1 AND COALESCE(data_instauracao, '') <> ''
+GROUP BY substr(data_instauracao, 1, 4);
+
+-- Contagens calculadas de data_instauracao (não do ano gravado), para não
+-- depender da ordem entre estes triggers e os que corrigem ano_instauracao
+CREATE TRIGGER IF NOT EXISTS trg_processo_anos_insert
+AFTER INSERT ON processos_procedimentos
+WHEN NEW.ativo = 1 AND COALESCE(NEW.data_instauracao, '') <> ''
+BEGIN
+    INSERT INTO processo_anos (ano, quantidade)
+    VALUES (substr(NEW.data_instauracao, 1, 4), 1)
+    ON CONFLICT(ano) DO UPDATE SET quantidade = quantidade + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_processo_anos_update
+AFTER UPDATE OF data_instauracao, ativo ON processos_procedimentos
+BEGIN
+    UPDATE processo_anos SET quantidade = quantidade - 1
+    WHERE OLD.ativo = 1 AND COALESCE(OLD.data_instauracao, '') <> ''
+      AND ano = substr(OLD.data_instauracao, 1, 4);
+    INSERT INTO processo_anos (ano, quantidade)
+    SELECT substr(NEW.data_instauracao, 1, 4), 1
+    WHERE NEW.ativo = 1 AND COALESCE(NEW.data_instauracao, '') <> ''
+    ON CONFLICT(ano) DO UPDATE SET quantidade = quantidade + 1;
+    DELETE FROM processo_anos WHERE quantidade <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_processo_anos_delete
+AFTER DELETE ON processos_procedimentos
+WHEN OLD.ativo = 1 AND COALESCE(OLD.data_instauracao, '') <> ''
+BEGIN
+    UPDATE processo_anos SET quantidade = quantidade - 1
+    WHERE ano = substr(OLD.data_instauracao, 1, 4);
+    DELETE FROM processo_anos WHERE quantidade <= 0;
+END;
+
+-- Reconstrução: regrava todas as linhas de processo_listagem pelo trigger de
+-- UPDATE da migração 029 (updated_at não dispara os triggers que corrigem
+-- ano_instauracao; data_limite e a versão da sincronização são recalculadas)
+-- e recalcula processo_facetas a partir da listagem, corrigindo bancos em que
+-- a versão anterior desta migração deixou contagens erradas
+UPDATE processos_procedimentos SET updated_at = updated_at;
+
+DELETE FROM processo_facetas;
+
+INSERT INTO processo_facetas (dimensao, valor, quantidade)
+SELECT dimensao, valor, COUNT(*) FROM (
+    SELECT 'tipo' AS dimensao, tipo_detalhe AS valor FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'origem', local_origem FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'local_fatos', local_fatos FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'documento', documento_iniciador FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'status', status_pm FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'encarregado', responsavel_filtro FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'pm_envolvido', pm_filtro FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'vitima', nome_vitima FROM processo_listagem WHERE ativo = 1
+    UNION ALL SELECT 'ano', ano_filtro FROM processo_listagem WHERE ativo = 1
+) WHERE COALESCE(valor, '') <> ''
+GROUP BY dimensao, valor;
+
+ANALYZE;
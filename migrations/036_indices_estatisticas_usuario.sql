@@ -0,0 +1,17 @@
+-- Migration 036: Índices para as estatísticas do usuário (escrivão e PM envolvido)
+-- Data: 2026-10-17
+-- Descrição: obter_estatisticas_usuario conta os processos ativos em que o
+-- usuário é escrivão (escrivao_id) ou PM envolvido do processo (nome_pm_id).
+-- Sem índice nessas colunas cada contagem percorria processos_procedimentos
+-- inteira. Parciais (ativo = 1) como os da migração 034; os planos são
+-- verificados em test_planos_consulta.py.
+
+CREATE INDEX IF NOT EXISTS idx_processos_escrivao_ativos
+ON processos_procedimentos(escrivao_id)
+WHERE ativo = 1;
+
+CREATE INDEX IF NOT EXISTS idx_processos_nome_pm_ativos
+ON processos_procedimentos(nome_pm_id, status_pm)
+WHERE ativo = 1;
+
+ANALYZE;
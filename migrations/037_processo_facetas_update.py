@@ -0,0 +1,31 @@
+# Migration 037: processo_facetas acompanha UPDATE em processo_listagem
+# Data: 2026-10-17
+# Descrição: os triggers da migração 033 contam as linhas regravadas por
+# INSERT OR REPLACE (triggers da 029) e as excluídas. Um UPDATE direto em
+# processo_listagem que mudasse uma coluna das facetas ou ativo deixava as
+# contagens erradas. O trigger abaixo desconta a linha antiga (se ativa) e soma
+# a nova (se ativa). UPDATEs só de data_limite ou versao não o disparam.
+import importlib.util
+import os
+
+
+def _migracao_033():
+    caminho = os.path.join(os.path.dirname(os.path.abspath(__file__)), "033_processo_facetas.py")
+    spec = importlib.util.spec_from_file_location("migracao_033_processo_facetas", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def upgrade(conn):
+    facetas = _migracao_033()
+    colunas = ", ".join(coluna for _, coluna in facetas.DIMENSOES)
+    conn.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS trg_facetas_listagem_update
+    AFTER UPDATE OF {colunas}, ativo ON processo_listagem
+    WHEN OLD.ativo = 1 OR NEW.ativo = 1
+    BEGIN
+        {facetas._descontar('OLD', " WHERE OLD.ativo = 1")}
+        {facetas._somar('NEW', 'NEW.ativo = 1')}
+    END
+    """)
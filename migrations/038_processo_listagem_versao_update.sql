@@ -0,0 +1,20 @@
+-- Migration 038: Versão de processo_listagem em qualquer UPDATE da linha
+-- Data: 2026-10-17
+-- Descrição: o contador 'processo_listagem' (migração 032) passa a ser a
+-- dependência do cache de totais e limites de página da listagem com prazos.
+-- O trigger da 032 só avançava a versão em UPDATE de data_limite; um UPDATE
+-- direto de outra coluna (ativo, tipo, responsável...) mudaria o resultado
+-- sem invalidar o cache. Agora todo UPDATE avança a versão, exceto o que só
+-- grava a própria coluna versao (feito pelos triggers de versão).
+
+DROP TRIGGER IF EXISTS trg_listagem_versao_update;
+
+CREATE TRIGGER IF NOT EXISTS trg_listagem_versao_update
+AFTER UPDATE ON processo_listagem
+WHEN NEW.versao IS OLD.versao
+BEGIN
+    UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processo_listagem';
+    UPDATE processo_listagem
+    SET versao = (SELECT versao FROM versao_tabelas WHERE tabela = 'processo_listagem')
+    WHERE processo_id = NEW.processo_id;
+END;
@@ -0,0 +1,558 @@
+-- Schema baseline (versão 25): estado do banco após as migrações antigas
+-- Descrição: as migrações 001-025 foram escritas para schemas anteriores
+-- (tabelas encarregados/operadores, processos) e não recriam o banco a partir
+-- do zero. Em um banco novo o MigrationRunner executa este script em uma única
+-- transação, registra as migrações antigas como aplicadas e segue a partir da 026.
+-- Bancos existentes (com as tabelas antigas) só são marcados como baseline.
+-- Apenas estrutura: tabelas de referência começam vazias. As chaves estrangeiras
+-- que nos bancos antigos apontam para "processos_procedimentos_old" (sobra das
+-- recriações de tabela) apontam aqui para processos_procedimentos.
+
+
+-- Tabelas
+
+CREATE TABLE IF NOT EXISTS analogias_estatuto_rdpm (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    art29_id INTEGER NOT NULL, -- FK para infracoes_estatuto_art29
+    rdpm_id INTEGER NOT NULL, -- FK para transgressoes (RDPM)
+    usuario_id INTEGER, -- Quem criou a analogia (opcional)
+    observacoes TEXT, -- Justificativa da analogia (opcional)
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (art29_id) REFERENCES infracoes_estatuto_art29(id),
+    FOREIGN KEY (rdpm_id) REFERENCES transgressoes(id)
+);
+
+CREATE TABLE IF NOT EXISTS andamentos_processo (
+    id TEXT PRIMARY KEY,
+    processo_id TEXT NOT NULL,
+    data_movimentacao DATE NOT NULL,
+    tipo_andamento TEXT NOT NULL CHECK (tipo_andamento IN (
+        'abertura', 'recebimento', 'encaminhamento', 'retorno', 
+        'conclusao', 'arquivamento', 'prorrogacao', 'outro'
+    )),
+    descricao TEXT NOT NULL,
+    destino_origem TEXT, -- Para onde foi ou de onde veio
+    usuario_responsavel_id TEXT,
+    usuario_responsavel_tipo TEXT CHECK (usuario_responsavel_tipo IN ('encarregado', 'operador')),
+    observacoes TEXT,
+    documento_anexo TEXT, -- Nome do arquivo ou referência
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (processo_id) REFERENCES processos_procedimentos(id)
+);
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    id TEXT PRIMARY KEY,
+    tabela TEXT NOT NULL,
+    registro_id TEXT NOT NULL,
+    operacao TEXT NOT NULL CHECK (operacao IN ('INSERT', 'UPDATE', 'DELETE')),
+    usuario_id TEXT,
+    usuario_tipo TEXT CHECK (usuario_tipo IN ('encarregado', 'operador')),
+    dados_antes TEXT, -- JSON com dados antes da alteração
+    dados_depois TEXT, -- JSON com dados após a alteração
+    ip_address TEXT,
+    user_agent TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    observacoes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS crimes_contravencoes (
+                id TEXT PRIMARY KEY,
+                tipo VARCHAR(20) NOT NULL CHECK (tipo IN ('Crime', 'Contravenção Penal')),
+                dispositivo_legal VARCHAR(100) NOT NULL,
+                artigo VARCHAR(10) NOT NULL,
+                descricao_artigo TEXT NOT NULL,
+                paragrafo VARCHAR(10),
+                inciso VARCHAR(10),
+                alinea VARCHAR(10),
+                ativo BOOLEAN NOT NULL DEFAULT 1,
+                data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP,
+                data_atualizacao DATETIME DEFAULT CURRENT_TIMESTAMP
+            );
+
+CREATE TABLE IF NOT EXISTS infracoes_estatuto_art29 (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inciso TEXT NOT NULL, -- I, II, III, etc.
+    texto TEXT NOT NULL, -- Texto completo do inciso
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS locais_origem (
+    id TEXT PRIMARY KEY,
+    codigo TEXT UNIQUE NOT NULL,
+    descricao TEXT NOT NULL,
+    tipo TEXT CHECK (tipo IN ('BPM', 'BOPE', 'ROTAM', 'COMANDO', 'OUTRO')),
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS mapas_salvos (
+    id TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    tipo_processo TEXT NOT NULL,
+    periodo_inicio DATE NOT NULL,
+    periodo_fim DATE NOT NULL,
+    periodo_descricao TEXT NOT NULL,
+    total_processos INTEGER NOT NULL DEFAULT 0,
+    total_concluidos INTEGER NOT NULL DEFAULT 0,
+    total_andamento INTEGER NOT NULL DEFAULT 0,
+    usuario_id TEXT NOT NULL,
+    usuario_nome TEXT NOT NULL,
+    dados_mapa TEXT NOT NULL, -- JSON com todos os dados do mapa
+    arquivo_pdf BLOB, -- Opcional: armazenar o PDF gerado
+    nome_arquivo TEXT, -- Nome do arquivo PDF
+    data_geracao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS municipios_distritos (
+                id TEXT PRIMARY KEY,
+                nome TEXT NOT NULL UNIQUE,
+                tipo TEXT NOT NULL CHECK (tipo IN ('municipio', 'distrito')),
+                municipio_pai TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ativo BOOLEAN DEFAULT 1
+            );
+
+CREATE TABLE IF NOT EXISTS naturezas (
+    id TEXT PRIMARY KEY,
+    tipo TEXT NOT NULL CHECK (tipo IN ('processo', 'procedimento')),
+    codigo TEXT UNIQUE NOT NULL,
+    descricao TEXT NOT NULL,
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS pm_envolvido_art29 (
+    id TEXT PRIMARY KEY,
+    pm_indicios_id TEXT NOT NULL, -- FK para pm_envolvido_indicios
+    art29_id INTEGER NOT NULL,     -- FK para infracoes_estatuto_art29
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (pm_indicios_id) REFERENCES pm_envolvido_indicios(id) ON DELETE CASCADE,
+    FOREIGN KEY (art29_id) REFERENCES infracoes_estatuto_art29(id),
+    UNIQUE(pm_indicios_id, art29_id) -- Evitar duplicatas
+);
+
+CREATE TABLE IF NOT EXISTS pm_envolvido_crimes (
+    id TEXT PRIMARY KEY,
+    pm_indicios_id TEXT NOT NULL, -- FK para pm_envolvido_indicios
+    crime_id TEXT NOT NULL,        -- FK para crimes_contravencoes
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (pm_indicios_id) REFERENCES pm_envolvido_indicios(id) ON DELETE CASCADE,
+    FOREIGN KEY (crime_id) REFERENCES crimes_contravencoes(id),
+    UNIQUE(pm_indicios_id, crime_id) -- Evitar duplicatas
+);
+
+CREATE TABLE IF NOT EXISTS pm_envolvido_indicios (
+    id TEXT PRIMARY KEY,
+    procedimento_id TEXT NOT NULL,
+    pm_envolvido_id TEXT NOT NULL, -- ID do registro em procedimento_pms_envolvidos
+    categorias_indicios TEXT NOT NULL, -- JSON array: ["crime_comum", "transgressao_disciplinar", etc]
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ativo BOOLEAN DEFAULT 1, categoria TEXT,
+    
+    FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id) ON DELETE CASCADE,
+    FOREIGN KEY (pm_envolvido_id) REFERENCES procedimento_pms_envolvidos(id) ON DELETE CASCADE,
+    UNIQUE(pm_envolvido_id) -- Cada PM envolvido tem apenas um registro de indícios
+);
+
+CREATE TABLE IF NOT EXISTS pm_envolvido_rdpm (
+    id TEXT PRIMARY KEY,
+    pm_indicios_id TEXT NOT NULL, -- FK para pm_envolvido_indicios
+    transgressao_id INTEGER NOT NULL, -- FK para transgressoes
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (pm_indicios_id) REFERENCES pm_envolvido_indicios(id) ON DELETE CASCADE,
+    FOREIGN KEY (transgressao_id) REFERENCES transgressoes(id),
+    UNIQUE(pm_indicios_id, transgressao_id) -- Evitar duplicatas
+);
+
+CREATE TABLE IF NOT EXISTS postos_graduacoes (
+    id TEXT PRIMARY KEY,
+    codigo TEXT UNIQUE NOT NULL,
+    descricao TEXT NOT NULL,
+    tipo TEXT NOT NULL CHECK (tipo IN ('oficial', 'praca')),
+    ordem_hierarquica INTEGER NOT NULL,
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS prazos_processo (
+    id TEXT PRIMARY KEY,
+    processo_id TEXT NOT NULL,
+    tipo_prazo TEXT NOT NULL CHECK (tipo_prazo IN ('inicial', 'prorrogacao')),
+    data_inicio DATE NOT NULL,
+    data_vencimento DATE NOT NULL,
+    dias_adicionados INTEGER DEFAULT 0,
+    motivo TEXT,
+    autorizado_por TEXT, -- ID do usuário que autorizou
+    autorizado_tipo TEXT CHECK (autorizado_tipo IN ('encarregado', 'operador')),
+    ativo BOOLEAN DEFAULT 1, -- Para marcar prazo atual
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, numero_portaria TEXT, data_portaria DATE, ordem_prorrogacao INTEGER,
+    
+    FOREIGN KEY (processo_id) REFERENCES processos_procedimentos(id)
+    
+    -- Nota: UNIQUE constraint com WHERE será criado como índice separado
+);
+
+CREATE TABLE IF NOT EXISTS procedimento_pms_envolvidos (
+    id TEXT PRIMARY KEY,
+    procedimento_id TEXT NOT NULL,
+    pm_id TEXT NOT NULL,
+    pm_tipo TEXT NOT NULL CHECK (pm_tipo IN ('operador', 'encarregado')),
+    ordem INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, status_pm TEXT,
+    FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id) ON DELETE CASCADE,
+    UNIQUE(procedimento_id, pm_id)
+);
+
+CREATE TABLE IF NOT EXISTS procedimento_transgressoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                procedimento_id INTEGER NOT NULL,
+                transgressao_id INTEGER NOT NULL,
+                analogia_rdpm_id INTEGER, -- para casos de Art. 29 com analogia
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id) ON DELETE CASCADE,
+                FOREIGN KEY (transgressao_id) REFERENCES transgressoes(id),
+                FOREIGN KEY (analogia_rdpm_id) REFERENCES transgressoes(id)
+            );
+
+CREATE TABLE IF NOT EXISTS procedimentos_indicios_art29 (
+    id TEXT PRIMARY KEY,
+    procedimento_id TEXT NOT NULL,
+    art29_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id),
+    FOREIGN KEY (art29_id) REFERENCES infracoes_estatuto_art29(id)
+);
+
+CREATE TABLE IF NOT EXISTS procedimentos_indicios_crimes (
+    id TEXT PRIMARY KEY,
+    procedimento_id TEXT NOT NULL,
+    crime_id TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id),
+    FOREIGN KEY (crime_id) REFERENCES crimes_contravencoes(id)
+);
+
+CREATE TABLE IF NOT EXISTS procedimentos_indicios_rdpm (
+    id TEXT PRIMARY KEY,
+    procedimento_id TEXT NOT NULL,
+    transgressao_id INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (procedimento_id) REFERENCES processos_procedimentos(id),
+    FOREIGN KEY (transgressao_id) REFERENCES transgressoes(id)
+);
+
+CREATE TABLE IF NOT EXISTS "processos_procedimentos" (
+    id TEXT PRIMARY KEY,
+    numero TEXT NOT NULL,
+    tipo_geral TEXT NOT NULL CHECK (tipo_geral IN ('processo', 'procedimento')),
+    tipo_detalhe TEXT NOT NULL,
+    documento_iniciador TEXT NOT NULL CHECK (documento_iniciador IN ('Portaria', 'Memorando Disciplinar', 'Feito Preliminar')),
+    processo_sei TEXT,
+    -- Agora opcionais para suportar PAD/CD/CJ
+    responsavel_id TEXT,
+    responsavel_tipo TEXT CHECK (responsavel_tipo IN ('usuario')),
+    local_origem TEXT,
+    local_fatos TEXT,
+    data_instauracao DATE,
+    data_recebimento DATE,
+    escrivao_id TEXT,
+    status_pm TEXT,
+    nome_pm_id TEXT,
+    nome_vitima TEXT,
+    natureza_processo TEXT,
+    natureza_procedimento TEXT,
+    resumo_fatos TEXT,
+    numero_portaria TEXT,
+    numero_memorando TEXT,
+    numero_feito TEXT,
+    numero_rgf TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ativo BOOLEAN DEFAULT 1,
+    numero_controle TEXT,
+    concluido BOOLEAN,
+    data_conclusao DATE,
+    infracao_id INTEGER,
+    transgressoes_ids TEXT,
+    solucao_final TEXT,
+    ano_instauracao TEXT,
+    andamentos TEXT,
+    data_remessa_encarregado DATE,
+    data_julgamento DATE,
+    solucao_tipo TEXT,
+    penalidade_tipo TEXT,
+    penalidade_dias INTEGER,
+    indicios_categorias TEXT,
+    -- Papéis específicos para processos PAD/CD/CJ - CORRIGIDO
+    presidente_id TEXT,
+    presidente_tipo TEXT CHECK (presidente_tipo IN ('usuario')),
+    interrogante_id TEXT,
+    interrogante_tipo TEXT CHECK (interrogante_tipo IN ('usuario')),
+    escrivao_processo_id TEXT,
+    escrivao_processo_tipo TEXT CHECK (escrivao_processo_tipo IN ('usuario')),
+    historico_encarregados TEXT,
+    motorista_id TEXT, unidade_deprecada TEXT, deprecante TEXT, pessoas_inquiridas TEXT,
+    UNIQUE(numero, documento_iniciador, tipo_detalhe, local_origem, ano_instauracao)
+);
+
+CREATE TABLE IF NOT EXISTS status_detalhado_processo (
+    id TEXT PRIMARY KEY,
+    processo_id TEXT NOT NULL,
+    status_codigo TEXT NOT NULL,
+    data_alteracao DATE NOT NULL,
+    usuario_id TEXT,
+    usuario_tipo TEXT CHECK (usuario_tipo IN ('encarregado', 'operador')),
+    observacoes TEXT,
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (processo_id) REFERENCES processos_procedimentos(id),
+    FOREIGN KEY (status_codigo) REFERENCES status_processo(codigo)
+    
+    -- Nota: UNIQUE constraint com WHERE será criado como índice separado
+);
+
+CREATE TABLE IF NOT EXISTS status_processo (
+    id TEXT PRIMARY KEY,
+    codigo TEXT UNIQUE NOT NULL,
+    descricao TEXT NOT NULL,
+    cor TEXT, -- Para interface (hex color)
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS tipos_processo (
+    id TEXT PRIMARY KEY,
+    tipo_geral TEXT NOT NULL CHECK (tipo_geral IN ('processo', 'procedimento')),
+    codigo TEXT UNIQUE NOT NULL,
+    descricao TEXT NOT NULL,
+    ativo BOOLEAN DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS transgressoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                gravidade TEXT NOT NULL CHECK(gravidade IN ('leve', 'media', 'grave')),
+                inciso TEXT NOT NULL,
+                texto TEXT NOT NULL,
+                ativo BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, artigo INTEGER CHECK(artigo IN (15, 16, 17)),
+                UNIQUE(gravidade, inciso)
+            );
+
+CREATE TABLE IF NOT EXISTS usuarios (
+                id TEXT PRIMARY KEY,
+                tipo_usuario TEXT NOT NULL CHECK (tipo_usuario IN ('Oficial', 'Praça')),
+                posto_graduacao TEXT NOT NULL,
+                nome TEXT NOT NULL,
+                matricula TEXT UNIQUE NOT NULL,
+                is_encarregado BOOLEAN DEFAULT 0,
+                is_operador BOOLEAN DEFAULT 0,
+                email TEXT UNIQUE,
+                senha TEXT,
+                perfil TEXT CHECK (perfil IN ('admin', 'comum') OR perfil IS NULL),
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                ativo BOOLEAN DEFAULT 1
+            );
+
+
+-- Índices
+
+CREATE INDEX IF NOT EXISTS idx_andamentos_data 
+ON andamentos_processo(data_movimentacao DESC);
+
+CREATE INDEX IF NOT EXISTS idx_andamentos_processo_id 
+ON andamentos_processo(processo_id);
+
+CREATE INDEX IF NOT EXISTS idx_andamentos_tipo 
+ON andamentos_processo(tipo_andamento);
+
+CREATE INDEX IF NOT EXISTS idx_andamentos_usuario 
+ON andamentos_processo(usuario_responsavel_id, usuario_responsavel_tipo);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_operacao 
+ON auditoria(operacao);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_tabela_registro 
+ON auditoria(tabela, registro_id);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_timestamp 
+ON auditoria(timestamp DESC);
+
+CREATE INDEX IF NOT EXISTS idx_auditoria_usuario 
+ON auditoria(usuario_id, usuario_tipo);
+
+CREATE INDEX IF NOT EXISTS idx_crimes_artigo ON crimes_contravencoes(artigo);
+
+CREATE INDEX IF NOT EXISTS idx_crimes_ativo ON crimes_contravencoes(ativo);
+
+CREATE INDEX IF NOT EXISTS idx_crimes_dispositivo ON crimes_contravencoes(dispositivo_legal);
+
+CREATE INDEX IF NOT EXISTS idx_crimes_tipo ON crimes_contravencoes(tipo);
+
+CREATE INDEX IF NOT EXISTS idx_mapas_salvos_ativo ON mapas_salvos(ativo);
+
+CREATE INDEX IF NOT EXISTS idx_mapas_salvos_data ON mapas_salvos(data_geracao);
+
+CREATE INDEX IF NOT EXISTS idx_mapas_salvos_periodo ON mapas_salvos(periodo_inicio, periodo_fim);
+
+CREATE INDEX IF NOT EXISTS idx_mapas_salvos_tipo ON mapas_salvos(tipo_processo);
+
+CREATE INDEX IF NOT EXISTS idx_mapas_salvos_usuario ON mapas_salvos(usuario_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_art29_art29 ON pm_envolvido_art29(art29_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_art29_indicios ON pm_envolvido_art29(pm_indicios_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_crimes_crime ON pm_envolvido_crimes(crime_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_crimes_indicios ON pm_envolvido_crimes(pm_indicios_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_indicios_ativo ON pm_envolvido_indicios(ativo);
+
+CREATE INDEX IF NOT EXISTS idx_pm_indicios_pm_envolvido ON pm_envolvido_indicios(pm_envolvido_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_indicios_procedimento ON pm_envolvido_indicios(procedimento_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_rdpm_indicios ON pm_envolvido_rdpm(pm_indicios_id);
+
+CREATE INDEX IF NOT EXISTS idx_pm_rdpm_transgressao ON pm_envolvido_rdpm(transgressao_id);
+
+CREATE INDEX IF NOT EXISTS idx_pme_procedimento_status 
+ON procedimento_pms_envolvidos(procedimento_id, status_pm);
+
+CREATE INDEX IF NOT EXISTS idx_prazos_ativo 
+ON prazos_processo(ativo, data_vencimento);
+
+CREATE INDEX IF NOT EXISTS idx_prazos_processo_id 
+ON prazos_processo(processo_id);
+
+CREATE INDEX IF NOT EXISTS idx_prazos_tipo 
+ON prazos_processo(tipo_prazo, ativo);
+
+CREATE INDEX IF NOT EXISTS idx_prazos_vencimento 
+ON prazos_processo(data_vencimento);
+
+CREATE INDEX IF NOT EXISTS idx_proc_ind_art29_proc ON procedimentos_indicios_art29(procedimento_id);
+
+CREATE INDEX IF NOT EXISTS idx_proc_ind_crimes_proc ON procedimentos_indicios_crimes(procedimento_id);
+
+CREATE INDEX IF NOT EXISTS idx_proc_ind_rdpm_proc ON procedimentos_indicios_rdpm(procedimento_id);
+
+CREATE INDEX IF NOT EXISTS idx_procedimento_pms_ordem ON procedimento_pms_envolvidos(procedimento_id, ordem);
+
+CREATE INDEX IF NOT EXISTS idx_procedimento_pms_procedimento ON procedimento_pms_envolvidos(procedimento_id);
+
+CREATE INDEX IF NOT EXISTS idx_processos_ativo ON processos_procedimentos(ativo);
+
+CREATE INDEX IF NOT EXISTS idx_processos_data_instauracao ON processos_procedimentos(data_instauracao);
+
+CREATE INDEX IF NOT EXISTS idx_processos_numero ON processos_procedimentos(numero);
+
+CREATE INDEX IF NOT EXISTS idx_processos_responsavel ON processos_procedimentos(responsavel_id);
+
+CREATE INDEX IF NOT EXISTS idx_processos_tipo ON processos_procedimentos(tipo_geral, tipo_detalhe);
+
+CREATE INDEX IF NOT EXISTS idx_processos_unidade_deprecada 
+ON processos_procedimentos(unidade_deprecada) 
+WHERE tipo_detalhe = 'CP';
+
+CREATE INDEX IF NOT EXISTS idx_status_detalhado_ativo 
+ON status_detalhado_processo(ativo, data_alteracao DESC);
+
+CREATE INDEX IF NOT EXISTS idx_status_detalhado_codigo 
+ON status_detalhado_processo(status_codigo);
+
+CREATE INDEX IF NOT EXISTS idx_status_detalhado_processo 
+ON status_detalhado_processo(processo_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_u_proc_ind_art29 ON procedimentos_indicios_art29(procedimento_id, art29_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_u_proc_ind_crime ON procedimentos_indicios_crimes(procedimento_id, crime_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_u_proc_ind_rdpm ON procedimentos_indicios_rdpm(procedimento_id, transgressao_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_prazo_ativo 
+ON prazos_processo(processo_id) WHERE ativo = 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_unique_status_ativo 
+ON status_detalhado_processo(processo_id) WHERE ativo = 1;
+
+
+-- Views
+
+CREATE VIEW IF NOT EXISTS v_processos_com_prazo AS
+SELECT 
+    pp.*,
+    CASE 
+        WHEN pp.data_remessa_encarregado IS NOT NULL THEN
+            CASE 
+                WHEN DATE(pp.data_remessa_encarregado, '+20 days') >= DATE('now') THEN 'Em dia'
+                ELSE 'Vencido'
+            END
+        ELSE 'Pendente'
+    END as status_prazo,
+    CASE 
+        WHEN pp.data_remessa_encarregado IS NOT NULL THEN
+            JULIANDAY(DATE(pp.data_remessa_encarregado, '+20 days')) - JULIANDAY(DATE('now'))
+        ELSE NULL
+    END as dias_restantes
+FROM processos_procedimentos pp
+WHERE pp.ativo = 1;
+
+
+-- Triggers
+
+CREATE TRIGGER IF NOT EXISTS trg_audit_andamentos_insert
+AFTER INSERT ON andamentos_processo
+BEGIN
+    INSERT INTO auditoria (
+        id, tabela, registro_id, operacao, dados_depois
+    ) VALUES (
+        hex(randomblob(16)),
+        'andamentos_processo',
+        NEW.id,
+        'INSERT',
+        json_object(
+            'id', NEW.id,
+            'processo_id', NEW.processo_id,
+            'data_movimentacao', NEW.data_movimentacao,
+            'tipo_andamento', NEW.tipo_andamento,
+            'descricao', NEW.descricao,
+            'destino_origem', NEW.destino_origem
+        )
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_audit_prazos_insert
+AFTER INSERT ON prazos_processo
+BEGIN
+    INSERT INTO auditoria (
+        id, tabela, registro_id, operacao, dados_depois
+    ) VALUES (
+        hex(randomblob(16)),
+        'prazos_processo',
+        NEW.id,
+        'INSERT',
+        json_object(
+            'id', NEW.id,
+            'processo_id', NEW.processo_id,
+            'tipo_prazo', NEW.tipo_prazo,
+            'data_inicio', NEW.data_inicio,
+            'data_vencimento', NEW.data_vencimento,
+            'dias_adicionados', NEW.dias_adicionados,
+            'motivo', NEW.motivo
+        )
+    );
+END;
@@ -0,0 +1,118 @@
+# pagination_cache.py - Totais e limites de página em cache para listagens paginadas
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class PaginationCache:
+    """Cache de ``COUNT(*)`` e dos limites de página (paginação por chave).
+
+    Cada consulta paginada (termo de busca + filtros) tem uma entrada com o
+    total e a chave de ordenação da última linha de cada página já vista. A
+    entrada vale enquanto as versões das tabelas envolvidas, mantidas por
+    triggers em ``versao_tabelas`` (migração 027), não mudarem: qualquer
+    escrita, de qualquer caminho do código, invalida o cache.
+
+    Com o limite da página anterior conhecido, a próxima página é lida com
+    ``WHERE (chave) < (limite)`` em vez de ``OFFSET``, com o mesmo custo na
+    página 500 e na página 1.
+    """
+
+    def __init__(self, max_consultas=128, max_limites=2000):
+        self.max_consultas = max_consultas
+        self.max_limites = max_limites
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"totais_cache": 0, "totais_calculados": 0,
+                       "paginas_chave": 0, "paginas_offset": 0}
+
+    @staticmethod
+    def versao(cursor, tabelas):
+        """Versões atuais das tabelas (None se a tabela de versões não existir)"""
+        placeholders = ','.join('?' * len(tabelas))
+        try:
+            cursor.execute(
+                f"SELECT tabela, versao FROM versao_tabelas WHERE tabela IN ({placeholders})",
+                list(tabelas)
+            )
+        except sqlite3.OperationalError:
+            return None
+        versoes = dict(cursor.fetchall())
+        if len(versoes) != len(tabelas):
+            return None
+        return tuple(versoes[tabela] for tabela in tabelas)
+
+    def _entrada(self, chave, versao):
+        """Entrada válida para a versão informada (recriada quando desatualizada)"""
+        entrada = self._entradas.get(chave)
+        if entrada is None or entrada["versao"] != versao:
+            entrada = {"versao": versao, "total": None, "limites": {}}
+            self._entradas[chave] = entrada
+        self._entradas.move_to_end(chave)
+        while len(self._entradas) > self.max_consultas:
+            self._entradas.popitem(last=False)
+        return entrada
+
+    def total(self, cursor, chave, tabelas, contar):
+        """Total da consulta ``chave``; ``contar()`` só é chamado sem cache válido.
+
+        Retorna (total, versao); a versão é usada depois em ``limite``/``registrar``.
+        """
+        versao = self.versao(cursor, tabelas)
+        if versao is None:
+            with self._lock:
+                self._stats["totais_calculados"] += 1
+            return contar(), None
+        with self._lock:
+            entrada = self._entrada(chave, versao)
+            if entrada["total"] is not None:
+                self._stats["totais_cache"] += 1
+                return entrada["total"], versao
+        total = contar()
+        with self._lock:
+            self._entrada(chave, versao)["total"] = total
+            self._stats["totais_calculados"] += 1
+        return total, versao
+
+    def ponto_de_partida(self, chave, versao, per_page, page):
+        """(limite, paginas_a_pular) para ler ``page``.
+
+        ``limite`` é a chave da última linha da página conhecida mais próxima
+        antes de ``page`` (None = início); ``paginas_a_pular`` é quantas páginas
+        ainda precisam de OFFSET a partir dali (0 = paginação só por chave).
+        """
+        if page <= 1:
+            return None, 0
+        limite, anterior = None, 0
+        if versao is not None:
+            with self._lock:
+                entrada = self._entradas.get(chave)
+                if entrada is not None and entrada["versao"] == versao:
+                    limites = entrada["limites"]
+                    for pagina in range(page - 1, 0, -1):
+                        if (per_page, pagina) in limites:
+                            limite, anterior = limites[(per_page, pagina)], pagina
+                            break
+        pular = page - 1 - anterior
+        with self._lock:
+            self._stats["paginas_chave" if pular == 0 else "paginas_offset"] += 1
+        return limite, pular
+
+    def registrar(self, chave, versao, per_page, page, limite):
+        """Guarda a chave da última linha de ``page`` para a página seguinte"""
+        if versao is None or limite is None:
+            return
+        with self._lock:
+            entrada = self._entrada(chave, versao)
+            if len(entrada["limites"]) < self.max_limites:
+                entrada["limites"][(per_page, page)] = tuple(limite)
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["consultas"] = len(self._entradas)
+        return stats
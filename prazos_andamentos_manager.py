@@ -3,16 +3,25 @@ import sqlite3
 import uuid
 from datetime import datetime, timedelta
 import json
+from metrics import instrument_class, InstrumentedConnection
+from schema_capabilities import SchemaCapabilities
 
+@instrument_class('PrazosAndamentosManager')
 class PrazosAndamentosManager:
     """Gerenciador de prazos e andamentos dos processos"""
     
-    def __init__(self, db_path='usuarios.db'):
+    def __init__(self, db_path='usuarios.db', pool=None, schema=None):
         self.db_path = db_path
+        # Pool de conexões compartilhado (opcional) - ver connection_pool.py
+        self.pool = pool
+        # Flags do schema verificadas uma única vez (compartilhadas com o DatabaseManager)
+        self.schema = schema or SchemaCapabilities()
     
     def get_connection(self):
         """Retorna conexão com o banco"""
-        return sqlite3.connect(self.db_path)
+        if self.pool is not None:
+            return self.pool.get_connection()
+        return sqlite3.connect(self.db_path, factory=InstrumentedConnection)
     
     # ============================================
     # GERENCIAMENTO DE PRAZOS
@@ -60,19 +69,8 @@ class PrazosAndamentosManager:
             conn = self.get_connection()
             cursor = conn.cursor()
 
-            # Garantir colunas novas (numero_portaria, data_portaria, ordem_prorrogacao)
-            try:
-                cursor.execute("PRAGMA table_info(prazos_processo)")
-                cols = [c[1] for c in cursor.fetchall()]
-                if 'numero_portaria' not in cols:
-                    cursor.execute("ALTER TABLE prazos_processo ADD COLUMN numero_portaria TEXT")
-                if 'data_portaria' not in cols:
-                    cursor.execute("ALTER TABLE prazos_processo ADD COLUMN data_portaria DATE")
-                if 'ordem_prorrogacao' not in cols:
-                    cursor.execute("ALTER TABLE prazos_processo ADD COLUMN ordem_prorrogacao INTEGER")
-                conn.commit()
-            except Exception:
-                pass
+            # Colunas novas (numero_portaria, data_portaria, ordem_prorrogacao): verificadas uma vez
+            self.schema.ensure(conn)
             
             # Buscar prazo atual
             cursor.execute('''
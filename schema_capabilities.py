@@ -0,0 +1,116 @@
+# schema_capabilities.py - Verificação única do schema (colunas/tabelas opcionais)
+import threading
+
+
+class SchemaCapabilities:
+    """Garante colunas/tabelas adicionadas por migrações antigas e guarda flags.
+
+    Executado uma vez na inicialização (``ensure``); os caminhos de escrita e
+    do mapa mensal consultam as flags em memória em vez de executar
+    ``ALTER TABLE``/``PRAGMA table_info`` a cada chamada.
+    """
+
+    # Colunas que versões antigas do banco podem não ter
+    COLUNAS_OPCIONAIS = {
+        "processos_procedimentos": [
+            ("data_remessa_encarregado", "DATE"),
+            ("data_julgamento", "DATE"),
+            ("solucao_tipo", "TEXT"),
+            ("penalidade_tipo", "TEXT"),
+            ("penalidade_dias", "INTEGER"),
+            ("indicios_categorias", "TEXT"),
+        ],
+        "prazos_processo": [
+            ("numero_portaria", "TEXT"),
+            ("data_portaria", "DATE"),
+            ("ordem_prorrogacao", "INTEGER"),
+        ],
+    }
+
+    # Tabelas de associação para indícios
+    TABELAS_INDICIOS = {
+        "procedimentos_indicios_crimes": """
+            CREATE TABLE IF NOT EXISTS procedimentos_indicios_crimes (
+                id TEXT PRIMARY KEY,
+                procedimento_id TEXT NOT NULL,
+                crime_id TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        "procedimentos_indicios_rdpm": """
+            CREATE TABLE IF NOT EXISTS procedimentos_indicios_rdpm (
+                id TEXT PRIMARY KEY,
+                procedimento_id TEXT NOT NULL,
+                transgressao_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+        "procedimentos_indicios_art29": """
+            CREATE TABLE IF NOT EXISTS procedimentos_indicios_art29 (
+                id TEXT PRIMARY KEY,
+                procedimento_id TEXT NOT NULL,
+                art29_id INTEGER NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """,
+    }
+
+    def __init__(self):
+        self.verificado = False
+        self.colunas = {}
+        # Nome da FK em procedimentos_indicios_art29 (migrações antigas usam infracao_id)
+        self.art29_fk = 'art29_id'
+        # Índice FTS5 da busca de processos (migração 028; ausente sem FTS5)
+        self.busca_fts = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _colunas_tabela(cursor, tabela):
+        cursor.execute(f"PRAGMA table_info({tabela})")
+        return {row[1] for row in cursor.fetchall()}
+
+    def ensure(self, conn):
+        """Cria o que faltar e carrega as flags (idempotente; executa uma vez)"""
+        with self._lock:
+            if self.verificado:
+                return self
+            cursor = conn.cursor()
+            tabelas = {row[0] for row in cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()}
+
+            for tabela, colunas in self.COLUNAS_OPCIONAIS.items():
+                if tabela not in tabelas:
+                    continue
+                existentes = self._colunas_tabela(cursor, tabela)
+                for coluna, tipo in colunas:
+                    if coluna not in existentes:
+                        cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+                        print(f"🔧 Coluna adicionada: {tabela}.{coluna}")
+
+            for tabela, ddl in self.TABELAS_INDICIOS.items():
+                if tabela not in tabelas:
+                    cursor.execute(ddl)
+                    print(f"🔧 Tabela criada: {tabela}")
+            conn.commit()
+
+            for tabela in list(self.COLUNAS_OPCIONAIS) + list(self.TABELAS_INDICIOS):
+                self.colunas[tabela] = self._colunas_tabela(cursor, tabela)
+
+            colunas_art29 = self.colunas.get("procedimentos_indicios_art29", set())
+            if 'art29_id' not in colunas_art29 and 'infracao_id' in colunas_art29:
+                self.art29_fk = 'infracao_id'
+            self.busca_fts = 'processos_busca' in tabelas
+            self.verificado = True
+        return self
+
+    def has_column(self, tabela, coluna):
+        return coluna in self.colunas.get(tabela, ())
+
+    def as_dict(self):
+        return {
+            "verificado": self.verificado,
+            "art29_fk": self.art29_fk,
+            "busca_fts": self.busca_fts,
+            "colunas": {tabela: sorted(cols) for tabela, cols in self.colunas.items()},
+        }
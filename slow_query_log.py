@@ -0,0 +1,170 @@
+# slow_query_log.py - Registro de consultas lentas com EXPLAIN QUERY PLAN
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+import metrics
+
+
+def formato_parametros(parametros):
+    """Descreve os parâmetros sem gravar valores (apenas quantidade e tipos)"""
+    if parametros is None:
+        return None
+    if isinstance(parametros, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parametros.items()) + "}"
+    try:
+        tipos = [type(v).__name__ for v in parametros]
+    except TypeError:
+        return type(parametros).__name__
+    return f"{len(tipos)}: (" + ", ".join(tipos) + ")"
+
+
+class SlowQueryLog:
+    """Grava comandos acima de ``limiar_ms`` na tabela rotativa ``slow_query_log``.
+
+    A gravação e o EXPLAIN QUERY PLAN rodam em uma thread própria, com conexão
+    própria: a conexão de quem executou a consulta (que pode estar no meio de
+    uma transação) nunca é usada nem bloqueada pelo log.
+    """
+
+    SQL_TABELA = '''
+        CREATE TABLE IF NOT EXISTS slow_query_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            registrado_em TIMESTAMP NOT NULL,
+            duracao_ms REAL NOT NULL,
+            endpoint TEXT,
+            sql TEXT NOT NULL,
+            parametros TEXT,
+            plano TEXT
+        )
+    '''
+
+    def __init__(self, db_path, limiar_ms=200, max_registros=500, busy_timeout_ms=5000):
+        self.db_path = db_path
+        self.limiar_ms = limiar_ms
+        self.max_registros = max_registros
+        self.busy_timeout_ms = busy_timeout_ms
+        self._fila = queue.Queue(maxsize=1000)
+        self._thread = None
+        self._planos = {}
+        self._lock = threading.Lock()
+        self._stats = {"registradas": 0, "descartadas": 0, "erros": 0}
+
+    def start(self):
+        """Cria a tabela e inicia a thread de gravação"""
+        conn = self._conectar()
+        try:
+            conn.execute(self.SQL_TABELA)
+            conn.commit()
+        finally:
+            conn.close()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='slow-query-log', daemon=True)
+            self._thread.start()
+
+    def _conectar(self):
+        # Conexão comum (não instrumentada) para não registrar a si mesma
+        return sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+
+    def observar(self, sql, parametros, duracao_ms):
+        """Observador de SQL (metrics.registrar_observador_sql)"""
+        if self.limiar_ms is None or duracao_ms < self.limiar_ms or self._thread is None:
+            return
+        registro = (
+            datetime.now().isoformat(sep=' ', timespec='seconds'),
+            round(duracao_ms, 2),
+            metrics.endpoint_atual(),
+            sql.strip(),
+            formato_parametros(parametros),
+            parametros,
+        )
+        try:
+            self._fila.put_nowait(registro)
+        except queue.Full:
+            with self._lock:
+                self._stats["descartadas"] += 1
+
+    def _plano(self, conn, sql, parametros):
+        """EXPLAIN QUERY PLAN (cacheado por texto SQL)"""
+        if sql in self._planos:
+            return self._planos[sql]
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')):
+            return None
+        try:
+            linhas = conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()
+            plano = "\n".join(f"{row[0]}|{row[1]}|{row[3]}" for row in linhas)
+        except sqlite3.Error as e:
+            plano = f"(plano indisponível: {e})"
+        if len(self._planos) > 200:
+            self._planos.clear()
+        self._planos[sql] = plano
+        return plano
+
+    def _loop(self):
+        conn = self._conectar()
+        while True:
+            registro = self._fila.get()
+            if registro is None:
+                break
+            registrado_em, duracao_ms, endpoint, sql, formato, parametros = registro
+            try:
+                plano = self._plano(conn, sql, parametros)
+                cursor = conn.execute('''
+                    INSERT INTO slow_query_log (registrado_em, duracao_ms, endpoint, sql, parametros, plano)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (registrado_em, duracao_ms, endpoint, sql, formato, plano))
+                # Rotação: mantém apenas os últimos max_registros
+                conn.execute("DELETE FROM slow_query_log WHERE id <= ?",
+                             (cursor.lastrowid - self.max_registros,))
+                conn.commit()
+                with self._lock:
+                    self._stats["registradas"] += 1
+            except sqlite3.Error as e:
+                conn.rollback()
+                with self._lock:
+                    self._stats["erros"] += 1
+                print(f"⚠️ Erro ao gravar consulta lenta: {e}")
+        conn.close()
+
+    def stop(self):
+        if self._thread is not None:
+            self._fila.put(None)
+            self._thread = None
+
+    def listar(self, limite=50, ordenar_por='registrado_em'):
+        """Consultas lentas mais recentes (ou mais demoradas, com ordenar_por='duracao_ms')"""
+        coluna = 'duracao_ms' if ordenar_por == 'duracao_ms' else 'id'
+        conn = self._conectar()
+        try:
+            cursor = conn.execute(f'''
+                SELECT id, registrado_em, duracao_ms, endpoint, sql, parametros, plano
+                FROM slow_query_log
+                ORDER BY {coluna} DESC
+                LIMIT ?
+            ''', (int(limite),))
+            return [
+                {
+                    "id": row[0],
+                    "registrado_em": row[1],
+                    "duracao_ms": row[2],
+                    "endpoint": row[3],
+                    "sql": row[4],
+                    "parametros": row[5],
+                    "plano": row[6],
+                    "full_scan": bool(row[6]) and any(
+                        linha.split('|', 2)[-1].startswith('SCAN') for linha in row[6].splitlines()
+                    ),
+                }
+                for row in cursor.fetchall()
+            ]
+        finally:
+            conn.close()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["limiar_ms"] = self.limiar_ms
+        stats["max_registros"] = self.max_registros
+        stats["pendentes"] = self._fila.qsize()
+        return stats
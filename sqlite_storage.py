@@ -0,0 +1,181 @@
+# sqlite_storage.py - Modo de armazenamento do SQLite (WAL, busy timeout, checkpoint)
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class StorageMode:
+    """Configuração de concorrência do banco: vários leitores, um escritor.
+
+    - ``journal_mode=WAL``: leituras não bloqueiam atrás de escritas (e vice-versa).
+    - ``busy_timeout``: escritores concorrentes esperam em vez de falhar com
+      "database is locked".
+    - ``synchronous=NORMAL``: seguro em WAL e evita um fsync por commit.
+    - Checkpoint PASSIVE periódico em thread de fundo, para o arquivo -wal não
+      crescer sem limite e sem bloquear leitores/escritores.
+
+    Observação: WAL exige memória compartilhada entre processos e não funciona
+    em pastas de rede; nesse caso use ``journal_mode='delete'``.
+    """
+
+    def __init__(self, journal_mode='wal', busy_timeout_ms=5000, synchronous='NORMAL',
+                 wal_autocheckpoint=1000, checkpoint_interval=30.0):
+        self.journal_mode = journal_mode.lower()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.wal_autocheckpoint = wal_autocheckpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.journal_mode_efetivo = None
+        self._checkpointer = None
+
+    def configure_connection(self, conn):
+        """Aplicado a toda conexão criada pelo pool"""
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        if self.journal_mode == 'wal':
+            conn.execute(f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)}")
+
+    def apply(self, conn):
+        """Ativa o journal mode no arquivo (persistente) e retorna o modo efetivo"""
+        cursor = conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        self.journal_mode_efetivo = cursor.fetchone()[0]
+        if self.journal_mode_efetivo != self.journal_mode:
+            print(f"⚠️ journal_mode '{self.journal_mode}' não suportado, usando '{self.journal_mode_efetivo}'")
+        return self.journal_mode_efetivo
+
+    def start_checkpointer(self, db_path):
+        """Inicia o checkpoint automático em segundo plano (somente em WAL)"""
+        if self.journal_mode_efetivo != 'wal' or not self.checkpoint_interval:
+            return None
+        if self._checkpointer is None:
+            self._checkpointer = WalCheckpointer(db_path, self.checkpoint_interval, self.busy_timeout_ms)
+            self._checkpointer.start()
+        return self._checkpointer
+
+    def stop_checkpointer(self):
+        if self._checkpointer is not None:
+            self._checkpointer.stop()
+            self._checkpointer = None
+
+    def get_stats(self):
+        """Retorna a configuração efetiva e o estado do checkpoint"""
+        stats = {
+            "journal_mode": self.journal_mode_efetivo,
+            "busy_timeout_ms": self.busy_timeout_ms,
+            "synchronous": self.synchronous,
+            "wal_autocheckpoint": self.wal_autocheckpoint if self.journal_mode_efetivo == 'wal' else None,
+            "checkpoint_intervalo_s": self.checkpoint_interval,
+            "checkpoint": None,
+        }
+        if self._checkpointer is not None:
+            stats["checkpoint"] = self._checkpointer.get_stats()
+        return stats
+
+
+class WalCheckpointer(threading.Thread):
+    """Thread daemon que executa ``PRAGMA wal_checkpoint(PASSIVE)`` periodicamente"""
+
+    def __init__(self, db_path, interval, busy_timeout_ms=5000):
+        super().__init__(name='wal-checkpointer', daemon=True)
+        self.db_path = db_path
+        self.interval = interval
+        self.busy_timeout_ms = busy_timeout_ms
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = {
+            "execucoes": 0,
+            "erros": 0,
+            "ultimo_checkpoint": None,
+            "ultima_duracao_ms": None,
+            "paginas_wal": None,
+            "paginas_copiadas": None,
+            "ultimo_erro": None,
+        }
+
+    def run(self):
+        while not self._parar.wait(self.interval):
+            self.checkpoint()
+
+    def checkpoint(self, modo='PASSIVE'):
+        """Executa um checkpoint com conexão própria (fora do pool)"""
+        inicio = time.perf_counter()
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000)
+            try:
+                busy, paginas_wal, copiadas = conn.execute(f"PRAGMA wal_checkpoint({modo})").fetchone()
+            finally:
+                conn.close()
+            with self._lock:
+                self._stats["execucoes"] += 1
+                self._stats["ultimo_checkpoint"] = datetime.now().isoformat(timespec='seconds')
+                self._stats["ultima_duracao_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+                self._stats["paginas_wal"] = paginas_wal
+                self._stats["paginas_copiadas"] = copiadas
+            return busy == 0
+        except sqlite3.Error as e:
+            with self._lock:
+                self._stats["erros"] += 1
+                self._stats["ultimo_erro"] = str(e)
+            return False
+
+    def stop(self):
+        self._parar.set()
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+class StorageProfile:
+    """Perfil de I/O aplicado a toda conexão: mmap, cache de páginas e temp store.
+
+    - ``mmap_size``: bytes do arquivo lidos via memória mapeada (0 desativa).
+    - ``cache_size_kib``: cache de páginas por conexão, em KiB.
+    - ``temp_store``: 'MEMORY' mantém ordenações/tabelas temporárias em RAM.
+    """
+
+    PERFIS = {
+        # Padrão do SQLite (sem mmap, ~2 MB de cache, temp em disco)
+        'minimo': {"mmap_size": 0, "cache_size_kib": 2000, "temp_store": 'DEFAULT'},
+        'padrao': {"mmap_size": 64 * 1024 * 1024, "cache_size_kib": 16 * 1024, "temp_store": 'MEMORY'},
+        'desempenho': {"mmap_size": 256 * 1024 * 1024, "cache_size_kib": 64 * 1024, "temp_store": 'MEMORY'},
+    }
+
+    def __init__(self, nome='personalizado', mmap_size=0, cache_size_kib=2000, temp_store='DEFAULT'):
+        self.nome = nome
+        self.mmap_size = int(mmap_size)
+        self.cache_size_kib = int(cache_size_kib)
+        self.temp_store = temp_store.upper()
+
+    @classmethod
+    def from_name(cls, nome):
+        """Cria o perfil a partir do nome ('minimo', 'padrao', 'desempenho')"""
+        perfil = cls()
+        perfil.load(nome)
+        return perfil
+
+    def load(self, nome):
+        """Carrega um perfil pré-definido neste objeto (vale para novas conexões)"""
+        if nome not in self.PERFIS:
+            raise ValueError(f"Perfil de armazenamento desconhecido: {nome}")
+        valores = self.PERFIS[nome]
+        self.nome = nome
+        self.mmap_size = int(valores["mmap_size"])
+        self.cache_size_kib = int(valores["cache_size_kib"])
+        self.temp_store = valores["temp_store"].upper()
+
+    def configure_connection(self, conn):
+        """Aplicado a toda conexão criada pelo pool"""
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        # Valor negativo = tamanho em KiB (independe do page_size)
+        conn.execute(f"PRAGMA cache_size = -{self.cache_size_kib}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+
+    def get_stats(self):
+        return {
+            "perfil": self.nome,
+            "mmap_size": self.mmap_size,
+            "cache_size_kib": self.cache_size_kib,
+            "temp_store": self.temp_store,
+        }
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Teste de ida e volta do formato colunar (columnar_encoding.codificar_colunar)
+#
+# Codificar e decodificar deve devolver exatamente as linhas originais. O
+# decodificador abaixo segue decodificarColunar (web/static/js/utils.js); com
+# node instalado, a função JS também é executada sobre o mesmo payload.
+# Executar com: python test_columnar_encoding.py
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+from columnar_encoding import FORMATO_COLUNAR, aplicar_formato, codificar_colunar
+
+UTILS_JS = Path(__file__).resolve().parent / "web" / "static" / "js" / "utils.js"
+
+
+def decodificar_colunar(payload):
+    """Mesmo algoritmo de decodificarColunar, em Python"""
+    if not isinstance(payload, dict) or payload.get("formato") != FORMATO_COLUNAR:
+        return payload
+    linhas = [{} for _ in range(payload["linhas"])]
+    for coluna in payload["colunas"]:
+        tipo = payload["tipos"][coluna]
+        ausentes = set(payload["ausentes"].get(coluna, []))
+        valores = payload["dados"][coluna]
+        if tipo == "objeto":
+            valores = decodificar_colunar(valores)
+        elif tipo == "dicionario":
+            dicionario = payload["dicionarios"][coluna]
+            valores = [None if indice is None else dicionario[indice] for indice in valores]
+        posicao = 0
+        for indice, linha in enumerate(linhas):
+            if indice not in ausentes:
+                linha[coluna] = valores[posicao]
+                posicao += 1
+    return linhas
+
+
+def linhas_exemplo():
+    """Processos com chaves ausentes, None, strings repetidas e prazo aninhado"""
+    linhas = []
+    for i in range(12):
+        linha = {
+            "id": f"p{i}",
+            "numero": str(100 + i),
+            "tipo_detalhe": ["PAD", "IPM", "SR"][i % 3],
+            "local_origem": "7ºBPM" if i % 4 else None,
+            "documento_iniciador": "Portaria",
+            "observacao": None,
+            "ativo": i % 5 != 0,
+            "prazo": {
+                "status_prazo": ["Vencido", "No prazo"][i % 2],
+                "dias_restantes": i - 6,
+                "data_limite": None if i % 3 == 0 else f"2026-01-{i + 1:02d}",
+            },
+        }
+        if i % 4 == 1:
+            del linha["local_origem"]
+        if i % 6 == 2:
+            del linha["prazo"]["dias_restantes"]
+        if i == 7:
+            linha["extra"] = [1, {"a": None}]
+        linhas.append(linha)
+    return linhas
+
+
+def test_ida_e_volta_devolve_linhas_originais():
+    linhas = linhas_exemplo()
+    payload = codificar_colunar(linhas)
+
+    # Os casos que o teste pretende cobrir realmente aparecem no payload
+    assert payload["tipos"]["tipo_detalhe"] == "dicionario"
+    assert payload["tipos"]["local_origem"] == "dicionario"
+    assert payload["tipos"]["prazo"] == "objeto"
+    assert payload["dados"]["prazo"]["tipos"]["status_prazo"] == "dicionario"
+    assert "local_origem" in payload["ausentes"]
+    assert "extra" in payload["ausentes"]
+    assert "dias_restantes" in payload["dados"]["prazo"]["ausentes"]
+
+    assert decodificar_colunar(payload) == linhas
+    # O payload trafega como JSON pelo Eel
+    assert decodificar_colunar(json.loads(json.dumps(payload))) == linhas
+
+
+def test_casos_limite():
+    for linhas in ([], [{}], [{"a": None}, {}], [{"a": None}, {"a": None}],
+                   [{"a": {}}, {"a": {}}], [{"a": {"b": 1}}, {"a": None}]):
+        assert decodificar_colunar(codificar_colunar(linhas)) == linhas, linhas
+    assert aplicar_formato([{"a": 1}]) == [{"a": 1}]
+
+
+def test_decodificador_js():
+    """decodificarColunar (servido ao front-end) reconstrói as mesmas linhas"""
+    node = shutil.which("node")
+    if node is None:
+        print("⚠️ node não encontrado: decodificarColunar não verificado")
+        return
+    linhas = linhas_exemplo()
+    script = (
+        UTILS_JS.read_text(encoding="utf-8")
+        + "\nconst payload = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        + "\nprocess.stdout.write(JSON.stringify(decodificarColunar(payload)));"
+    )
+    saida = subprocess.run(
+        [node, "-e", script], input=json.dumps(codificar_colunar(linhas)),
+        capture_output=True, text=True, check=True,
+    ).stdout
+    assert json.loads(saida) == linhas
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando o formato colunar:")
+    print("=" * 60)
+    for teste in [test_ida_e_volta_devolve_linhas_originais, test_casos_limite, test_decodificador_js]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# Teste do ConnectionPool: reaproveitamento, devolução e escopos aninhados
+# Executar com: python test_connection_pool.py
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+from connection_pool import ConnectionPool
+
+
+def criar_pool(**kwargs):
+    diretorio = tempfile.mkdtemp(prefix="teste_")
+    caminho = os.path.join(diretorio, "pool.db")
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE itens (nome TEXT)")
+    conn.close()
+    return diretorio, ConnectionPool(caminho, **kwargs)
+
+
+def nomes(pool):
+    conn = sqlite3.connect(pool.db_path)
+    resultado = sorted(row[0] for row in conn.execute("SELECT nome FROM itens"))
+    conn.close()
+    return resultado
+
+
+def inserir(pool, nome, confirmar=True):
+    conn = pool.get_connection()
+    conn.execute("INSERT INTO itens VALUES (?)", (nome,))
+    if confirmar:
+        conn.commit()
+    conn.close()
+
+
+def test_conexao_reaproveitada_e_devolvida():
+    diretorio, pool = criar_pool(max_idle=2)
+    try:
+        primeira = pool.get_connection()
+        real = primeira._conn
+        primeira.close()
+        primeira.close()  # segundo close não devolve de novo
+        assert pool.get_stats()["ociosas"] == 1
+
+        segunda = pool.get_connection()
+        assert segunda._conn is real
+        assert pool.get_stats()["em_uso"] == 1
+        segunda.close()
+
+        stats = pool.get_stats()
+        assert stats["criadas"] == 1 and stats["reutilizadas"] == 1
+        assert stats["em_uso"] == 0 and stats["ociosas"] == 1
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_devolucao_descarta_transacao_pendente_e_overflow_fecha():
+    diretorio, pool = criar_pool(max_idle=1)
+    try:
+        inserir(pool, "sem commit", confirmar=False)
+        assert nomes(pool) == []
+        assert pool.get_stats()["rollbacks_devolucao"] == 1
+
+        # Além de max_idle: conexão extra, fechada ao ser devolvida
+        a, b = pool.get_connection(), pool.get_connection()
+        assert a._conn is not b._conn
+        a.close()
+        b.close()
+        stats = pool.get_stats()
+        assert stats["overflow"] == 1
+        assert stats["ociosas"] == 1 and stats["fechadas"] == 1
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_escopo_compartilha_conexao_e_e_reentrante():
+    diretorio, pool = criar_pool()
+    try:
+        with pool.scope() as conn:
+            assert pool.get_connection()._conn is conn
+            with pool.scope() as interna:
+                assert interna is conn
+                assert pool.get_connection()._conn is conn
+            # A conexão do escopo não volta ao pool antes do fim do escopo externo
+            assert pool.get_stats()["escopos_ativos"] == 1
+            assert pool.get_stats()["em_uso"] == 1
+
+        stats = pool.get_stats()
+        assert stats["escopos_ativos"] == 0 and stats["em_uso"] == 0
+        assert stats["ociosas"] == 1 and stats["checkouts_em_escopo"] == 2
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_escopos_de_threads_diferentes_sao_independentes():
+    diretorio, pool = criar_pool()
+    try:
+        conexoes = {}
+
+        def requisicao(nome):
+            with pool.scope() as conn:
+                conexoes[nome] = conn
+                barreira.wait()
+
+        barreira = threading.Barrier(2)
+        threads = [threading.Thread(target=requisicao, args=(n,)) for n in ("a", "b")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert conexoes["a"] is not conexoes["b"]
+        assert pool.get_stats()["escopos_ativos"] == 0
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_commit_no_escopo_sem_transacao_confirma():
+    diretorio, pool = criar_pool()
+    try:
+        with pool.scope():
+            inserir(pool, "a")
+            inserir(pool, "sem commit", confirmar=False)
+        assert nomes(pool) == ["a"]
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_commit_e_rollback_internos_nao_decidem_pela_transacao_externa():
+    diretorio, pool = criar_pool()
+    try:
+        with pool.scope():
+            externa = pool.get_connection()
+            externa.execute("INSERT INTO itens VALUES ('externo')")
+
+            # commit interno só libera o savepoint: nada é gravado ainda
+            inserir(pool, "interno confirmado")
+            assert nomes(pool) == []
+
+            # rollback interno desfaz só o próprio trabalho
+            interna = pool.get_connection()
+            interna.execute("INSERT INTO itens VALUES ('interno desfeito')")
+            interna.rollback()
+            interna.close()
+
+            # close sem commit também descarta só o trabalho interno
+            inserir(pool, "interno sem commit", confirmar=False)
+
+            externa.commit()
+            externa.close()
+        assert nomes(pool) == ["externo", "interno confirmado"]
+        assert pool.get_stats()["savepoints_escopo"] >= 3
+
+        with pool.scope():
+            externa = pool.get_connection()
+            externa.execute("INSERT INTO itens VALUES ('externo 2')")
+            inserir(pool, "interno 2")
+            # Quem iniciou a transação desfaz tudo, inclusive o commit interno
+            externa.rollback()
+            externa.close()
+        assert nomes(pool) == ["externo", "interno confirmado"]
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_with_na_conexao_do_escopo():
+    diretorio, pool = criar_pool()
+    try:
+        with pool.scope():
+            externa = pool.get_connection()
+            externa.execute("INSERT INTO itens VALUES ('externo')")
+            try:
+                with pool.get_connection() as interna:
+                    interna.execute("INSERT INTO itens VALUES ('com erro')")
+                    raise ValueError
+            except ValueError:
+                pass
+            with pool.get_connection() as interna:
+                interna.execute("INSERT INTO itens VALUES ('ok')")
+            externa.commit()
+            externa.close()
+        assert nomes(pool) == ["externo", "ok"]
+    finally:
+        pool.close_all()
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando o pool de conexões:")
+    print("=" * 60)
+    for teste in [
+        test_conexao_reaproveitada_e_devolvida,
+        test_devolucao_descarta_transacao_pendente_e_overflow_fecha,
+        test_escopo_compartilha_conexao_e_e_reentrante,
+        test_escopos_de_threads_diferentes_sao_independentes,
+        test_commit_no_escopo_sem_transacao_confirma,
+        test_commit_e_rollback_internos_nao_decidem_pela_transacao_externa,
+        test_with_na_conexao_do_escopo,
+    ]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
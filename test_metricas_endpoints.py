@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Teste da instrumentação dos endpoints expostos ao front-end
+# Executar com: python test_metricas_endpoints.py
+
+import eel
+
+import metrics
+from testing_support import importar_main
+
+main = importar_main()
+
+
+def endpoint(nome):
+    for item in metrics.metricas.resumo():
+        if item["endpoint"] == nome:
+            return item
+    return None
+
+
+def test_endpoint_exposto_aparece_no_resumo():
+    metrics.metricas.limpar()
+    processos = main.listar_processos()
+
+    item = endpoint("listar_processos")
+    assert item is not None, metrics.metricas.resumo()
+    assert item["chamadas"] == 1 and item["erros"] == 0
+    assert item["sql_max"] >= 1
+    assert item["linhas_max"] >= len(processos)
+    assert item["payload_max_bytes"] > 0
+
+
+def test_expose_instrumenta_todas_as_formas():
+    registradas = {}
+
+    def expose(nome_ou_funcao=None):
+        if isinstance(nome_ou_funcao, str):
+            return lambda func: registradas.setdefault(nome_ou_funcao, func)
+        registradas[nome_ou_funcao.__name__] = nome_ou_funcao
+        return nome_ou_funcao
+
+    expor = metrics.instrument_expose(expose, prefixo="teste.")
+
+    @expor
+    def direta():
+        return {"sucesso": True}
+
+    @expor()
+    def com_parenteses():
+        return {"sucesso": False, "mensagem": "erro tratado"}
+
+    @expor("nome_js")
+    def com_nome():
+        return []
+
+    metrics.metricas.limpar()
+    for nome in ("direta", "com_parenteses", "nome_js"):
+        registradas[nome]()
+    direta()
+
+    assert endpoint("teste.direta")["chamadas"] == 2
+    assert endpoint("teste.com_parenteses")["erros"] == 1
+    assert endpoint("teste.nome_js")["chamadas"] == 1
+    # Função já instrumentada não é envolvida de novo
+    assert expor(direta) is direta
+
+
+def test_eel_expose_do_main_e_o_instrumentado():
+    assert eel.expose.__wrapped__ is not None
+    assert getattr(main.listar_processos, "__instrumentado__", False)
+    assert getattr(main.listar_jobs, "__instrumentado__", False)
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando a instrumentação dos endpoints:")
+    print("=" * 60)
+    for teste in [
+        test_endpoint_exposto_aparece_no_resumo,
+        test_expose_instrumenta_todas_as_formas,
+        test_eel_expose_do_main_e_o_instrumentado,
+    ]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
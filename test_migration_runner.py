@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Teste do MigrationRunner: banco novo (schema baseline) e falha com restauração
+# Executar com: python test_migration_runner.py
+
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from migration_runner import (
+    BASELINE_SQL, TABELAS_BASELINE, VERSAO_BASELINE, MigrationError, MigrationRunner,
+    diretorio_migracoes_padrao,
+)
+from testing_support import BASE_DIR
+
+
+def tabelas(caminho):
+    conn = sqlite3.connect(caminho)
+    nomes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    return nomes
+
+
+def versao(caminho):
+    conn = sqlite3.connect(caminho)
+    valor = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    return valor
+
+
+def test_banco_novo_recebe_schema_baseline():
+    diretorio = tempfile.mkdtemp(prefix="teste_")
+    try:
+        caminho = os.path.join(diretorio, "novo.db")
+        runner = MigrationRunner(caminho)
+        resultado = runner.run()
+        ultima = max(numero for numero, _, _ in runner.descobrir())
+
+        assert resultado["erro"] is None
+        assert resultado["schema_baseline_criado"]
+        assert resultado["versao_atual"] == versao(caminho) == ultima
+        assert all(numero > VERSAO_BASELINE for numero in
+                   (int(m["migracao"][:3]) for m in resultado["aplicadas"]))
+        # Mesmas tabelas de um banco existente migrado
+        existente = os.path.join(diretorio, "existente.db")
+        shutil.copy(os.path.join(BASE_DIR, "usuarios.db"), existente)
+        MigrationRunner(existente).run()
+        assert tabelas(existente) - tabelas(caminho) <= {"sqlite_stat1"}
+
+        # Segunda execução: nada a fazer
+        assert MigrationRunner(caminho).run()["aplicadas"] == []
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_schema_antigo_incompleto_interrompe():
+    diretorio = tempfile.mkdtemp(prefix="teste_")
+    try:
+        caminho = os.path.join(diretorio, "parcial.db")
+        conn = sqlite3.connect(caminho)
+        conn.execute(f"CREATE TABLE {TABELAS_BASELINE[0]} (id TEXT PRIMARY KEY)")
+        conn.close()
+        try:
+            MigrationRunner(caminho).run()
+        except MigrationError:
+            pass
+        else:
+            raise AssertionError("schema parcial deveria interromper as migrações")
+        assert versao(caminho) == 0
+        assert tabelas(caminho) == {TABELAS_BASELINE[0]}
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_falha_restaura_backup_e_interrompe():
+    diretorio = tempfile.mkdtemp(prefix="teste_")
+    try:
+        migracoes = os.path.join(diretorio, "migrations")
+        shutil.copytree(diretorio_migracoes_padrao(), migracoes,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        ultima = max(numero for numero, _, _ in MigrationRunner(":memory:", migracoes).descobrir())
+        with open(os.path.join(migracoes, f"{ultima + 1:03d}_falha.sql"), "w", encoding="utf-8") as f:
+            f.write("CREATE TABLE teste_falha (id INTEGER);\nSELECT * FROM tabela_inexistente;\n")
+
+        caminho = os.path.join(diretorio, "usuarios.db")
+        shutil.copy(os.path.join(BASE_DIR, "usuarios.db"), caminho)
+        antes = tabelas(caminho)
+        versao_antes = versao(caminho)
+
+        runner = MigrationRunner(caminho, migracoes)
+        try:
+            runner.run()
+        except MigrationError:
+            pass
+        else:
+            raise AssertionError("a migração com erro deveria interromper a inicialização")
+
+        # As etapas anteriores à falha também foram desfeitas
+        assert tabelas(caminho) == antes
+        assert versao(caminho) == versao_antes
+        assert runner.ultimo_resultado["erro"]
+        assert os.path.exists(runner.ultimo_resultado["backup"])
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_baseline_nao_e_migracao_numerada():
+    nomes = [nome for _, nome, _ in MigrationRunner(":memory:").descobrir()]
+    assert BASELINE_SQL not in nomes
+    assert os.path.exists(os.path.join(diretorio_migracoes_padrao(), BASELINE_SQL))
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando o executor de migrações:")
+    print("=" * 60)
+    for teste in [
+        test_banco_novo_recebe_schema_baseline,
+        test_schema_antigo_incompleto_interrompe,
+        test_falha_restaura_backup_e_interrompe,
+        test_baseline_nao_e_migracao_numerada,
+    ]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# Teste do PaginationCache (totais e limites de página em cache)
+# Executar com: python test_pagination_cache.py
+
+import shutil
+import sqlite3
+
+from pagination_cache import PaginationCache
+from testing_support import criar_banco_migrado
+
+CHAVE = ("processos_com_prazos", "", "{}", "2026-10-17")
+TABELAS = ("processo_listagem",)
+
+
+def banco_versoes():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE versao_tabelas (tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL)")
+    conn.execute("INSERT INTO versao_tabelas VALUES ('processo_listagem', 0)")
+    return conn
+
+
+def avancar(conn):
+    conn.execute("UPDATE versao_tabelas SET versao = versao + 1 WHERE tabela = 'processo_listagem'")
+
+
+class Contador:
+    def __init__(self, valor):
+        self.valor = valor
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        return self.valor
+
+
+def test_total_em_cache_ate_a_versao_mudar():
+    conn = banco_versoes()
+    cache = PaginationCache()
+    contar = Contador(40)
+
+    assert cache.total(conn.cursor(), CHAVE, TABELAS, contar) == (40, (0,))
+    assert cache.total(conn.cursor(), CHAVE, TABELAS, contar) == (40, (0,))
+    assert contar.chamadas == 1
+
+    # Outra consulta tem entrada própria
+    cache.total(conn.cursor(), CHAVE[:1] + ("busca",) + CHAVE[2:], TABELAS, contar)
+    assert contar.chamadas == 2
+
+    avancar(conn)
+    contar.valor = 41
+    assert cache.total(conn.cursor(), CHAVE, TABELAS, contar) == (41, (1,))
+    assert contar.chamadas == 3
+    assert cache.get_stats()["totais_cache"] == 1
+
+
+def test_total_sem_tabela_de_versoes_nao_usa_cache():
+    conn = sqlite3.connect(":memory:")
+    cache = PaginationCache()
+    contar = Contador(7)
+
+    assert cache.total(conn.cursor(), CHAVE, TABELAS, contar) == (7, None)
+    assert cache.total(conn.cursor(), CHAVE, TABELAS, contar) == (7, None)
+    assert contar.chamadas == 2
+    assert cache.get_stats()["consultas"] == 0
+
+
+def test_ponto_de_partida_usa_limite_mais_proximo():
+    conn = banco_versoes()
+    cache = PaginationCache()
+    _, versao = cache.total(conn.cursor(), CHAVE, TABELAS, Contador(100))
+
+    # Sem limites conhecidos: OFFSET de todas as páginas anteriores
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 1) == (None, 0)
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 4) == (None, 3)
+
+    cache.registrar(CHAVE, versao, 10, 1, [900, "p10"])
+    cache.registrar(CHAVE, versao, 10, 2, (800, "p20"))
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 2) == ((900, "p10"), 0)
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 3) == ((800, "p20"), 0)
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 5) == ((800, "p20"), 2)
+
+    # Limites valem só para o mesmo tamanho de página
+    assert cache.ponto_de_partida(CHAVE, versao, 20, 2) == (None, 1)
+
+    stats = cache.get_stats()
+    assert stats["paginas_chave"] == 2
+    assert stats["paginas_offset"] == 3
+
+
+def test_limites_descartados_quando_a_versao_muda():
+    conn = banco_versoes()
+    cache = PaginationCache()
+    _, versao = cache.total(conn.cursor(), CHAVE, TABELAS, Contador(100))
+    cache.registrar(CHAVE, versao, 10, 1, (900, "p10"))
+
+    avancar(conn)
+    _, nova = cache.total(conn.cursor(), CHAVE, TABELAS, Contador(99))
+    assert nova != versao
+    assert cache.ponto_de_partida(CHAVE, nova, 10, 2) == (None, 1)
+    # Versão antiga (requisição concorrente) também não encontra o limite
+    assert cache.ponto_de_partida(CHAVE, versao, 10, 2) == (None, 1)
+
+
+def test_registrar_ignora_sem_versao_ou_sem_limite_e_respeita_maximos():
+    cache = PaginationCache(max_consultas=2, max_limites=2)
+    cache.registrar(CHAVE, None, 10, 1, (1, "a"))
+    cache.registrar(CHAVE, (0,), 10, 1, None)
+    assert cache.get_stats()["consultas"] == 0
+
+    for pagina in (1, 2, 3):
+        cache.registrar(CHAVE, (0,), 10, pagina, (pagina, "x"))
+    assert cache.ponto_de_partida(CHAVE, (0,), 10, 4) == ((2, "x"), 1)
+
+    # A consulta usada há mais tempo sai quando passa de max_consultas
+    cache.registrar(("b",), (0,), 10, 1, (1, "b"))
+    cache.registrar(("c",), (0,), 10, 1, (1, "c"))
+    assert cache.get_stats()["consultas"] == 2
+    assert cache.ponto_de_partida(CHAVE, (0,), 10, 2) == (None, 1)
+
+
+def test_versao_da_listagem_avanca_em_qualquer_gravacao():
+    """O contador de processo_listagem (dependência do cache) acompanha UPDATEs diretos"""
+    diretorio, caminho = criar_banco_migrado()
+    try:
+        conn = sqlite3.connect(caminho)
+        cache = PaginationCache()
+
+        def contar():
+            return conn.execute("SELECT COUNT(*) FROM processo_listagem WHERE ativo = 1").fetchone()[0]
+
+        total, versao = cache.total(conn.cursor(), CHAVE, TABELAS, contar)
+        processo_id, = conn.execute(
+            "SELECT processo_id FROM processo_listagem WHERE ativo = 1 LIMIT 1"
+        ).fetchone()
+
+        conn.execute("UPDATE processo_listagem SET ativo = 0 WHERE processo_id = ?", (processo_id,))
+        conn.commit()
+        novo_total, nova_versao = cache.total(conn.cursor(), CHAVE, TABELAS, contar)
+        assert nova_versao != versao
+        assert novo_total == total - 1
+        linha_versao, = conn.execute(
+            "SELECT versao FROM processo_listagem WHERE processo_id = ?", (processo_id,)
+        ).fetchone()
+        assert (linha_versao,) == nova_versao
+
+        # Alteração de nome de usuário regrava as linhas da listagem (migração 029)
+        conn.execute("UPDATE usuarios SET nome = nome || ' ' WHERE id IN (SELECT responsavel_id FROM processos_procedimentos WHERE ativo = 1 LIMIT 1)")
+        conn.commit()
+        assert cache.total(conn.cursor(), CHAVE, TABELAS, contar)[1] != nova_versao
+        conn.close()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando o cache de paginação:")
+    print("=" * 60)
+    for teste in [
+        test_total_em_cache_ate_a_versao_mudar,
+        test_total_sem_tabela_de_versoes_nao_usa_cache,
+        test_ponto_de_partida_usa_limite_mais_proximo,
+        test_limites_descartados_quando_a_versao_muda,
+        test_registrar_ignora_sem_versao_ou_sem_limite_e_respeita_maximos,
+        test_versao_da_listagem_avanca_em_qualquer_gravacao,
+    ]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# Teste dos planos de execução (EXPLAIN QUERY PLAN) das consultas dos endpoints
+#
+# Chama os endpoints expostos sobre uma cópia migrada de usuarios.db, captura o
+# SQL realmente executado (metrics.registrar_observador_sql) e verifica que
+# nenhum comando capturado faz varredura completa de tabela.
+# Executar com: python test_planos_consulta.py
+
+import re
+import sqlite3
+
+import metrics
+from testing_support import importar_main
+
+main = importar_main()
+
+# SCAN = varredura completa (de tabela ou de índice); SCAN CONSTANT ROW não lê
+# tabela e a busca FTS5 ("VIRTUAL TABLE INDEX") usa o índice invertido
+VARREDURA = re.compile(r"^SCAN (?!CONSTANT ROW)(?!.*VIRTUAL TABLE INDEX)")
+
+# Busca restrita só por ativo=? lê todas as linhas ativas: também é varredura
+SO_ATIVO = re.compile(r"^SEARCH .* \(ativo=\?\)$")
+
+# Tabelas de poucas linhas fixas (uma por tabela versionada)
+TABELAS_PEQUENAS = {"versao_tabelas"}
+
+# Leituras da listagem que percorrem os ativos por definição: o total (em cache
+# no PaginationCache) e a página, lida em ordem pelo índice (ativo, ordem) até o LIMIT
+LEITURA_DOS_ATIVOS = re.compile(r"FROM processo_listagem l\b")
+
+# Chamadas que devolvem todos os processos ativos (sem paginação): a busca por
+# ativo=? é o próprio resultado
+LISTAGENS_COMPLETAS = {"listar_processos"}
+
+# Consultas cuja ordenação deve vir do índice (sem B-tree temporária)
+SEM_ORDENACAO_TEMPORARIA = re.compile(r"FROM (andamentos_processo|processo_listagem)\b")
+
+# Comandos com plano (PRAGMA/BEGIN/COMMIT/DDL não têm)
+COM_PLANO = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.I)
+
+_capturados = None
+
+
+def _observar(sql, parametros, duracao_ms):
+    if _capturados is not None:
+        _capturados.append((sql, parametros))
+
+
+metrics.registrar_observador_sql(_observar)
+
+
+def capturar(func, *args):
+    """(resultado, [(sql, parametros)]) dos comandos executados por ``func(*args)``"""
+    global _capturados
+    _capturados = []
+    try:
+        resultado = func(*args)
+        return resultado, _capturados
+    finally:
+        _capturados = None
+
+
+def chamadas():
+    """[(rótulo, endpoint, argumentos)] com ids reais do banco de teste"""
+    conn = sqlite3.connect(main.db_manager.db_path)
+    processo_id, pm_envolvido_id, pm_id = conn.execute("""
+        SELECT pe.procedimento_id, pe.id, pe.pm_id
+        FROM procedimento_pms_envolvidos pe
+        JOIN processos_procedimentos p ON p.id = pe.procedimento_id AND p.ativo = 1
+        ORDER BY pe.id LIMIT 1
+    """).fetchone()
+    escrivao_id, = conn.execute(
+        "SELECT COALESCE(MAX(escrivao_id), ?) FROM processos_procedimentos", (pm_id,)
+    ).fetchone()
+    conn.close()
+    return [
+        ("gerar_mapa_mensal", main.gerar_mapa_mensal, (10, 2025, "IPM")),
+        ("obter_estatistica_ipm_indicios", main.obter_estatistica_ipm_indicios, (None,)),
+        ("obter_estatistica_sr_indicios", main.obter_estatistica_sr_indicios, ("2025",)),
+        ("obter_processo", main.obter_processo, (processo_id,)),
+        ("listar_processos", main.listar_processos, ()),
+        ("obter_estatisticas_usuario (PM)", main.obter_estatisticas_usuario, (pm_id, "operador")),
+        ("obter_estatisticas_usuario (escrivão)", main.obter_estatisticas_usuario, (escrivao_id, "operador")),
+        ("gerar_relatorio_processo", main.gerar_relatorio_processo, (processo_id,)),
+        ("salvar_indicios_pm_envolvido", main.salvar_indicios_pm_envolvido,
+         (pm_envolvido_id, {"categorias": ["Não houve indícios"], "crimes": [], "rdpm": [], "art29": []})),
+        ("listar_processos_com_prazos (página 1)", main.listar_processos_com_prazos, (None, 1, 6)),
+        ("listar_processos_com_prazos (página 2)", main.listar_processos_com_prazos, (None, 2, 6)),
+        ("listar_processos_com_prazos (busca)", main.listar_processos_com_prazos, ("IPM", 1, 6)),
+    ]
+
+
+def plano(conn, sql, parametros):
+    return [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ())]
+
+
+def problemas_do_plano(rotulo, sql, detalhes):
+    problemas = [
+        d for d in detalhes
+        if VARREDURA.match(d) and d.split()[1] not in TABELAS_PEQUENAS
+    ]
+    if rotulo not in LISTAGENS_COMPLETAS and not LEITURA_DOS_ATIVOS.search(sql):
+        problemas += [d for d in detalhes if SO_ATIVO.match(d)]
+    if SEM_ORDENACAO_TEMPORARIA.search(sql):
+        problemas += [d for d in detalhes if "TEMP B-TREE" in d]
+    return problemas
+
+
+def verificar_planos():
+    """{rótulo: [(sql, plano, problemas)]} dos comandos executados por cada chamada"""
+    resultados = {}
+    for rotulo, endpoint, args in chamadas():
+        _, comandos = capturar(endpoint, *args)
+        conn = sqlite3.connect(main.db_manager.db_path)
+        resultados[rotulo] = []
+        for sql, parametros in comandos:
+            if not COM_PLANO.match(sql):
+                continue
+            detalhes = plano(conn, sql, parametros)
+            resultados[rotulo].append((sql, detalhes, problemas_do_plano(rotulo, sql, detalhes)))
+        conn.close()
+    return resultados
+
+
+def test_endpoints_executam_sql():
+    """Todas as chamadas passam pelo banco (senão o teste não verifica nada)"""
+    vazias = [rotulo for rotulo, comandos in verificar_planos().items() if not comandos]
+    assert not vazias, f"Chamadas sem SQL capturado: {vazias}"
+
+
+def test_consultas_sem_varredura_completa():
+    falhas = {
+        rotulo: [(" ".join(sql.split())[:120], problemas) for sql, _, problemas in comandos if problemas]
+        for rotulo, comandos in verificar_planos().items()
+    }
+    falhas = {rotulo: itens for rotulo, itens in falhas.items() if itens}
+    assert not falhas, f"Consultas com varredura completa: {falhas}"
+
+
+def test_pagina_seguinte_usa_paginacao_por_chave():
+    """A página 2 continua do limite da página 1 (keyset), sem OFFSET de linhas"""
+    main.listar_processos_com_prazos(None, 1, 6)
+    _, comandos = capturar(main.listar_processos_com_prazos, None, 2, 6)
+    paginas = [(sql, parametros) for sql, parametros in comandos if "LIMIT ? OFFSET ?" in sql]
+    assert len(paginas) == 1
+    sql, parametros = paginas[0]
+    assert "l.ordem <= ?" in sql
+    assert list(parametros)[-2:] == [6, 0]
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando planos de execução:")
+    print("=" * 60)
+    resultados = verificar_planos()
+    for rotulo, comandos in resultados.items():
+        status = "✅" if comandos and not any(problemas for _, _, problemas in comandos) else "❌"
+        print(f"{status} {rotulo}")
+        for sql, detalhes, problemas in comandos:
+            print(f"   {' '.join(sql.split())[:100]}")
+            for detalhe in detalhes:
+                print(f"     {'❌ ' if detalhe in problemas else ''}{detalhe}")
+    print("=" * 60)
+    test_pagina_seguinte_usa_paginacao_por_chave()
+    print("✅ test_pagina_seguinte_usa_paginacao_por_chave")
+    if any(not comandos or any(problemas for _, _, problemas in comandos) for comandos in resultados.values()):
+        print("\n❌ Há consultas com varredura completa\n")
+        raise SystemExit(1)
+    print("\n✅ Todos os testes passaram!\n")
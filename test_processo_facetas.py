@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# Teste de consistência de processo_facetas (filtros da listagem com contagem)
+#
+# As contagens mantidas por triggers devem ser iguais a um GROUP BY feito na
+# hora sobre processo_listagem, depois de todas as migrações e de alterações
+# nos processos. Executar com: python test_processo_facetas.py
+
+import shutil
+import sqlite3
+import uuid
+
+from testing_support import carregar_migracao, criar_banco_migrado
+
+DIMENSOES = carregar_migracao("033_processo_facetas").DIMENSOES
+
+
+def contagens_recalculadas(conn):
+    """{(dimensao, valor): quantidade} recontado a partir de processo_listagem"""
+    contagens = {}
+    for dimensao, coluna in DIMENSOES:
+        for valor, quantidade in conn.execute(f"""
+            SELECT {coluna}, COUNT(*) FROM processo_listagem
+            WHERE ativo = 1 AND COALESCE({coluna}, '') <> ''
+            GROUP BY {coluna}
+        """):
+            contagens[(dimensao, valor)] = quantidade
+    return contagens
+
+
+def diferencas(conn):
+    """{(dimensao, valor): (em processo_facetas, recontado)} das contagens divergentes"""
+    mantidas = {(d, v): q for d, v, q in conn.execute("SELECT dimensao, valor, quantidade FROM processo_facetas")}
+    recontadas = contagens_recalculadas(conn)
+    return {
+        chave: (mantidas.get(chave), recontadas.get(chave))
+        for chave in set(mantidas) | set(recontadas)
+        if mantidas.get(chave) != recontadas.get(chave)
+    }
+
+
+def _processo_com_ano_divergente(conn):
+    """Cópia de um processo com ano_instauracao diferente do ano de data_instauracao
+
+    A migração 035 corrige esse ano; a correção não pode desfazer a contagem
+    das facetas nem deixar a linha da listagem desatualizada.
+    """
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(processos_procedimentos)")]
+    linha = conn.execute("""
+        SELECT * FROM processos_procedimentos
+        WHERE ativo = 1 AND COALESCE(data_instauracao, '') <> ''
+        ORDER BY id LIMIT 1
+    """).fetchone()
+    registro = dict(zip(colunas, linha))
+    registro.update(
+        id=str(uuid.uuid4()), numero="T-035",
+        ano_instauracao=str(int(registro["data_instauracao"][:4]) + 1),
+    )
+    conn.execute(
+        f"INSERT INTO processos_procedimentos ({', '.join(registro)}) VALUES ({', '.join('?' * len(registro))})",
+        list(registro.values()),
+    )
+
+
+def test_facetas_iguais_ao_group_by_apos_migracoes():
+    diretorio, caminho = criar_banco_migrado(preparar=_processo_com_ano_divergente)
+    try:
+        conn = sqlite3.connect(caminho)
+        assert not diferencas(conn), diferencas(conn)
+        ano, data, versao = conn.execute("""
+            SELECT p.ano_instauracao, p.data_instauracao, l.versao
+            FROM processos_procedimentos p JOIN processo_listagem l ON l.processo_id = p.id
+            WHERE p.numero = 'T-035'
+        """).fetchone()
+        conn.close()
+        assert ano == data[:4] and versao > 0
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+def test_facetas_acompanham_update_direto_na_listagem():
+    """UPDATE em colunas das facetas ou em ativo (migração 037) mantém as contagens"""
+    diretorio, caminho = criar_banco_migrado()
+    try:
+        conn = sqlite3.connect(caminho)
+        processo_id, tipo = conn.execute(
+            "SELECT processo_id, tipo_detalhe FROM processo_listagem WHERE ativo = 1 ORDER BY processo_id LIMIT 1"
+        ).fetchone()
+        alteracoes = [
+            ("UPDATE processo_listagem SET tipo_detalhe = 'TESTE-037' WHERE processo_id = ?", (processo_id,)),
+            ("UPDATE processo_listagem SET responsavel_filtro = NULL, nome_vitima = '' WHERE processo_id = ?",
+             (processo_id,)),
+            ("UPDATE processo_listagem SET ativo = 0 WHERE processo_id = ?", (processo_id,)),
+            # Inativa: mudar colunas não altera contagens
+            ("UPDATE processo_listagem SET tipo_detalhe = ? WHERE processo_id = ?", (tipo, processo_id)),
+            ("UPDATE processo_listagem SET ativo = 1 WHERE processo_id = ?", (processo_id,)),
+            # Várias linhas de uma vez
+            ("UPDATE processo_listagem SET local_origem = 'ORIGEM-037' WHERE ativo = 1 AND rowid % 2 = 0", ()),
+            # Colunas fora das facetas não disparam o trigger
+            ("UPDATE processo_listagem SET data_limite = data_limite", ()),
+        ]
+        for sql, params in alteracoes:
+            conn.execute(sql, params)
+            assert not diferencas(conn), (sql, diferencas(conn))
+        conn.close()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando contagens de processo_facetas:")
+    print("=" * 60)
+    for teste in [test_facetas_iguais_ao_group_by_apos_migracoes, test_facetas_acompanham_update_direto_na_listagem]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
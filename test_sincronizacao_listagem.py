@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# Teste do modo sincronização de listar_processos_com_prazos
+#
+# Chama o endpoint sobre uma cópia migrada do banco, como faz
+# sincronizarProcessosComPrazos (web/static/js/utils.js): a marca devolvida
+# em uma chamada é enviada na seguinte. Executar com:
+# python test_sincronizacao_listagem.py
+
+import uuid
+
+from testing_support import importar_main
+
+main = importar_main()
+
+
+def sincronizar(marca, search_term=None, filtros=None):
+    resposta = main.listar_processos_com_prazos(search_term, 1, 0, filtros, None, None, marca)
+    assert resposta["sucesso"], resposta
+    return resposta
+
+
+def executar(sql, params=()):
+    conn = main.db_manager.get_connection()
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def consultar(sql, params=()):
+    conn = main.db_manager.get_connection()
+    linha = conn.execute(sql, params).fetchone()
+    conn.close()
+    return linha
+
+
+def copiar_processo(numero):
+    """Insere uma cópia de um processo ativo (gravada na listagem pelos triggers)"""
+    conn = main.db_manager.get_connection()
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(processos_procedimentos)")]
+    linha = conn.execute("SELECT * FROM processos_procedimentos WHERE ativo = 1 ORDER BY id LIMIT 1").fetchone()
+    registro = dict(zip(colunas, linha))
+    registro.update(id=str(uuid.uuid4()), numero=numero)
+    conn.execute(
+        f"INSERT INTO processos_procedimentos ({', '.join(registro)}) VALUES ({', '.join('?' * len(registro))})",
+        list(registro.values()),
+    )
+    conn.commit()
+    conn.close()
+    return registro["id"]
+
+
+def test_primeira_sincronizacao_traz_lista_completa():
+    resposta = sincronizar({})
+    ativos, = consultar("SELECT COUNT(*) FROM processo_listagem WHERE ativo = 1")
+    versao, = consultar("SELECT versao FROM versao_tabelas WHERE tabela = 'processo_listagem'")
+
+    assert resposta["completo"]
+    assert len(resposta["processos"]) == len(resposta["ordem"]) == ativos == resposta["total"]
+    assert resposta["removidos"] == []
+    assert resposta["marca"]["versao"] == versao
+
+
+def test_sem_alteracoes_nada_vem():
+    marca = sincronizar({})["marca"]
+    resposta = sincronizar(marca)
+
+    assert not resposta["completo"]
+    assert resposta["processos"] == [] and resposta["removidos"] == []
+    assert resposta["marca"] == marca
+
+
+def test_alteracoes_avancam_a_marca():
+    marca = sincronizar({})["marca"]
+    novo_id = copiar_processo("T-SYNC-1")
+
+    resposta = sincronizar(marca)
+    assert not resposta["completo"]
+    assert [processo["id"] for processo in resposta["processos"]] == [novo_id]
+    assert resposta["ordem"][0][1] == novo_id
+    assert resposta["marca"]["versao"] > marca["versao"]
+    assert resposta["marca"]["consulta"] == marca["consulta"]
+
+    # A linha alterada volta uma única vez
+    assert sincronizar(resposta["marca"])["processos"] == []
+
+
+def test_removidos_inativados_e_excluidos():
+    inativado = copiar_processo("T-SYNC-2")
+    excluido = copiar_processo("T-SYNC-3")
+    marca = sincronizar({})["marca"]
+
+    executar("UPDATE processos_procedimentos SET ativo = 0 WHERE id = ?", (inativado,))
+    executar("DELETE FROM processos_procedimentos WHERE id = ?", (excluido,))
+    # A exclusão física fica registrada em processo_listagem_removidos
+    versao_exclusao, = consultar(
+        "SELECT versao FROM processo_listagem_removidos WHERE processo_id = ?", (excluido,)
+    )
+    assert versao_exclusao > marca["versao"]
+
+    resposta = sincronizar(marca)
+    assert not resposta["completo"]
+    assert resposta["processos"] == []
+    assert sorted(resposta["removidos"]) == sorted([inativado, excluido])
+    assert sincronizar(resposta["marca"])["removidos"] == []
+
+
+def test_busca_ou_filtros_diferentes_trazem_lista_completa():
+    marca = sincronizar({})["marca"]
+
+    por_busca = sincronizar(marca, search_term="T-SYNC")
+    assert por_busca["completo"]
+    assert por_busca["marca"]["consulta"] != marca["consulta"]
+
+    por_filtro = sincronizar(por_busca["marca"], filtros={"tipo": "processo"})
+    assert por_filtro["completo"]
+    # A marca da mesma consulta volta a valer
+    assert not sincronizar(por_filtro["marca"], filtros={"tipo": "processo"})["completo"]
+
+    # Marca inválida (ex.: de outra versão do cliente) também recomeça
+    assert sincronizar({"versao": "x", "consulta": marca["consulta"]})["completo"]
+
+
+if __name__ == '__main__':
+    print("🧪 Verificando a sincronização incremental da listagem:")
+    print("=" * 60)
+    for teste in [
+        test_primeira_sincronizacao_traz_lista_completa,
+        test_sem_alteracoes_nada_vem,
+        test_alteracoes_avancam_a_marca,
+        test_removidos_inativados_e_excluidos,
+        test_busca_ou_filtros_diferentes_trazem_lista_completa,
+    ]:
+        teste()
+        print(f"✅ {teste.__name__}")
+    print("=" * 60)
+    print("\n✅ Todos os testes passaram!\n")
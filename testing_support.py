@@ -0,0 +1,60 @@
+# testing_support.py - Utilitários dos testes (bancos temporários migrados)
+import atexit
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import importlib.util
+
+from migration_runner import MigrationRunner, diretorio_migracoes_padrao
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def criar_banco_migrado(preparar=None):
+    """Cópia de usuarios.db com todas as migrações aplicadas (em diretório temporário)
+
+    ``preparar(conn)``, se informado, altera a cópia antes das migrações.
+    Retorna (diretorio, caminho); o chamador remove o diretório.
+    """
+    diretorio = tempfile.mkdtemp(prefix="teste_")
+    caminho = os.path.join(diretorio, "usuarios.db")
+    shutil.copy(os.path.join(BASE_DIR, "usuarios.db"), caminho)
+    if preparar:
+        conn = sqlite3.connect(caminho)
+        preparar(conn)
+        conn.commit()
+        conn.close()
+    try:
+        MigrationRunner(caminho).run()
+    except Exception:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        raise
+    return diretorio, caminho
+
+
+def carregar_migracao(nome):
+    """Módulo de uma migração .py de migrations/ (ex.: '033_processo_facetas')"""
+    caminho = os.path.join(diretorio_migracoes_padrao(), f"{nome}.py")
+    spec = importlib.util.spec_from_file_location(f"migracao_{nome}", caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def importar_main():
+    """Importa main.py sobre uma cópia migrada de usuarios.db (uma vez por processo)
+
+    main cria o DatabaseManager com o caminho relativo 'usuarios.db' e chama
+    eel.init('web') na importação: o diretório de trabalho passa a ser o
+    temporário (com um link para web/) e permanece nele até o fim do processo.
+    """
+    if "main" in sys.modules:
+        return sys.modules["main"]
+    diretorio, _ = criar_banco_migrado()
+    atexit.register(shutil.rmtree, diretorio, True)
+    os.symlink(os.path.join(BASE_DIR, "web"), os.path.join(diretorio, "web"))
+    os.chdir(diretorio)
+    import main
+    return main
@@ -0,0 +1,115 @@
+# threadpool.py - Execução de trabalho bloqueante (SQLite/CPU) fora do loop do gevent
+import functools
+import threading
+import time
+from contextlib import ExitStack
+
+try:
+    import gevent
+except ImportError:  # pragma: no cover - scripts/testes sem gevent executam direto
+    gevent = None
+
+# Marca as threads do pool para que chamadas aninhadas rodem direto
+_local = threading.local()
+
+_lock = threading.Lock()
+_stats = {
+    "despachadas": 0,
+    "diretas": 0,
+    "em_execucao": 0,
+    "pico_em_execucao": 0,
+    "tempo_total_ms": 0.0,
+    "maxsize": None,
+}
+
+# Tamanho padrão do threadpool do hub (gevent usa 10)
+TAMANHO_PADRAO = 8
+
+# Estado por greenlet levado para a thread: lista de (capturar(), instalar(estado))
+_propagadores = []
+
+
+# Funções finalizar(resultado) chamadas na thread após cada execução despachada
+_finalizadores = []
+
+
+def registrar_propagador(capturar, instalar):
+    """Registra estado do chamador a ser reinstalado na thread de trabalho.
+
+    ``capturar()`` roda no greenlet que chamou; ``instalar(estado)`` deve
+    retornar um context manager usado na thread durante a execução.
+    """
+    _propagadores.append((capturar, instalar))
+
+
+def registrar_finalizador(finalizar):
+    """Registra ``finalizar(resultado)``, chamado na thread de trabalho (com os
+    estados dos propagadores ainda instalados) antes de devolver o resultado.
+
+    Trabalho feito aqui (ex.: medir o payload) não ocupa o loop do gevent.
+    """
+    _finalizadores.append(finalizar)
+
+
+def configure(maxsize=TAMANHO_PADRAO):
+    """Define o número máximo de threads do threadpool do hub"""
+    if gevent is not None:
+        gevent.get_hub().threadpool.maxsize = maxsize
+        with _lock:
+            _stats["maxsize"] = maxsize
+
+
+def _executar(func, args, kwargs, estados=()):
+    _local.no_pool = True
+    with _lock:
+        _stats["em_execucao"] += 1
+        _stats["pico_em_execucao"] = max(_stats["pico_em_execucao"], _stats["em_execucao"])
+    inicio = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for instalar, estado in estados:
+                stack.enter_context(instalar(estado))
+            resultado = func(*args, **kwargs)
+            for finalizar in _finalizadores:
+                try:
+                    finalizar(resultado)
+                except Exception as e:
+                    print(f"⚠️ Erro no finalizador do threadpool: {e}")
+            return resultado
+    finally:
+        with _lock:
+            _stats["em_execucao"] -= 1
+            _stats["tempo_total_ms"] += (time.perf_counter() - inicio) * 1000
+        _local.no_pool = False
+
+
+def run_in_threadpool(func):
+    """Decorator: executa ``func`` no threadpool do gevent.
+
+    O greenlet que chamou (ex.: uma chamada do Eel) fica suspenso enquanto a
+    thread trabalha, liberando o hub para atender as demais chamadas
+    (ex.: ``obter_usuario_logado``). Chamadas feitas de dentro do pool, ou sem
+    gevent disponível, executam diretamente.
+
+    Aplicar abaixo de ``@eel.expose`` e acima de ``@db_manager.pool.scoped``,
+    para que o escopo de conexão seja aberto na thread que faz o trabalho.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if gevent is None or getattr(_local, 'no_pool', False):
+            with _lock:
+                _stats["diretas"] += 1
+            return func(*args, **kwargs)
+        with _lock:
+            _stats["despachadas"] += 1
+        estados = [(instalar, capturar()) for capturar, instalar in _propagadores]
+        return gevent.get_hub().threadpool.apply(_executar, (func, args, kwargs, estados))
+    return wrapper
+
+
+def get_stats():
+    """Retorna estatísticas do threadpool"""
+    with _lock:
+        stats = dict(_stats)
+    stats["tempo_total_ms"] = round(stats["tempo_total_ms"], 2)
+    return stats
@@ -1589,3 +1589,58 @@ function showErrorModal(title, message, iconClass = 'fa-exclamation-triangle') {
     // Mostrar modal
     modal.style.display = 'flex';
 }
+
+// === EXPORTAÇÃO CSV (LISTAGEM EM LOTES) ===
+
+const COLUNAS_EXPORTACAO = [
+    ['numero_formatado', 'Número'],
+    ['tipo_detalhe', 'Tipo'],
+    ['documento_iniciador', 'Documento'],
+    ['processo_sei', 'Processo SEI'],
+    ['responsavel_completo', 'Encarregado'],
+    ['local_origem', 'Origem'],
+    ['data_instauracao', 'Instauração'],
+    ['pm_envolvido_nome', 'PM Envolvido'],
+    ['status_pm', 'Status PM'],
+    ['concluido', 'Concluído'],
+    ['data_conclusao', 'Conclusão'],
+];
+
+function valorCsv(valor) {
+    if (valor === null || valor === undefined) return '';
+    if (typeof valor === 'boolean') valor = valor ? 'Sim' : 'Não';
+    const texto = String(valor);
+    return /[";\n]/.test(texto) ? `"${texto.replace(/"/g, '""')}"` : texto;
+}
+
+// Exporta todos os processos ativos; os lotes chegam por listar_processos_stream
+async function exportarProcessosCsv() {
+    const botao = document.getElementById('exportButton');
+    const rotulo = botao.innerHTML;
+    botao.disabled = true;
+    botao.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Exportando...';
+
+    const linhas = [COLUNAS_EXPORTACAO.map(([, titulo]) => titulo).join(';')];
+    try {
+        const total = await listarProcessosEmLotes(processos => {
+            processos.forEach(processo => {
+                linhas.push(COLUNAS_EXPORTACAO.map(([campo]) => valorCsv(processo[campo])).join(';'));
+            });
+            botao.innerHTML = `<i class="fas fa-spinner fa-spin"></i> ${linhas.length - 1} processos...`;
+        });
+
+        const blob = new Blob(['\ufeff' + linhas.join('\r\n')], { type: 'text/csv;charset=utf-8' });
+        const link = document.createElement('a');
+        link.href = URL.createObjectURL(blob);
+        link.download = `processos_${new Date().toISOString().slice(0, 10)}.csv`;
+        link.click();
+        URL.revokeObjectURL(link.href);
+        showAlert(`${total} processos exportados.`, 'success');
+    } catch (error) {
+        console.error('Erro ao exportar processos:', error);
+        showAlert('Erro ao exportar processos!', 'error');
+    } finally {
+        botao.disabled = false;
+        botao.innerHTML = rotulo;
+    }
+}
@@ -0,0 +1,215 @@
+// utils.js - Funções compartilhadas que conversam com o Python (servido de web/)
+//
+// Funções registradas com eel.expose precisam estar em um arquivo dentro de
+// web/: é a pasta que eel.init('web') percorre para encontrar as chamadas.
+
+// ============================================
+// JOBS EM SEGUNDO PLANO
+// ============================================
+
+const _jobsAcompanhados = {};
+
+// Consulta periódica do estado: garante o fim do job mesmo se uma
+// notificação de atualizarProgressoJob se perder
+const INTERVALO_CONSULTA_JOB_MS = 2000;
+
+/**
+ * Callback chamado pelo Python com o progresso dos jobs (e pela consulta periódica)
+ * @param {Object} job - Estado do job (job_id, status, percentual, mensagem...)
+ */
+function atualizarProgressoJob(job) {
+    const acompanhamento = _jobsAcompanhados[job.job_id];
+    if (!acompanhamento) return;
+
+    if (acompanhamento.onProgresso) acompanhamento.onProgresso(job);
+
+    if (job.status === 'concluido') {
+        _encerrarAcompanhamentoJob(job.job_id);
+        eel.obter_resultado_job(job.job_id)().then(resposta => {
+            if (resposta.sucesso) acompanhamento.resolve(resposta.resultado);
+            else acompanhamento.reject(new Error(resposta.mensagem));
+        }).catch(acompanhamento.reject);
+    } else if (job.status === 'erro' || job.status === 'cancelado') {
+        _encerrarAcompanhamentoJob(job.job_id);
+        acompanhamento.reject(new Error(job.erro || job.mensagem || job.status));
+    }
+}
+
+if (typeof eel !== 'undefined') {
+    eel.expose(atualizarProgressoJob, 'atualizarProgressoJob');
+}
+
+function _encerrarAcompanhamentoJob(jobId) {
+    const acompanhamento = _jobsAcompanhados[jobId];
+    if (!acompanhamento) return;
+    clearInterval(acompanhamento.consulta);
+    delete _jobsAcompanhados[jobId];
+}
+
+function _consultarStatusJob(jobId) {
+    eel.obter_status_job(jobId)().then(resposta => {
+        const acompanhamento = _jobsAcompanhados[jobId];
+        if (!acompanhamento) return;
+        if (resposta.sucesso) {
+            atualizarProgressoJob(resposta.job);
+        } else {
+            _encerrarAcompanhamentoJob(jobId);
+            acompanhamento.reject(new Error(resposta.mensagem));
+        }
+    }).catch(erro => console.error('Erro ao consultar job:', erro));
+}
+
+/**
+ * Executa uma função demorada como job em segundo plano
+ * @param {string} tipo - Nome do job (ex.: 'gerar_relatorio_anual')
+ * @param {Array|Object} parametros - Argumentos da função
+ * @param {Function} onProgresso - Recebe o estado do job a cada atualização
+ * @returns {{jobId: Promise<string>, resultado: Promise<any>, cancelar: Function}}
+ */
+function executarJob(tipo, parametros, onProgresso) {
+    let cancelar = () => {};
+    let resolverId;
+    const jobId = new Promise(resolve => { resolverId = resolve; });
+    const resultado = new Promise((resolve, reject) => {
+        eel.iniciar_job(tipo, parametros || [])().then(resposta => {
+            if (!resposta.sucesso) {
+                resolverId(null);
+                reject(new Error(resposta.mensagem));
+                return;
+            }
+            const id = resposta.job_id;
+            _jobsAcompanhados[id] = {
+                resolve, reject, onProgresso,
+                consulta: setInterval(() => _consultarStatusJob(id), INTERVALO_CONSULTA_JOB_MS),
+            };
+            cancelar = () => eel.cancelar_job(id)();
+            resolverId(id);
+            // O job pode ter terminado antes do registro acima
+            _consultarStatusJob(id);
+        }).catch(reject);
+    });
+    return { jobId, resultado, cancelar: () => cancelar() };
+}
+
+// ============================================
+// LISTAGEM DE PROCESSOS EM LOTES (STREAMING)
+// ============================================
+
+const _streamsProcessos = {};
+
+/**
+ * Callback chamado pelo Python com cada lote de listar_processos_stream
+ * @param {Object} mensagem - {stream_id, indice, processos, fim, total?, erro?}
+ */
+function receberLoteProcessos(mensagem) {
+    const stream = _streamsProcessos[mensagem.stream_id];
+    if (!stream) return;
+
+    if (mensagem.processos && mensagem.processos.length) {
+        stream.total += mensagem.processos.length;
+        if (stream.onLote) stream.onLote(mensagem.processos, mensagem.indice);
+    }
+
+    if (mensagem.fim) {
+        delete _streamsProcessos[mensagem.stream_id];
+        if (mensagem.erro) stream.reject(new Error(mensagem.erro));
+        else stream.resolve(stream.total);
+    }
+}
+
+if (typeof eel !== 'undefined') {
+    eel.expose(receberLoteProcessos, 'receberLoteProcessos');
+}
+
+/**
+ * Lista todos os processos recebendo-os em lotes (renderização incremental)
+ * @param {Function} onLote - Recebe (processos, indice) a cada lote
+ * @param {number} tamanhoLote - Processos por lote (padrão do servidor: 500)
+ * @returns {Promise<number>} Total de processos recebidos
+ */
+function listarProcessosEmLotes(onLote, tamanhoLote) {
+    const streamId = `stream_${Date.now()}_${Math.random().toString(36).slice(2)}`;
+    return new Promise((resolve, reject) => {
+        _streamsProcessos[streamId] = { onLote, resolve, reject, total: 0 };
+        eel.listar_processos_stream(streamId, tamanhoLote || null)().then(resposta => {
+            if (!resposta.sucesso && _streamsProcessos[streamId]) {
+                delete _streamsProcessos[streamId];
+                reject(new Error(resposta.mensagem));
+            }
+        }).catch(erro => {
+            delete _streamsProcessos[streamId];
+            reject(erro);
+        });
+    });
+}
+
+// ============================================
+// RESPOSTAS EM FORMATO COLUNAR
+// ============================================
+
+/**
+ * Reconstrói a lista de objetos de uma resposta pedida com formato 'colunar'
+ * (listar_todos_processos_com_prazos, gerar_mapa_mensal, listar_todos_usuarios)
+ * @param {Object|Array} payload - Resultado de columnar_encoding.codificar_colunar
+ * @returns {Array<Object>} Linhas como no formato padrão (arrays são devolvidos sem alteração)
+ */
+function decodificarColunar(payload) {
+    if (!payload || payload.formato !== 'colunar') return payload;
+
+    const linhas = [];
+    for (let i = 0; i < payload.linhas; i++) linhas.push({});
+
+    payload.colunas.forEach(coluna => {
+        const tipo = payload.tipos[coluna];
+        const ausentes = new Set((payload.ausentes && payload.ausentes[coluna]) || []);
+        let valores = payload.dados[coluna];
+        if (tipo === 'objeto') {
+            valores = decodificarColunar(valores);
+        } else if (tipo === 'dicionario') {
+            const dicionario = payload.dicionarios[coluna];
+            valores = valores.map(indice => (indice === null ? null : dicionario[indice]));
+        }
+
+        let posicao = 0;
+        linhas.forEach((linha, indice) => {
+            if (!ausentes.has(indice)) linha[coluna] = valores[posicao++];
+        });
+    });
+
+    return linhas;
+}
+
+// ============================================
+// SINCRONIZAÇÃO INCREMENTAL DA LISTAGEM DE PROCESSOS
+// ============================================
+
+/**
+ * Atualiza uma cópia local da listagem com listar_processos_com_prazos em modo
+ * sincronização: só as linhas alteradas desde a última chamada são recebidas
+ * @param {Object} estado - Objeto mantido pelo chamador entre chamadas (inicialmente {})
+ * @param {string|null} searchTerm - Termo de busca
+ * @param {Object|null} filtros - Filtros avançados
+ * @param {Array<string>|null} campos - Projeção de campos (opcional)
+ * @returns {Promise<Array<Object>>} Lista completa e ordenada (estado.processos)
+ */
+async function sincronizarProcessosComPrazos(estado, searchTerm, filtros, campos) {
+    const resposta = await eel.listar_processos_com_prazos(
+        searchTerm || null, 1, 0, filtros || null, null, campos || null, estado.marca || {}
+    )();
+    if (!resposta.sucesso) throw new Error(resposta.mensagem);
+
+    if (resposta.completo || !estado.linhas) estado.linhas = new Map();
+    resposta.removidos.forEach(id => estado.linhas.delete(id));
+    resposta.processos.forEach((processo, i) => {
+        estado.linhas.set(processo.id, { ordem: resposta.ordem[i], processo });
+    });
+
+    // Mesma ordenação do servidor: ordem DESC, id DESC
+    estado.processos = Array.from(estado.linhas.values())
+        .sort((a, b) => (a.ordem[0] < b.ordem[0] ? 1 : a.ordem[0] > b.ordem[0] ? -1
+            : a.ordem[1] < b.ordem[1] ? 1 : a.ordem[1] > b.ordem[1] ? -1 : 0))
+        .map(linha => linha.processo);
+    estado.marca = resposta.marca;
+    estado.total = resposta.total;
+    return estado.processos;
+}